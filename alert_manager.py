@@ -0,0 +1,239 @@
+# alert_manager.py
+"""
+État des alertes (PPMS, attentat...) et pilotage du lecteur persistant.
+
+Un seul objet possède l'état (idle / playing / looping / ending), protégé par un
+verrou : les threads Waitress ne manipulent plus de variables globales. Les sons
+sont joués par un sous-processus lecteur lancé une fois ('backend_server.py
+--player-server', voir sound_cli.run_player_server) auquel on envoie des commandes
+JSON : arrêter une alerte coupe le son en quelques dizaines de millisecondes et la
+requête HTTP n'attend jamais la fin d'un processus. Chaque changement d'état est
+signalé à on_change (publication du statut). L'issue d'une lecture (démarrée ou en
+erreur) n'est connue qu'à la réponse du lecteur : c'est alors qu'elle est inscrite
+dans l'historique (history_recorder).
+"""
+import os
+import json
+import threading
+import subprocess
+import logging
+
+IDLE = "idle"
+PLAYING = "playing" # Alerte jouée une fois
+LOOPING = "looping" # Alerte en boucle jusqu'à l'arrêt
+ENDING = "ending" # Son de fin d'alerte en cours
+
+PLAYER_SHUTDOWN_TIMEOUT_SECONDS = 2
+
+
+class AlertManager:
+    """Machine à états des alertes, commandes envoyées au lecteur persistant."""
+
+    def __init__(self, player_cmd: list, logger: logging.Logger, on_change=None, process_spawner=None,
+                 history_recorder=None):
+        """
+        Args:
+            player_cmd: Commande du lecteur persistant (ex: [python, backend_server.py, '--player-server']).
+            logger: Instance du logger.
+            on_change: Fonction appelée (sans argument) après chaque changement d'état.
+            process_spawner: Fonction (type, cmd, deadline_seconds, **popen_kwargs) -> Popen
+                             (ex: ProcessSupervisor.spawn). Si None, subprocess.Popen est utilisé.
+            history_recorder: Fonction (type, résultat, **détails) appelée avec l'issue de chaque
+                              lecture demandée avec history (ex: HistoryStore.record).
+        """
+        self.player_cmd = player_cmd
+        self.logger = logger
+        self._on_change = on_change
+        self._spawn = process_spawner
+        self._history_recorder = history_recorder
+        self._lock = threading.Lock()
+        self._player = None
+        self._state = IDLE
+        self._filename = None
+        self._play_id = 0 # Identifiant de la lecture en cours (les événements d'une lecture précédente sont ignorés)
+        self._last_error = None
+        self._pending_history = None # (play_id, détails) de la lecture dont l'issue n'est pas encore connue
+
+    # --- Lecteur ---
+
+    def _ensure_player(self):
+        """Démarre le lecteur s'il ne tourne pas (appelé avec le verrou)."""
+        if self._player and self._player.poll() is None:
+            return self._player
+        popen_kwargs = dict(stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, encoding='utf-8', errors='replace', bufsize=1)
+        if self._spawn:
+            self._player = self._spawn("alert_player", self.player_cmd, None, **popen_kwargs) # Persistant: pas d'échéance
+        else:
+            flags = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+            self._player = subprocess.Popen(self.player_cmd, creationflags=flags, **popen_kwargs)
+        self.logger.info(f"Lecteur d'alertes démarré (PID: {self._player.pid}).")
+        threading.Thread(target=self._read_events, args=(self._player,), name=f"AlertPlayer-{self._player.pid}", daemon=True).start()
+        return self._player
+
+    def _send(self, command: dict):
+        """Envoie une commande au lecteur (appelé avec le verrou). Un lecteur mort est relancé une fois."""
+        line = json.dumps(command, ensure_ascii=False) + "\n"
+        for attempt in (1, 2):
+            player = self._ensure_player()
+            try:
+                player.stdin.write(line)
+                player.stdin.flush()
+                return
+            except (BrokenPipeError, OSError) as e:
+                self.logger.warning(f"Lecteur d'alertes injoignable ({e}), redémarrage (essai {attempt}).")
+                player.kill()
+                player.wait()
+        raise RuntimeError("Lecteur d'alertes injoignable.")
+
+    def _read_events(self, player):
+        """Lit les événements du lecteur (thread dédié) et fait évoluer l'état."""
+        for line in player.stdout:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                self.logger.debug(f"Lecteur d'alertes: {line.rstrip()}")
+                continue
+            self._on_player_event(event)
+        player.wait()
+        self.logger.info(f"Lecteur d'alertes (PID: {player.pid}) terminé (code: {player.returncode}).")
+        with self._lock:
+            if self._player is not player or self._state == IDLE:
+                return
+            self._set_state(IDLE, None, error="Lecteur d'alertes arrêté pendant la lecture")
+            pending = self._take_history(self._play_id)
+        self._record_history(pending, "error", "Lecteur d'alertes arrêté avant le début de la lecture")
+        self._notify()
+
+    def _on_player_event(self, event: dict):
+        kind = event.get("event")
+        with self._lock:
+            if event.get("id") != self._play_id or self._state == IDLE:
+                return # Événement d'une lecture déjà remplacée ou arrêtée
+            pending = self._take_history(self._play_id) if kind in ("started", "error") else None
+            if kind == "started":
+                self.logger.info(f"Alerte '{self._filename}' ({self._state}): lecture démarrée.")
+            elif kind == "finished":
+                self.logger.info(f"Alerte '{self._filename}' ({self._state}): lecture terminée.")
+                self._set_state(IDLE, None)
+            elif kind == "error":
+                self.logger.error(f"Alerte '{self._filename}': erreur du lecteur: {event.get('error')}")
+                self._set_state(IDLE, None, error=event.get("error"))
+            else:
+                return
+        if kind == "started":
+            self._record_history(pending, "ok")
+            return
+        self._record_history(pending, "error", event.get("error") if kind == "error" else None)
+        self._notify()
+
+    # --- Historique ---
+
+    def _take_history(self, play_id: int = None):
+        """Retire la lecture en attente d'issue (toute lecture si play_id est None). Appelé avec le verrou."""
+        pending = self._pending_history
+        if pending is None or (play_id is not None and pending[0] != play_id):
+            return None
+        self._pending_history = None
+        return pending
+
+    def _record_history(self, pending, outcome: str, error: str = None):
+        """Inscrit l'issue d'une lecture (hors verrou: écriture sur disque)."""
+        if pending is None or not self._history_recorder:
+            return
+        details = dict(pending[1])
+        if error:
+            details["error"] = error
+        try:
+            self._history_recorder(details.pop("event_type"), outcome, **details)
+        except Exception as e:
+            self.logger.error(f"Historique: alerte '{details.get('sound')}' non enregistrée: {e}", exc_info=True)
+
+    # --- État ---
+
+    def _set_state(self, state: str, filename, error=None):
+        self._state = state
+        self._filename = filename
+        self._last_error = error
+
+    def _notify(self):
+        if self._on_change:
+            try:
+                self._on_change()
+            except Exception as e:
+                self.logger.error(f"Erreur publication état alerte: {e}", exc_info=True)
+
+    def _play(self, state: str, filename: str, sound_path: str, device=None, loop: bool = False, history: dict = None):
+        replaced = None
+        try:
+            with self._lock:
+                replaced = self._take_history() # Lecture précédente sans réponse du lecteur
+                self._play_id += 1
+                self._send({"cmd": "play", "id": self._play_id, "path": sound_path, "loop": loop, "device": device})
+                previous = self._state
+                self._set_state(state, filename)
+                if history:
+                    self._pending_history = (self._play_id, dict(history, sound=filename, devices=[device] if device else None))
+        finally:
+            self._record_history(replaced, "error", "Remplacée avant le début de la lecture")
+        self.logger.info(f"Alerte: {previous} -> {state} ('{filename}', périphérique: {device or 'défaut'}).")
+        self._notify()
+
+    def trigger(self, filename: str, sound_path: str, device=None, loop: bool = False, history: dict = None):
+        """
+        Joue une alerte (remplace celle en cours). Lève RuntimeError si le lecteur ne répond pas.
+        history: détails pour l'historique (event_type, user, label...), inscrits avec l'issue de la lecture.
+        """
+        self._play(LOOPING if loop else PLAYING, filename, sound_path, device, loop, history)
+
+    def end(self, filename: str, sound_path: str, device=None, history: dict = None):
+        """Coupe l'alerte en cours et joue le son de fin d'alerte (history: voir trigger)."""
+        self._play(ENDING, filename, sound_path, device, history=history)
+
+    def stop(self) -> bool:
+        """Coupe le son en cours sans attendre. Retourne True si une alerte était active."""
+        with self._lock:
+            if self._state == IDLE:
+                return False
+            previous, filename = self._state, self._filename
+            pending = self._take_history()
+            self._play_id += 1 # Les événements de la lecture coupée seront ignorés
+            self._set_state(IDLE, None)
+            try:
+                self._send({"cmd": "stop"})
+            except RuntimeError as e:
+                self.logger.error(f"Arrêt de l'alerte '{filename}': {e}")
+        self._record_history(pending, "error", "Arrêtée avant le début de la lecture")
+        self.logger.info(f"Alerte: {previous} -> {IDLE} ('{filename}' arrêtée).")
+        self._notify()
+        return True
+
+    def is_active(self) -> bool:
+        """Alerte en cours (hors son de fin)."""
+        return self._state in (PLAYING, LOOPING)
+
+    def get_status(self) -> dict:
+        with self._lock:
+            return {"state": self._state, "filename": self._filename, "last_error": self._last_error}
+
+    # --- Démarrage / arrêt ---
+
+    def start(self):
+        """Démarre le lecteur à l'avance (pygame déjà chargé à la première alerte)."""
+        with self._lock:
+            try:
+                self._ensure_player()
+            except OSError as e:
+                self.logger.error(f"Démarrage du lecteur d'alertes impossible: {e}")
+
+    def shutdown(self):
+        with self._lock:
+            player, self._player = self._player, None
+            self._set_state(IDLE, None)
+        if not player or player.poll() is not None:
+            return
+        try:
+            player.stdin.write('{"cmd": "quit"}\n')
+            player.stdin.flush()
+            player.wait(timeout=PLAYER_SHUTDOWN_TIMEOUT_SECONDS)
+        except (OSError, subprocess.TimeoutExpired):
+            player.kill()
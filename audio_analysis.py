@@ -0,0 +1,218 @@
+# audio_analysis.py
+"""
+Analyse audio des sonneries en arrière-plan : niveau crête, sonie intégrée,
+vérification du décodage réel (pygame) et copie « prête à sonner ».
+
+La copie prête à sonner est un WAV PCM au format exact du mixer du lecteur
+(sound_cli.py) : à chaque sonnerie, pygame la charge sans décodage MP3 ni
+rééchantillonnage. Le MP3 reste la référence ; la copie est nommée d'après
+l'empreinte SHA-1 du MP3 et donc régénérée quand son contenu change.
+
+Chaque analyse tourne dans un sous-processus ('python audio_analysis.py <fichier>',
+résultat JSON sur stdout), comme la lecture des sons : un MP3 qui fait planter le
+décodeur n'affecte pas le serveur, et le décodage ne prend pas le GIL du serveur.
+Un petit pool de threads limite le nombre d'analyses simultanées. Chaque contenu
+(SHA-1) n'est analysé qu'une fois ; les résultats vont dans le catalogue des sons.
+"""
+import os
+import sys
+import json
+import math
+import wave
+import operator
+import threading
+import subprocess
+import logging
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from sound_cli import MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS
+
+ANALYSIS_TIMEOUT_SECONDS = 120
+RING_READY_MAX_SECONDS = 300 # Au-delà, pas de copie WAV (trop volumineuse): le MP3 est lu directement
+
+# Seuils des avertissements affichés dans l'interface
+MAX_BELL_DURATION_SECONDS = 30
+LOUDNESS_TOO_LOUD_LUFS = -9
+LOUDNESS_TOO_QUIET_LUFS = -30
+PEAK_CLIPPING_DBFS = -0.1
+
+
+# --- Mesure (exécutée dans le sous-processus) ---
+
+def _loudness_lufs(samples, sample_rate: int, channels: int):
+    """
+    Sonie intégrée selon le découpage et le double seuil de l'ITU-R BS.1770 (blocs de
+    400 ms à 75% de recouvrement, seuil absolu -70, seuil relatif -10 LU), sans le
+    filtre de pondération K : c'est une approximation (quelques dB d'écart sur les
+    sons très graves ou très aigus), suffisante pour repérer un son trop fort ou trop faible.
+    """
+    step = int(sample_rate * 0.1) * channels # Sous-blocs de 100 ms
+    frames_per_step = step // channels
+    sub_energies = []
+    for i in range(0, len(samples) - step + 1, step):
+        segment = samples[i:i + step]
+        sub_energies.append(sum(map(operator.mul, segment, segment)) / (32768.0 * 32768.0) / frames_per_step)
+    if not sub_energies:
+        return None
+    blocks = [sum(sub_energies[j:j + 4]) / 4 for j in range(max(1, len(sub_energies) - 3))]
+
+    def to_lufs(energy):
+        return -0.691 + 10 * math.log10(energy)
+
+    gated = [z for z in blocks if z > 0 and to_lufs(z) > -70]
+    if not gated:
+        return None # Silence
+    relative_gate = to_lufs(sum(gated) / len(gated)) - 10
+    gated = [z for z in gated if to_lufs(z) > relative_gate]
+    return round(to_lufs(sum(gated) / len(gated)), 1)
+
+
+def _write_wav(wav_path: str, raw: bytes, sample_rate: int, channels: int):
+    """Écrit le PCM 16 bits décodé dans un WAV (fichier temporaire puis remplacement)."""
+    os.makedirs(os.path.dirname(wav_path), exist_ok=True)
+    with wave.open(wav_path + ".part", 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(raw)
+    os.replace(wav_path + ".part", wav_path)
+
+
+def measure_audio(path: str, wav_path: str = None) -> dict:
+    """
+    Décode le fichier avec pygame (au format du mixer du lecteur) et retourne crête (dBFS),
+    sonie (LUFS) et durée décodée. Si wav_path est fourni, y écrit la copie prête à sonner.
+    """
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy") # Pas de sortie audio réelle pour l'analyse
+    os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    import pygame
+    try:
+        pygame.mixer.init(frequency=MIXER_FREQUENCY, size=MIXER_SIZE, channels=MIXER_CHANNELS)
+        sample_rate, _, channels = pygame.mixer.get_init()
+        raw = pygame.mixer.Sound(path).get_raw()
+    except pygame.error as e:
+        return {"decode_ok": False, "error": f"Décodage impossible: {e}"}
+    finally:
+        if pygame.mixer.get_init():
+            pygame.mixer.quit()
+
+    raw = raw[:len(raw) - len(raw) % (2 * channels)] # Trames complètes uniquement
+    samples = array('h')
+    samples.frombytes(raw)
+    if not samples:
+        return {"decode_ok": False, "error": "Aucun échantillon audio décodé"}
+    peak = max(max(samples), -min(samples)) / 32768
+    decoded_duration = len(samples) / channels / sample_rate
+
+    ring_ready = False
+    if wav_path and decoded_duration <= RING_READY_MAX_SECONDS:
+        _write_wav(wav_path, raw, sample_rate, channels)
+        ring_ready = True
+    return {
+        "decode_ok": True,
+        "error": None,
+        "decoded_duration_s": round(decoded_duration, 2),
+        "peak_dbfs": round(20 * math.log10(peak), 1) if peak > 0 else None,
+        "loudness_lufs": _loudness_lufs(samples, sample_rate, channels),
+        "ring_ready": ring_ready
+    }
+
+
+def audio_warnings(duration_s, audio: dict) -> list:
+    """Avertissements pour l'interface: son trop fort, trop faible, saturé ou trop long pour une sonnerie."""
+    warnings = []
+    if duration_s and round(duration_s) > MAX_BELL_DURATION_SECONDS:
+        warnings.append(f"Trop long pour une sonnerie ({round(duration_s)} s > {MAX_BELL_DURATION_SECONDS} s)")
+    if not audio or not audio.get("decode_ok"):
+        return warnings
+    loudness = audio.get("loudness_lufs")
+    if loudness is None:
+        warnings.append("Silencieux")
+    elif loudness > LOUDNESS_TOO_LOUD_LUFS:
+        warnings.append(f"Très fort ({loudness} LUFS)")
+    elif loudness < LOUDNESS_TOO_QUIET_LUFS:
+        warnings.append(f"Très faible ({loudness} LUFS)")
+    if audio.get("peak_dbfs") is not None and audio["peak_dbfs"] >= PEAK_CLIPPING_DBFS:
+        warnings.append("Saturé (crête à 0 dBFS)")
+    return warnings
+
+
+# --- Pool d'analyse (côté serveur) ---
+
+class AudioAnalyzer:
+    """Analyse en arrière-plan les fichiers du catalogue sans mesure audio ou sans copie prête à sonner."""
+
+    def __init__(self, catalog, logger: logging.Logger, max_workers: int = 2, process_spawner=None):
+        """
+        Args:
+            catalog: SoundCatalog (pending_audio_analysis / ring_ready_path / set_audio_analysis).
+            logger: Instance du logger.
+            max_workers: Nombre d'analyses (sous-processus) simultanées.
+            process_spawner: Fonction (type, cmd, deadline_seconds, **popen_kwargs) -> Popen
+                             (ex: ProcessSupervisor.spawn). Si None, subprocess.Popen est utilisé.
+        """
+        self.catalog = catalog
+        self.logger = logger
+        self.process_spawner = process_spawner
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="AudioAnalysis")
+        self._lock = threading.Lock()
+        self._in_flight = set() # (nom, sha1) en cours d'analyse
+        self._closed = False
+
+    def analyze_pending(self):
+        """Lance l'analyse des fichiers sans mesure (ou dont le contenu a changé)."""
+        for name, path, sha1 in self.catalog.pending_audio_analysis():
+            with self._lock:
+                if self._closed or (name, sha1) in self._in_flight:
+                    continue
+                self._in_flight.add((name, sha1))
+            self._executor.submit(self._analyze, name, path, sha1)
+
+    def _analyze(self, name: str, path: str, sha1: str):
+        try:
+            wav_path = self.catalog.ring_ready_path(sha1)
+            cmd = [sys.executable, os.path.abspath(__file__), path] + ([wav_path] if wav_path else [])
+            popen_kwargs = dict(stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8', errors='replace')
+            if self.process_spawner:
+                process = self.process_spawner("audio_analysis", cmd, ANALYSIS_TIMEOUT_SECONDS, **popen_kwargs)
+            else:
+                flags = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+                process = subprocess.Popen(cmd, creationflags=flags, **popen_kwargs)
+            try:
+                stdout, stderr = process.communicate(timeout=ANALYSIS_TIMEOUT_SECONDS)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                raise
+            if process.returncode != 0:
+                error = (stderr.strip().splitlines() or [f"code {process.returncode}"])[-1]
+                audio = {"decode_ok": False, "error": f"Échec de l'analyse: {error}"}
+            else:
+                audio = json.loads(stdout.strip().splitlines()[-1])
+        except subprocess.TimeoutExpired:
+            audio = {"decode_ok": False, "error": f"Analyse interrompue (plus de {ANALYSIS_TIMEOUT_SECONDS} s)"}
+        except Exception as e:
+            self.logger.error(f"Analyse audio de '{name}' impossible: {e}", exc_info=True)
+            with self._lock:
+                self._in_flight.discard((name, sha1))
+            return
+        if audio.get("decode_ok"):
+            self.logger.info(f"Analyse audio '{name}': crête {audio.get('peak_dbfs')} dBFS, sonie {audio.get('loudness_lufs')} LUFS.")
+        else:
+            self.logger.warning(f"Analyse audio '{name}': {audio.get('error')}")
+        self.catalog.set_audio_analysis(name, sha1, audio)
+        with self._lock:
+            self._in_flight.discard((name, sha1))
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    # Sous-processus d'analyse: python audio_analysis.py <fichier> [copie.wav] -> JSON sur la dernière ligne de stdout
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python audio_analysis.py <fichier.mp3> [copie_prete_a_sonner.wav]")
+    print(json.dumps(measure_audio(*sys.argv[1:]), ensure_ascii=False))
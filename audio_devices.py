@@ -0,0 +1,179 @@
+# audio_devices.py
+"""
+Liste des périphériques de sortie audio, mise en cache.
+
+L'énumération (sounddevice / PortAudio) est faite au premier besoin puis
+rafraîchie par un thread de surveillance à intervalle lent, ou plus tôt quand
+le périphérique configuré n'est pas trouvé (branchement/débranchement USB).
+La page de configuration lit la liste en cache, et le lecteur reçoit le nom
+exact du périphérique résolu à l'avance : une sonnerie ne déclenche donc ni
+énumération ni recherche par nom.
+"""
+import time
+import threading
+import logging
+
+DEVICE_REFRESH_INTERVAL_SECONDS = 60
+DEVICE_ERROR_RETRY_SECONDS = 10 # Délai minimal entre deux rafraîchissements provoqués par une erreur
+
+# Noms génériques du système (mappeurs, pilotes de capture) à ne pas proposer
+IGNORED_DEVICE_NAMES = ("Microsoft Sound Mapper", "Périphérique audio principal",
+                        "Primary Sound Capture Driver", "Pilote de capture audio principal")
+
+
+def dedupe_device_names(names) -> list:
+    """
+    Supprime les doublons et les noms tronqués (préfixe d'un nom plus long, ex: noms
+    MME limités à 31 caractères) en un seul passage sur la liste triée : les noms qui
+    commencent par x suivent immédiatement x dans l'ordre trié.
+    """
+    ordered = sorted(set(names))
+    return [name for name, following in zip(ordered, ordered[1:] + [None])
+            if following is None or not following.startswith(name)]
+
+
+class AudioDeviceCache:
+    """Périphériques de sortie (nom -> index sounddevice), rafraîchis en arrière-plan."""
+
+    def __init__(self, logger: logging.Logger, sounddevice_loader, refresh_interval: float = DEVICE_REFRESH_INTERVAL_SECONDS):
+        """
+        Args:
+            logger: Instance du logger.
+            sounddevice_loader: Fonction retournant le module sounddevice, ou None s'il est indisponible.
+            refresh_interval: Intervalle (s) du rafraîchissement périodique.
+        """
+        self.logger = logger
+        self._load_sounddevice = sounddevice_loader
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock() # Protège _devices / _error, jamais tenu pendant l'énumération
+        self._refresh_lock = threading.Lock()
+        self._devices = None # Liste triée de {"name", "index"}, None tant que jamais énumérée
+        self._error = None
+        self._last_refresh = 0.0
+        self._stop_event = threading.Event()
+        self._refresh_event = threading.Event()
+        self._thread = None
+
+    def _enumerate(self, sd, reinitialize: bool) -> list:
+        # PortAudio garde la liste vue à son initialisation: la réinitialiser pour voir les périphériques branchés depuis
+        if reinitialize and hasattr(sd, "_terminate"):
+            sd._terminate()
+            sd._initialize()
+        indexes = {}
+        for device_info in sd.query_devices():
+            if device_info.get('max_output_channels', 0) <= 0:
+                continue
+            name = device_info.get('name', '').strip()
+            if not name or ('(' in name and ')' not in name): # Vide ou clairement tronqué
+                continue
+            if any(ignored in name for ignored in IGNORED_DEVICE_NAMES):
+                continue
+            indexes.setdefault(name, device_info.get('index'))
+        return [{"name": name, "index": indexes[name]} for name in dedupe_device_names(indexes)]
+
+    def refresh(self) -> bool:
+        """
+        Énumère les périphériques. Retourne False si l'énumération a échoué (liste précédente conservée).
+        L'énumération (réinitialisation PortAudio comprise) se fait hors de self._lock : une
+        sonnerie qui résout son périphérique pendant ce temps lit la liste précédente sans attendre.
+        """
+        with self._refresh_lock: # Un seul rafraîchissement à la fois (surveillance, page de configuration)
+            return self._refresh()
+
+    def _refresh(self) -> bool:
+        sd = self._load_sounddevice()
+        self._last_refresh = time.monotonic()
+        if sd is None:
+            with self._lock:
+                self._error = "sounddevice_unavailable"
+            return False
+        with self._lock:
+            previous = {d["name"] for d in self._devices} if self._devices is not None else None
+        try:
+            devices = self._enumerate(sd, reinitialize=previous is not None)
+        except Exception as e:
+            with self._lock:
+                self._error = str(e)
+            self.logger.error(f"Énumération des périphériques audio impossible: {e}", exc_info=True)
+            return False
+        with self._lock:
+            self._devices = devices
+            self._error = None
+        current = {d["name"] for d in devices}
+        if previous is None:
+            self.logger.info(f"{len(devices)} périphérique(s) de sortie audio trouvé(s).")
+        elif current != previous:
+            self.logger.info(f"Périphériques audio modifiés: ajoutés {sorted(current - previous)}, retirés {sorted(previous - current)}.")
+        return True
+
+    def get_devices(self, wait: bool = False):
+        """
+        Retourne (liste des périphériques, erreur ou None) sans énumérer. Tant que la liste n'a
+        jamais été remplie, wait=True (page de configuration) l'énumère sur place ; sinon le
+        rafraîchissement est confié au thread de surveillance et la liste retournée est vide.
+        """
+        if self._devices is None:
+            if wait:
+                with self._refresh_lock:
+                    if self._devices is None: # Peut-être remplie par la surveillance pendant l'attente
+                        self._refresh()
+            else:
+                self._request_refresh()
+        with self._lock:
+            return list(self._devices or []), self._error
+
+    def resolve(self, configured_name: str):
+        """
+        Nom exact à passer au lecteur pour le périphérique configuré (nom complet ou
+        préfixe), None pour le périphérique par défaut. Un périphérique absent de la
+        liste (débranché) donne None et demande un rafraîchissement anticipé ; sans
+        liste disponible (pas encore énumérée par la surveillance), le nom configuré
+        est renvoyé tel quel. N'énumère jamais : appelé par le planificateur à chaque sonnerie.
+        """
+        if not configured_name:
+            return None
+        devices, _ = self.get_devices()
+        if not devices:
+            return configured_name
+        match = next((d for d in devices if d["name"] == configured_name), None) or \
+                next((d for d in devices if d["name"].startswith(configured_name)), None)
+        if match:
+            return match["name"]
+        self.logger.warning(f"Périphérique audio '{configured_name}' introuvable (débranché ?): périphérique par défaut utilisé.")
+        self._refresh_event.set()
+        return None
+
+    # --- Surveillance (branchement / débranchement) ---
+
+    def _request_refresh(self):
+        """Demande un rafraîchissement au thread de surveillance, démarré au besoin."""
+        self._refresh_event.set()
+        if not self._stop_event.is_set():
+            self.start()
+
+    def _watch(self):
+        if self._devices is None:
+            self._refresh_event.clear() # Demande éventuelle couverte par cette première énumération
+            self.refresh() # Première énumération en arrière-plan: la première sonnerie trouve la liste prête
+        while not self._stop_event.is_set():
+            requested = self._refresh_event.wait(self.refresh_interval)
+            if self._stop_event.is_set():
+                break
+            if requested:
+                self._refresh_event.clear()
+                # Pas plus d'un rafraîchissement sur erreur par DEVICE_ERROR_RETRY_SECONDS
+                delay = DEVICE_ERROR_RETRY_SECONDS - (time.monotonic() - self._last_refresh)
+                if delay > 0 and self._stop_event.wait(delay):
+                    break
+            self.refresh()
+
+    def start(self):
+        with self._lock: # Appelé aussi depuis le planificateur (_request_refresh): un seul thread de surveillance
+            if self._thread is None or not self._thread.is_alive():
+                self._stop_event.clear()
+                self._thread = threading.Thread(target=self._watch, name="AudioDeviceWatcher", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._refresh_event.set()
@@ -1,5 +1,30 @@
 # backend_server.py
 
+import sys
+
+# --- Lecteurs de son (sous-processus 'backend_server.py --play-sound ...' et '--player-server') ---
+# Traité avant tout autre import : le sous-processus ne charge ni Flask, ni la config,
+# ni le logging du serveur, seulement pygame (voir sound_cli.py).
+if __name__ == '__main__' and len(sys.argv) > 1 and sys.argv[1] == '--play-sound':
+    from sound_cli import run_sound_cli
+    run_sound_cli() # Termine le processus (sys.exit)
+if __name__ == '__main__' and len(sys.argv) > 1 and sys.argv[1] == '--player-server':
+    from sound_cli import run_player_server
+    run_player_server() # Lecteur persistant des alertes (voir alert_manager.py)
+
+# --- Profilage du démarrage ('backend_server.py --profile-startup', voir startup_profiler.py) ---
+startup_profiler = None
+if __name__ == '__main__' and '--profile-startup' in sys.argv:
+    from startup_profiler import StartupProfiler
+    startup_profiler = StartupProfiler()
+    startup_profiler.import_timer.start()
+
+# --- Démarrage sur la copie locale de la config (voir config_snapshot.py) ---
+# Avant l'import de constants, qui choisit CONFIG_PATH au chargement. Réservé au serveur:
+# les autres programmes (config_tool_tkinter.py...) gardent le partage ou data/.
+from config_snapshot import enable_snapshot_startup
+enable_snapshot_startup()
+
 import os
 import json
 import threading
@@ -8,35 +33,54 @@ import subprocess
 from datetime import datetime, date, timedelta
 import calendar # Ajouté pour calendar.monthrange
 import logging
-from logging.handlers import RotatingFileHandler
-import sys
 import glob
 
 # --- Import des dépendances Web ---
-import requests
 from flask import (Flask, request, jsonify, render_template, Response,
-                   redirect, url_for, flash, send_from_directory) # Fonctions Flask nécessaires
+                   redirect, url_for, flash, send_from_directory, send_file, g, session) # Fonctions Flask nécessaires
 from flask_login import (LoginManager, UserMixin, login_user, logout_user,
                            login_required, current_user) # Flask-Login
 from werkzeug.security import check_password_hash, generate_password_hash
 from werkzeug.utils import secure_filename
 from functools import wraps
-import copy # Added import
+from contextlib import nullcontext
 
 # --- Import des modules locaux ---
 # Utilisation d'un bloc try/except pour une erreur de démarrage plus claire
 try:
     from scheduler import SchedulerManager
-    from constants import (CONFIG_PATH, MP3_PATH, USERS_FILE, PARAMS_FILE,
+    from constants import (CONFIG_PATH, MP3_PATH, MP3_MIRROR_PATH, SOUND_CATALOG_FILE, RING_READY_CACHE_PATH, UPLOAD_TMP_PATH, HISTORY_PATH, STATIC_GZIP_CACHE_PATH, JINJA_CACHE_PATH, USERS_FILE, PARAMS_FILE,
+                           USING_NETWORK_PATH, CONFIG_FROM_SNAPSHOT, SHARE_CONFIG_PATH, LOCAL_CONFIG_SNAPSHOT_PATH,
+                           NETWORK_PROBE_TIMEOUT_SECONDS,
                            DONNEES_SONNERIES_FILE, ROLES_CONFIG_FILE,
                            DEPARTEMENTS_ZONES, LISTE_DEPARTEMENTS, JOURS_SEMAINE_ASSIGNATION, AUCUNE_SONNERIE,
-                           AVAILABLE_PERMISSIONS, DEFAULT_ROLE_PERMISSIONS, FRIENDLY_PERMISSION_NAMES, PERMISSIONS_MODEL) # Ajout des nouvelles constantes
+                           AVAILABLE_PERMISSIONS, DEFAULT_ROLE_PERMISSIONS, FRIENDLY_PERMISSION_NAMES, PERMISSIONS_MODEL, # Ajout des nouvelles constantes
+                           PATH_PROBE_SECONDS)
     from holiday_manager import HolidayManager
+    from status_broadcaster import StatusBroadcaster
+    from permissions import PermissionCache, has_permission
+    from mp3_mirror import Mp3Mirror
+    from config_snapshot import ConfigSnapshot
+    from share_io import ShareIO, ShareTimeoutError
+    from sound_catalog import SoundCatalog, analyze_mp3
+    from audio_analysis import AudioAnalyzer
+    from audio_devices import AudioDeviceCache
+    from alert_manager import AlertManager, PLAYING, LOOPING
+    from process_supervisor import ProcessSupervisor
+    from history_store import HistoryStore, EVENT_TYPES, HISTORY_PAGE_SIZE
+    from metrics import REGISTRY as metrics_registry, CONTENT_TYPE as METRICS_CONTENT_TYPE
+    from request_profiler import RequestProfiler
+    from wsgi_serving import build_waitress_options, describe_waitress_options, gzip_settings, compress_response
+    from static_assets import StaticAssets, ASSET_MAX_AGE_SECONDS
+    from template_cache import PageCache, make_bytecode_cache, warm_templates
+    from upload_sessions import UploadSessionManager, UploadError, move_to_share, UPLOAD_CHUNK_BYTES, SHARE_COPY_TIMEOUT_SECONDS
+    from logging_setup import (setup_logging, stop_logging, get_subsystem_logger,
+                               get_subsystem_levels, set_subsystem_levels)
     MODULES_LOADED = True
 except ImportError as e_imp:
     # Loggue sur stderr si le logger principal n'est pas encore dispo
     print(f"ERREUR CRITIQUE : Impossible d'importer un module essentiel : {e_imp}", file=sys.stderr)
-    print("Vérifiez que tous les fichiers .py (scheduler, constants, holiday_manager) sont présents.", file=sys.stderr)
+    print("Vérifiez que tous les fichiers .py (scheduler, constants, holiday_manager, status_broadcaster, permissions, logging_setup, mp3_mirror, config_snapshot, share_io, sound_catalog, audio_analysis, upload_sessions, audio_devices, alert_manager, metrics, request_profiler, wsgi_serving, static_assets, template_cache) sont présents.", file=sys.stderr)
     MODULES_LOADED = False
     # On ne peut pas continuer sans ces modules
     sys.exit("Arrêt dû à une erreur d'importation de module.")
@@ -46,22 +90,65 @@ except Exception as e_other:
     sys.exit("Arrêt dû à une erreur inattendue pendant l'importation.")
 
 # --- Import Sounddevice (optionnel) ---
-try:
-    import sounddevice as sd
-    SOUNDDEVICE_AVAILABLE = True
-except Exception as e_sd:
-    # logger n'est pas encore dispo si on est avant sa config.
-    # On logue sur stderr pour le moment, puis on reloguera avec le logger principal si besoin.
-    print(f"AVERTISSEMENT: Bibliothèque sounddevice non trouvée ou erreur à l'import: {e_sd}. La sélection de périphérique audio sera limitée.", file=sys.stderr)
-    SOUNDDEVICE_AVAILABLE = False
-    sd = None # Pour éviter des NameError plus loin si on essaie d'y accéder
+# Importé à la première demande de la liste des périphériques audio (import coûteux:
+# charge PortAudio), pas au démarrage.
+_sounddevice_module = None
+_sounddevice_error = None
+
+def get_sounddevice():
+    """Retourne le module sounddevice (importé une seule fois), ou None s'il est indisponible."""
+    global _sounddevice_module, _sounddevice_error
+    if _sounddevice_module is None and _sounddevice_error is None:
+        try:
+            import sounddevice
+            _sounddevice_module = sounddevice
+        except Exception as e_sd:
+            _sounddevice_error = e_sd
+            logger.warning(f"Bibliothèque sounddevice non trouvée ou erreur à l'import: {e_sd}. La sélection de périphérique audio sera limitée.")
+    return _sounddevice_module
+
+
+if startup_profiler:
+    startup_profiler.import_timer.stop()
+    startup_profiler.mark("imports_done")
+    startup_profiler.add_phase("constants:path_probe", PATH_PROBE_SECONDS)
 
+def profile_phase(name: str):
+    """Phase mesurée par le profilage du démarrage (--profile-startup), sans effet sinon."""
+    return startup_profiler.phase(name) if startup_profiler else nullcontext()
 
 # ==============================================================================
 # Configuration de l'Application Flask et des Extensions
 # ==============================================================================
 
-app = Flask(__name__)
+app = Flask(__name__, static_folder=None) # /static servi par serve_static_asset (fichiers versionnés, voir static_assets.py)
+
+# --- Métriques (/metrics, voir metrics.py) ---
+# Adresses autorisées à lire /metrics sans session (relevé Prometheus local) ; les administrateurs connectés y ont toujours accès
+METRICS_ALLOWED_ADDRESSES = ("127.0.0.1", "::1")
+HTTP_REQUEST_SECONDS = metrics_registry.histogram("http_request_duration_seconds", "Durée de traitement des requêtes HTTP.",
+                                                  ("route", "method", "status"))
+CONFIG_LOAD_SECONDS = metrics_registry.histogram("config_load_duration_seconds", "Durée de lecture des fichiers de configuration.", ("file",))
+CONFIG_SAVE_SECONDS = metrics_registry.histogram("config_save_duration_seconds", "Durée d'écriture des fichiers de configuration.", ("file",))
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Durée par route (modèle de l'URL, pas l'URL elle-même: nombre de séries borné) et code de retour."""
+    started = g.pop("request_started", None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "<inconnue>"
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, route=route, method=request.method, status=response.status_code)
+    return response
+
+@app.after_request
+def compress_json_response(response):
+    """Réponses JSON volumineuses (calendrier annuel, utilisateurs, rôles) compressées en gzip (voir wsgi_serving.py)."""
+    min_size, level = gzip_settings(college_params)
+    return compress_response(response, request.headers.get("Accept-Encoding"), min_size, level)
 
 @app.context_processor
 def utility_processor():
@@ -71,7 +158,10 @@ def utility_processor():
         if hasattr(current_user, 'is_authenticated') and current_user.is_authenticated:
             return user_has_permission(current_user, permission_name)
         return False
-    return dict(user_has_permission=check_permission)
+    def asset_url(filename):
+        # URL versionnée d'un fichier statique (mise en cache longue durée, voir static_assets.py)
+        return url_for('static', filename=filename, v=static_assets.url_version(filename))
+    return dict(user_has_permission=check_permission, asset_url=asset_url)
 
 # --- Clé Secrète (TRÈS IMPORTANT) ---
 # À CHANGER ABSOLUMENT pour une valeur complexe et unique en production !
@@ -95,45 +185,17 @@ def user_has_permission(user, permission_name: str) -> bool:
     """
     Vérifie si un utilisateur possède une permission spécifique.
     Prend en compte la permission spéciale 'admin:has_all_permissions'.
+    user.permissions est l'ensemble compilé par load_user (voir permissions.py).
     """
     if not user or not hasattr(user, 'is_authenticated') or not user.is_authenticated:
         return False # Utilisateur non valide ou non authentifié
 
-    user_permissions = getattr(user, 'permissions', {}) # Devrait être un dict
-    if not isinstance(user_permissions, dict):
-        logger.error(f"Attribut 'permissions' invalide pour l'utilisateur '{user.id}'. Attendu: dict, Reçu: {type(user_permissions)}")
+    user_permissions = getattr(user, 'permissions', None)
+    if not isinstance(user_permissions, frozenset):
+        logger.error(f"Attribut 'permissions' invalide pour l'utilisateur '{user.id}'. Attendu: frozenset, Reçu: {type(user_permissions)}")
         return False # Traiter comme si aucune permission pour la sécurité
 
-    # Vérification de la permission spéciale 'admin:has_all_permissions'
-    if user_permissions.get("admin:has_all_permissions") is True:
-        logger.debug(f"Permission accordée à '{user.id}' via 'admin:has_all_permissions' pour '{permission_name}'.")
-        return True
-
-    # Logique principale de vérification
-    if ":" in permission_name:
-        section, action = permission_name.split(":", 1)
-        if section == "page":
-            # Les permissions de type "page:..." sont des clés directes
-            has_perm = user_permissions.get(permission_name) is True
-            logger.debug(f"Check perm page: '{permission_name}' for user '{user.id}'. Result: {has_perm}. User perms: {user_permissions}")
-            return has_perm
-        else:
-            # Permissions granulaires (ex: "sound:upload")
-            section_permissions = user_permissions.get(section)
-            if isinstance(section_permissions, dict):
-                has_perm = section_permissions.get(action) is True
-                logger.debug(f"Check perm granular: '{permission_name}' (section '{section}', action '{action}') for user '{user.id}'. Result: {has_perm}. Section perms: {section_permissions}")
-                return has_perm
-            else:
-                # Si la section n'est pas un dict (ou n'existe pas, get renverra None), l'action n'est pas autorisée
-                logger.debug(f"Check perm granular: Section '{section}' non trouvée ou invalide pour '{permission_name}' for user '{user.id}'. User perms: {user_permissions}")
-                return False
-    else:
-        # Fallback pour permissions sans ':' (ancien style, ne devrait plus arriver)
-        # Ou pour des permissions de premier niveau qui ne sont pas des pages (ex: "admin:has_all_permissions" déjà géré)
-        has_perm = user_permissions.get(permission_name) is True
-        logger.debug(f"Check perm direct: '{permission_name}' for user '{user.id}'. Result: {has_perm}. User perms: {user_permissions}")
-        return has_perm
+    return has_permission(user_permissions, permission_name)
 
 def permission_access_denied(permission_name: str):
     """
@@ -183,41 +245,16 @@ except OSError as e:
     print(f"AVERTISSEMENT: Impossible de créer le dossier logs {LOG_DIR}: {e}", file=sys.stderr)
     LOG_FILE = None # Désactiver logging fichier si dossier non créable
 
-# Créer et configurer le logger principal
-logger = logging.getLogger('sonnerie_backend')
+# Créer et configurer le logger principal (écritures fichier/console sur un thread dédié, voir logging_setup.py)
 # --- Niveau de Log Principal ---
-# Mettre DEBUG pour voir tous les détails, INFO pour moins de verbosité
-logger.setLevel(logging.INFO)
+# Mettre DEBUG pour voir tous les détails, INFO pour moins de verbosité (réglable à chaud par sous-système)
+logger = setup_logging(LOG_FILE, level=logging.INFO)
 # -------------------------------
-logger.propagate = False # Éviter double logging si logger racine configuré
-log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - [%(threadName)s] - %(name)s:%(lineno)d - %(message)s') # Ajout lineno
-
-# Handler pour écrire dans un fichier rotatif
-if LOG_FILE:
-    try:
-        file_handler = RotatingFileHandler(LOG_FILE, maxBytes=5*1024*1024, backupCount=3, encoding='utf-8') # 5MB x 3 fichiers
-        # --- Niveau Log Fichier ---
-        file_handler.setLevel(logging.INFO) # Ou DEBUG si besoin
-        # --------------------------
-        file_handler.setFormatter(log_formatter)
-        logger.addHandler(file_handler)
-    except Exception as e:
-         print(f"AVERTISSEMENT: Échec création handler log fichier {LOG_FILE}: {e}", file=sys.stderr)
-
-# Handler pour afficher les logs dans la console (stderr, visible via NSSM/systemd)
-console_handler = logging.StreamHandler(sys.stderr)
-# --- Niveau Log Console ---
-console_handler.setLevel(logging.INFO) # Ou DEBUG si besoin
-# --------------------------
-console_handler.setFormatter(log_formatter)
-# Ajouter seulement si pas déjà présent (évite doublons si script relancé)
-if not any(isinstance(h, logging.StreamHandler) and h.stream == sys.stderr for h in logger.handlers):
-    logger.addHandler(console_handler)
 
 logger.info("="*60)
 logger.info(" démarrage du Logger Principal - Sonnerie Backend ".center(60, "="))
 logger.info(f"Répertoire de base: {BASE_DIR}")
-logger.info(f"Chemin Configuration: {CONFIG_PATH if CONFIG_PATH else 'Non défini/Inaccessible !'}")
+logger.info(f"Chemin Configuration: {CONFIG_PATH if CONFIG_PATH else 'Non défini/Inaccessible !'}{' (copie locale, partage sondé en arrière-plan)' if CONFIG_FROM_SNAPSHOT else ''}")
 logger.info(f"Chemin MP3: {MP3_PATH if MP3_PATH else 'Non défini/Inaccessible !'}")
 logger.info(f"Fichier Log: {LOG_FILE if LOG_FILE else 'Désactivé'}")
 logger.info("="*60)
@@ -226,7 +263,8 @@ logger.info("="*60)
 if not CONFIG_PATH or not os.path.isdir(CONFIG_PATH):
     logger.critical(f"Le chemin de configuration CONFIG_PATH ('{CONFIG_PATH}') est invalide ou inaccessible. Arrêt.")
     sys.exit("Erreur chemin configuration.")
-if not MP3_PATH or not os.path.isdir(MP3_PATH):
+# Démarrage sur la copie locale: le partage (et donc MP3_PATH) peut être injoignable, les sons sont lus dans le miroir local
+if not CONFIG_FROM_SNAPSHOT and (not MP3_PATH or not os.path.isdir(MP3_PATH)):
     logger.critical(f"Le chemin des MP3 MP3_PATH ('{MP3_PATH}') est invalide ou inaccessible. Arrêt.")
     sys.exit("Erreur chemin MP3.")
 
@@ -234,27 +272,6 @@ if not MP3_PATH or not os.path.isdir(MP3_PATH):
 # Définitions Globales et Initialisation des Managers
 # ==============================================================================
 
-def _merge_permissions(base_perms, override_perms):
-    """
-    Merges override_perms into base_perms.
-    Override_perms takes precedence.
-    This is a deep merge for nested dictionaries.
-    """
-    if not isinstance(override_perms, dict) or not override_perms:
-        # If override_perms is None, empty, or not a dict, return a deep copy of base_perms
-        return copy.deepcopy(base_perms)
-
-    merged = copy.deepcopy(base_perms)
-
-    for key, override_value in override_perms.items():
-        if isinstance(override_value, dict) and isinstance(merged.get(key), dict):
-            # If both current value in merged and override_value are dicts, recurse
-            merged[key] = _merge_permissions(merged[key], override_value)
-        else:
-            # Otherwise, override_value takes precedence (it could be a boolean or a new sub-dict)
-            merged[key] = copy.deepcopy(override_value) # deepcopy override_value as well for safety
-    return merged
-
 # --- Classe Utilisateur pour Flask-Login ---
 class User(UserMixin):
     """Représente un utilisateur connecté."""
@@ -262,7 +279,7 @@ class User(UserMixin):
         self.id = id
         self.role = role
         self.nom_complet = nom_complet
-        self.permissions = permissions if permissions is not None else {}
+        self.permissions = permissions if permissions is not None else frozenset() # Permissions compilées "section:action"
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -271,26 +288,15 @@ def load_user(user_id):
     if user_info and isinstance(user_info, dict):
         user_role = user_info.get("role", "lecteur")
         user_nom_complet = user_info.get("nom_complet", "")
-        # Récupérer les permissions pour ce rôle depuis roles_config_data
-        role_permissions_base = roles_config_data.get("roles", {}).get(user_role, {}).get("permissions", {})
-        custom_permissions_override = user_info.get("custom_permissions") # This could be None or {}
-
-        if custom_permissions_override is not None and isinstance(custom_permissions_override, dict) and custom_permissions_override: # Check if it's a non-empty dict
-            logger.debug(f"User '{user_id}' has custom permissions. Merging with role '{user_role}' permissions. Custom: {custom_permissions_override}")
-            effective_permissions = _merge_permissions(role_permissions_base, custom_permissions_override)
-        else:
-            logger.debug(f"User '{user_id}' using role '{user_role}' permissions directly (no valid/non-empty custom overrides found).")
-            effective_permissions = copy.deepcopy(role_permissions_base) # Make a copy
-
-        logger.debug(f"Effective permissions for user '{user_id}' (role '{user_role}'): {effective_permissions}")
+        # Permissions du rôle + surcharges éventuelles (custom_permissions), compilées et mises en cache
+        effective_permissions = permission_cache.get(roles_config_data, user_role, user_info.get("custom_permissions"))
         return User(user_id, role=user_role, nom_complet=user_nom_complet, permissions=effective_permissions)
     elif isinstance(user_info, str): # Fallback pour ancien format (juste le hash, users.json ne devrait plus en avoir)
          logger.warning(f"Utilisateur '{user_id}' avec ancien format de données (hash seul). Rôle 'lecteur' par défaut.")
          # Pour le fallback, on assigne les permissions du rôle "lecteur" depuis roles_config_data
          # Pas de gestion de custom_permissions pour l'ancien format, on utilise directement les permissions du rôle 'lecteur'.
-         fallback_role_permissions = roles_config_data.get("roles", {}).get("lecteur", {}).get("permissions", {})
-         logger.debug(f"Effective permissions for legacy user '{user_id}' (role 'lecteur'): {fallback_role_permissions}")
-         return User(user_id, role="lecteur", nom_complet="Utilisateur (format obsolète)", permissions=copy.deepcopy(fallback_role_permissions))
+         fallback_role_permissions = permission_cache.get(roles_config_data, "lecteur")
+         return User(user_id, role="lecteur", nom_complet="Utilisateur (format obsolète)", permissions=fallback_role_permissions)
     logger.warning(f"Tentative chargement utilisateur inexistant ou format invalide: {user_id}")
     return None # Indique à Flask-Login que l'utilisateur n'est plus valide
 
@@ -303,14 +309,133 @@ planning_exceptions = {}
 roles_config_data = {}
 
 # --- Instances des gestionnaires ---
-# Initialiser HolidayManager (passe le logger et le dossier cache)
-holiday_manager = HolidayManager(logger, cache_dir=CONFIG_PATH)
+# HolidayManager: créé au premier load_all_configs() (il lit le cache des fériés), pas à l'import
+holiday_manager = None
+
+# Accès au partage avec délai borné (copie locale en secours), latences exposées dans /api/status
+share_io = ShareIO(get_subsystem_logger("share_io"), timeout=NETWORK_PROBE_TIMEOUT_SECONDS,
+                   on_health_change=lambda: publish_status())
+
+# Tous les sous-processus audio (sonneries, lecteur d'alertes, analyses): récupération, plafonds, consommation
+process_supervisor = ProcessSupervisor(get_subsystem_logger("processes"))
+
+# Catalogue des MP3 (durée, fréquence, décodage...), sur le disque local: les pages et routes des sons le lisent
+# au lieu d'interroger le partage. Rafraîchi après chaque synchro du miroir MP3 et à chaque scan.
+sound_catalog = SoundCatalog(MP3_PATH, SOUND_CATALOG_FILE, get_subsystem_logger("sound_catalog"), mirror_dir=MP3_MIRROR_PATH,
+                             ring_cache_dir=RING_READY_CACHE_PATH, on_change=lambda: audio_analyzer.analyze_pending(),
+                             share_io=share_io) # Scan et lecture des MP3 du partage à délai borné
+# Mesures crête/sonie de chaque nouveau contenu, en sous-processus (voir audio_analysis.py)
+audio_analyzer = AudioAnalyzer(sound_catalog, get_subsystem_logger("sound_catalog"), process_spawner=process_supervisor.spawn)
+
+# Périphériques de sortie audio en cache (surveillance des branchements), nom exact résolu pour le lecteur
+audio_device_cache = AudioDeviceCache(get_subsystem_logger("audio_devices"), get_sounddevice)
+
+def resolve_audio_device():
+    """Nom exact du périphérique configuré pour les sonneries et alertes (None: périphérique par défaut)."""
+    return audio_device_cache.resolve(college_params.get("nom_peripherique_audio_sonneries"))
+
+# Uploads de sons par morceaux avec reprise: fichier temporaire local, copie sur le partage à la validation
+MAX_SOUND_UPLOAD_MB = 50
+upload_sessions = UploadSessionManager(UPLOAD_TMP_PATH, logger, max_size=MAX_SOUND_UPLOAD_MB * 1024 * 1024)
+
+# Permissions compilées par (rôle, surcharges, version), invalidées à chaque modification des rôles/utilisateurs
+permission_cache = PermissionCache(get_subsystem_logger("permissions"))
+
+# Diffusion du statut en direct (SSE) vers les pages ouvertes
+status_broadcaster = StatusBroadcaster(get_subsystem_logger("status"))
+config_version = 0 # Incrémenté à chaque (re)chargement de la configuration
+scheduler_status = None # Dernier statut publié par le SchedulerManager (voir on_scheduler_status)
+
+# Historique des sonneries et alertes (ajout seul, cumuls journaliers), consultable par /api/history
+history_store = HistoryStore(HISTORY_PATH, get_subsystem_logger("history"))
+
+alert_logger = get_subsystem_logger("alerts")
+# État des alertes et lecteur persistant (arrêt immédiat, sans attendre la fin d'un processus)
+alert_manager = AlertManager([sys.executable, os.path.abspath(__file__), '--player-server'], alert_logger,
+                             on_change=lambda: publish_status(), process_spawner=process_supervisor.spawn,
+                             history_recorder=history_store.record) # Issue inscrite à la réponse du lecteur (démarrée / erreur)
+
+def _child_process_counts():
+    stats = process_supervisor.get_counts()
+    return {(kind,): stats["by_kind"].get(kind, 0) for kind in set(stats["limits"]) | set(stats["by_kind"])}
+
+def _child_process_totals():
+    counters = process_supervisor.get_counts()["counters"]
+    return {(event,): value for event, value in counters.items()}
+
+metrics_registry.gauge("child_processes", "Sous-processus audio en cours, par type.", ("kind",), callback=_child_process_counts)
+metrics_registry.counter("child_processes_events_total", "Sous-processus audio lancés, récupérés, tués ou refusés.",
+                         ("event",), callback=_child_process_totals)
+
+# Profilage des requêtes lentes, désactivé par défaut (activation par un administrateur: /api/admin/profiling)
+request_profiler = RequestProfiler(app.wsgi_app, os.path.join(LOG_DIR, 'profiles'), logger)
+app.wsgi_app = request_profiler
+
+# Fichiers statiques versionnés et précompressés (copies gzip écrites au démarrage, voir static_assets.py)
+static_assets = StaticAssets(os.path.join(BASE_DIR, 'static'), STATIC_GZIP_CACHE_PATH, logger)
+
+# Pages HTML rendues, par ensemble de permissions (vidé à chaque rechargement de la config, voir template_cache.py)
+page_cache = PageCache(logger)
+PAGE_CACHE_REQUESTS = metrics_registry.counter("page_cache_requests_total", "Pages HTML servies depuis le cache ou rendues.", ("result",))
+
+def render_page(template_name: str, **context) -> str:
+    """
+    render_template d'une page de l'application avec cache du HTML rendu.
+    Le contexte passé ne doit dépendre que des permissions de l'utilisateur (ou être constant).
+    """
+    if app.jinja_env.auto_reload or session.get('_flashes'): # Mode debug, ou messages à afficher une seule fois
+        PAGE_CACHE_REQUESTS.inc(result="bypass")
+        return render_template(template_name, **context)
+    key = (template_name, current_user.permissions, request.script_root)
+    html, cached = page_cache.get_or_render(key, lambda: render_template(template_name, **context))
+    PAGE_CACHE_REQUESTS.inc(result="hit" if cached else "miss")
+    return html
 
 # Le scheduler sera initialisé après chargement config dans le bloc __main__
 scheduler_thread = None
 schedule_manager = None
-alert_process = None # Référence au subprocess de l'alerte active
-current_alert_filename = None # Nom du fichier de l'alerte active
+mp3_mirror = None # Miroir local des MP3 (initialisé dans le bloc __main__, voir start_mp3_mirror)
+config_snapshot = None # Copie locale de CONFIG_PATH (initialisée dans le bloc __main__, voir start_config_snapshot)
+
+
+# ==============================================================================
+# Accès Fichiers (partage réseau à délai borné, voir share_io.py)
+# ==============================================================================
+
+def local_copy_path(path):
+    """Copie locale d'un chemin du partage (copie de la config ou miroir MP3), None s'il n'y en a pas."""
+    if not USING_NETWORK_PATH:
+        return None # Dossiers locaux (data/): pas de copie
+    for share_dir, local_dir in ((SHARE_CONFIG_PATH, LOCAL_CONFIG_SNAPSHOT_PATH), (MP3_PATH, MP3_MIRROR_PATH)):
+        if path == share_dir or path.startswith(share_dir + os.sep):
+            return local_dir + path[len(share_dir):] if os.path.isdir(local_dir) else None
+    return None
+
+def read_json_file(path):
+    """Lit un fichier JSON (délai borné sur le partage, copie locale en secours). Lève FileNotFoundError/JSONDecodeError comme open()."""
+    with CONFIG_LOAD_SECONDS.time(file=os.path.basename(path)):
+        return share_io.read_json(path, cache_path=local_copy_path(path))
+
+def write_json_file(path, data):
+    """Écrit un fichier JSON. Si le partage ne répond pas, écrit la copie locale (renvoyée sur le partage à la réconciliation)."""
+    with CONFIG_SAVE_SECONDS.time(file=os.path.basename(path)):
+        share_io.write_json(path, data, cache_path=local_copy_path(path))
+
+def path_exists(path):
+    """os.path.exists à délai borné. Un partage qui ne répond pas (sans copie locale) compte comme absent."""
+    try:
+        return share_io.exists(path, cache_path=local_copy_path(path))
+    except ShareTimeoutError as e:
+        logger.warning(f"{e}: chemin considéré comme inaccessible.")
+        return False
+
+def path_isdir(path):
+    """os.path.isdir à délai borné (même logique que path_exists)."""
+    try:
+        return share_io.isdir(path, cache_path=local_copy_path(path))
+    except ShareTimeoutError as e:
+        logger.warning(f"{e}: dossier considéré comme inaccessible.")
+        return False
 
 
 # ==============================================================================
@@ -327,8 +452,7 @@ def load_users(filename=USERS_FILE):
     needs_saving = False
 
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            users_data_from_file = json.load(f)
+        users_data_from_file = read_json_file(path)
         logger.info(f"Fichier utilisateurs '{filename}' chargé ({len(users_data_from_file)} entrées).")
     except FileNotFoundError:
         logger.info(f"Fichier utilisateurs '{filename}' non trouvé. Initialisation avec un dictionnaire vide.")
@@ -454,8 +578,7 @@ def load_roles_config(filename=ROLES_CONFIG_FILE):
     default_roles_config = {"roles": {}} # Structure par défaut minimale
 
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            loaded_data = json.load(f)
+        loaded_data = read_json_file(path)
         # Valider la structure de base (doit contenir une clé "roles" qui est un dict)
         if isinstance(loaded_data, dict) and isinstance(loaded_data.get("roles"), dict):
             roles_config_data = loaded_data
@@ -508,11 +631,11 @@ def load_roles_config(filename=ROLES_CONFIG_FILE):
 
 def save_roles_config(filename=ROLES_CONFIG_FILE):
     """Sauvegarde la configuration des rôles (roles_config_data) dans le fichier JSON."""
+    permission_cache.invalidate("rôles modifiés") # roles_config_data a été modifié en mémoire
     path = os.path.join(CONFIG_PATH, filename)
     logger.info(f"Sauvegarde de la configuration des rôles dans: {path}")
     try:
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(roles_config_data, f, indent=2, ensure_ascii=False)
+        write_json_file(path, roles_config_data)
         logger.info(f"Configuration des rôles sauvegardée avec succès ({len(roles_config_data.get('roles', {}))} rôles).")
         return True
     except Exception as e:
@@ -521,11 +644,11 @@ def save_roles_config(filename=ROLES_CONFIG_FILE):
 
 def save_users_data(filename=USERS_FILE):
     """Sauvegarde la configuration des utilisateurs (users_data) dans le fichier JSON."""
+    permission_cache.invalidate("utilisateurs modifiés") # users_data a été modifié en mémoire
     path = os.path.join(CONFIG_PATH, filename)
     logger.info(f"Sauvegarde des données utilisateurs dans: {path}")
     try:
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(users_data, f, indent=2, ensure_ascii=False)
+        write_json_file(path, users_data)
         logger.info(f"Données utilisateurs sauvegardées avec succès ({len(users_data)} utilisateurs).")
         return True
     except Exception as e:
@@ -543,8 +666,7 @@ def load_college_params(filename=PARAMS_FILE):
         # Ajoutez ici d'autres valeurs par défaut si nécessaire pour d'autres clés
     }
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            loaded_params_from_file = json.load(f)
+        loaded_params_from_file = read_json_file(path)
 
         # Fusionner les paramètres chargés avec les valeurs par défaut
         # Les valeurs du fichier écrasent les valeurs par défaut si elles existent
@@ -561,7 +683,8 @@ def load_college_params(filename=PARAMS_FILE):
         api_url = college_params.get('api_holidays_url')
         country = college_params.get('country_code_holidays', 'FR')
         if holiday_manager:
-            holiday_manager.load_holidays_from_api(api_url, country) # Log interne à HM
+            with profile_phase("holidays:api"):
+                holiday_manager.load_holidays_from_api(api_url, country) # Log interne à HM
         else:
             logger.error("HolidayManager non initialisé, impossible de charger les jours fériés.")
         return True
@@ -585,14 +708,16 @@ def load_sonneries_data(filename=DONNEES_SONNERIES_FILE):
     global day_types, weekly_planning, planning_exceptions, holiday_manager, college_params
     path = os.path.join(CONFIG_PATH, filename); logger.info(f"Load sonneries data: {path}")
     try:
-        with open(path, 'r', encoding='utf-8') as f: data = json.load(f)
+        data = read_json_file(path)
         day_types = data.get("journees_types", {}); weekly_planning = data.get("planning_hebdomadaire", {})
         planning_exceptions = data.get("exceptions_planning", {}); logger.info(f"Sonneries data OK.")
         # Charger vacances après, en utilisant zone et url manuelle des params déjà chargés
         ics_path_local = data.get('vacances', {}).get('ics_file_path')
         zone = college_params.get('zone') # Lire la zone
         manual_url = college_params.get("vacances_ics_base_url_manuel") # Lire URL manuelle
-        if holiday_manager: holiday_manager.load_vacations(zone=zone, local_ics_path=ics_path_local, manual_ics_base_url=manual_url)
+        if holiday_manager:
+            with profile_phase("holidays:vacations_ics"):
+                holiday_manager.load_vacations(zone=zone, local_ics_path=ics_path_local, manual_ics_base_url=manual_url)
         else: logger.error("HolidayManager non init pour load vacations.")
         return True
     except FileNotFoundError: logger.info(f"Sonneries data file not found: {path}. Init vide."); day_types={}; weekly_planning={}; planning_exceptions={}; return True
@@ -602,21 +727,157 @@ def load_sonneries_data(filename=DONNEES_SONNERIES_FILE):
 def load_all_configs():
     """Charge toutes les configurations dans le bon ordre."""
     logger.info("Chargement de toutes les configurations...")
+    global holiday_manager
+    if holiday_manager is None:
+        with profile_phase("holidays:init_cache"):
+            holiday_manager = HolidayManager(get_subsystem_logger("holidays"), cache_dir=CONFIG_PATH)
     # Ordre: Params (pour zone/URL) -> Sonneries (utilise params) -> Roles -> Users (utilise roles)
-    success_params = load_college_params()
-    success_sonneries = load_sonneries_data()
-    success_roles = load_roles_config()
-    success_users = load_users() # load_users peut dépendre de roles_config pour la validation des rôles
+    with profile_phase(f"config:{PARAMS_FILE}"):
+        success_params = load_college_params()
+    with profile_phase(f"config:{DONNEES_SONNERIES_FILE}"):
+        success_sonneries = load_sonneries_data()
+    with profile_phase(f"config:{ROLES_CONFIG_FILE}"):
+        success_roles = load_roles_config()
+    with profile_phase(f"config:{USERS_FILE}"):
+        success_users = load_users() # load_users peut dépendre de roles_config pour la validation des rôles
     all_ok = success_params and success_sonneries and success_roles and success_users
+    permission_cache.invalidate("rechargement configuration")
+    page_cache.invalidate("rechargement configuration")
     if all_ok: logger.info("Chargement configs terminé (sans erreur de format).")
     else: logger.error("Erreur de format ou inattendue lors chargement config.")
+    global config_version
+    config_version += 1
+    publish_status()
     return all_ok
 
 
+# ==============================================================================
+# Statut Global et Diffusion en Direct (SSE)
+# ==============================================================================
+
+def build_status_payload():
+    """Construit le statut visible par les pages (sans modifier l'état des alertes)."""
+    sch_status = scheduler_status or {
+        "scheduler_running": False, "next_ring_time": None, "next_ring_label": None,
+        "last_error": "Scheduler non initialisé"
+    }
+
+    alert = alert_manager.get_status()
+    alert_is_active = alert["state"] in (PLAYING, LOOPING)
+
+    mirror_status = None
+    if mp3_mirror:
+        mirror = mp3_mirror.get_status(get_referenced_sound_files())
+        # last_sync change à chaque passage: seule la dernière synchro réussie est publiée
+        mirror_status = {"last_success": mirror["last_success"], "missing": mirror["missing"], "error": mirror["error"]}
+
+    share_health = share_io.get_health()
+    share_status = {"healthy": share_health["healthy"], "p95_ms": share_health["p95_ms"], "timeouts": share_health["timeouts"]}
+
+    return {
+        "scheduler_running": sch_status["scheduler_running"],
+        "next_ring_time": sch_status["next_ring_time"],
+        "next_ring_label": sch_status["next_ring_label"],
+        "last_error": sch_status["last_error"] or "Aucune",
+        "alert_active": alert_is_active,
+        "alert_type": alert["filename"] if alert_is_active else None,
+        "alert_state": alert["state"],
+        "config_version": config_version,
+        "mp3_mirror": mirror_status,
+        "share": share_status
+    }
+
+# Construction + publication sous un même verrou: un statut construit avant un autre ne peut pas
+# être publié après lui (publications concurrentes: requêtes, scheduler, lecteur d'alertes, partage)
+status_publish_lock = threading.RLock()
+
+def publish_status():
+    """Publie le statut courant vers les flux SSE (sans effet si rien n'a changé)."""
+    try:
+        with status_publish_lock:
+            status_broadcaster.publish(build_status_payload())
+    except Exception as e:
+        logger.error(f"Erreur lors de la publication du statut: {e}", exc_info=True)
+
+def on_scheduler_status(sch_status):
+    """Callback du SchedulerManager: mémorise son statut et le republie."""
+    global scheduler_status
+    scheduler_status = sch_status
+    if startup_profiler: startup_profiler.mark("scheduler_first_status") # Prochaine sonnerie calculée: l'application peut sonner
+    publish_status()
+
 # ==============================================================================
 # Initialisation et Contrôle du Scheduler
 # ==============================================================================
 
+def get_referenced_sound_files():
+    """Noms des fichiers son utilisés par la configuration (journées types et alertes)."""
+    referenced = {college_params.get(key) for key in ("sonnerie_ppms", "sonnerie_attentat", "sonnerie_fin_alerte")}
+    for day_type in day_types.values():
+        for period in day_type.get("periodes", []):
+            referenced.add(period.get("sonnerie_debut"))
+            referenced.add(period.get("sonnerie_fin"))
+    referenced.discard(None)
+    referenced.discard("")
+    return referenced
+
+def resolve_sound_path(filename):
+    """Chemin de lecture d'un son: copie WAV prête à sonner, sinon copie locale du miroir, sinon MP3_PATH."""
+    ring_ready_path = sound_catalog.get_ring_ready_path(filename)
+    if ring_ready_path:
+        return ring_ready_path
+    if mp3_mirror:
+        return mp3_mirror.resolve(filename)
+    return os.path.join(MP3_PATH, filename)
+
+def on_mp3_mirror_sync():
+    """Après chaque synchro du miroir: statut republié, catalogue des sons mis à jour (analyse depuis le miroir local)."""
+    publish_status()
+    try:
+        sound_catalog.refresh()
+    except OSError as e:
+        logger.warning(f"Catalogue des sons non rafraîchi (dossier MP3 inaccessible): {e}")
+
+def start_mp3_mirror():
+    """Crée et démarre la synchronisation de fond du miroir MP3 local."""
+    global mp3_mirror
+    if mp3_mirror: return
+    sync_interval = college_params.get("mp3_sync_interval_seconds", 300)
+    mp3_mirror = Mp3Mirror(MP3_PATH, MP3_MIRROR_PATH, get_subsystem_logger("mp3_mirror"),
+                           sync_interval_seconds=sync_interval, on_sync=on_mp3_mirror_sync)
+    mp3_mirror.start()
+    logger.info(f"Miroir MP3 local: {MP3_MIRROR_PATH} (synchro toutes les {sync_interval}s).")
+
+def reload_configs_and_scheduler():
+    """Recharge les fichiers de configuration et notifie le scheduler. Retourne True si le chargement est OK."""
+    if not load_all_configs():
+        return False
+    if schedule_manager:
+        audio_device_from_params = college_params.get("nom_peripherique_audio_sonneries")
+        schedule_manager.reload_schedule(day_types, weekly_planning, planning_exceptions, holiday_manager, audio_device_name=audio_device_from_params)
+    return True
+
+def switch_to_share_config(changed_files):
+    """Appelé quand le partage redevient lisible: bascule CONFIG_PATH sur le partage (après réconciliation)."""
+    global CONFIG_PATH
+    if CONFIG_PATH != SHARE_CONFIG_PATH:
+        logger.info(f"Partage joignable: bascule de la configuration de '{CONFIG_PATH}' vers '{SHARE_CONFIG_PATH}'.")
+        CONFIG_PATH = SHARE_CONFIG_PATH
+    if changed_files:
+        logger.info(f"Configuration du partage différente de la copie locale ({', '.join(changed_files)}): rechargement.")
+        if not reload_configs_and_scheduler():
+            logger.error("Échec du rechargement de la configuration après bascule sur le partage.")
+
+def start_config_snapshot():
+    """Démarre la synchronisation de fond entre le partage et la copie locale de la configuration."""
+    global config_snapshot
+    if config_snapshot or not USING_NETWORK_PATH: return # Mode local (dossier data/): rien à copier
+    config_snapshot = ConfigSnapshot(SHARE_CONFIG_PATH, LOCAL_CONFIG_SNAPSHOT_PATH, get_subsystem_logger("config_snapshot"),
+                                     probe_timeout=NETWORK_PROBE_TIMEOUT_SECONDS,
+                                     refresh_interval_seconds=college_params.get("config_snapshot_interval_seconds", 300),
+                                     on_share_available=switch_to_share_config)
+    config_snapshot.start(share_available=not CONFIG_FROM_SNAPSHOT)
+
 def start_scheduler_thread():
     """Tente de démarrer le thread du scheduler si les pré-requis sont OK."""
     global scheduler_thread, schedule_manager
@@ -624,13 +885,18 @@ def start_scheduler_thread():
     if scheduler_thread and scheduler_thread.is_alive(): logger.warning("Scheduler déjà lancé."); return False
     if not day_types: logger.error("Start scheduler échoué: journees_types vide."); return False
     if not weekly_planning: logger.error("Start scheduler échoué: planning_hebdomadaire vide."); return False
-    if not MP3_PATH or not os.path.isdir(MP3_PATH): logger.error(f"Start scheduler échoué: MP3_PATH invalide: {MP3_PATH}"); return False
+    if not MP3_PATH or not path_isdir(MP3_PATH): logger.error(f"Start scheduler échoué: MP3_PATH invalide: {MP3_PATH}"); return False
 
     try:
         logger.info("Création instance SchedulerManager...")
         # schedule_manager = SchedulerManager(day_types, weekly_planning, planning_exceptions, holiday_manager, MP3_PATH, logger) # OLD
         audio_device_from_params = college_params.get("nom_peripherique_audio_sonneries")
-        schedule_manager = SchedulerManager(day_types, weekly_planning, planning_exceptions, holiday_manager, MP3_PATH, logger, audio_device_name=audio_device_from_params) # NEW
+        schedule_manager = SchedulerManager(day_types, weekly_planning, planning_exceptions, holiday_manager, MP3_PATH, get_subsystem_logger("scheduler"), audio_device_name=audio_device_from_params,
+                                            status_callback=on_scheduler_status, sound_resolver=resolve_sound_path,
+                                            sound_duration_resolver=sound_catalog.get_duration,
+                                            audio_device_resolver=audio_device_cache.resolve,
+                                            process_spawner=process_supervisor.spawn,
+                                            history_recorder=history_store.record)
         logger.info("Création thread Scheduler..."); scheduler_thread = threading.Thread(target=schedule_manager.run, name="SchedulerThread"); scheduler_thread.daemon = True; scheduler_thread.start()
         logger.info("Thread Scheduler démarré."); return True
     except Exception as e:
@@ -642,6 +908,33 @@ def start_scheduler_thread():
 # Routes Flask : Authentification et Pages
 # ==============================================================================
 
+@app.route('/static/<path:filename>', endpoint='static')
+def serve_static_asset(filename):
+    """
+    Sert un fichier statique. Demandé avec son empreinte (?v=, voir asset_url), il est
+    mis en cache un an sans revalidation ; sinon revalidé à chaque chargement.
+    Copie gzip précompressée envoyée si le navigateur l'accepte.
+    """
+    asset = static_assets.get(filename)
+    if not asset:
+        return "Fichier introuvable.", 404
+    use_gzip = asset["gz"] and "gzip" in request.headers.get("Accept-Encoding", "").lower()
+    response = send_file(asset["gz"] if use_gzip else asset["path"], mimetype=asset["mimetype"],
+                         download_name=os.path.basename(filename), etag=asset["hash"] + ("-gz" if use_gzip else ""),
+                         conditional=True)
+    if use_gzip:
+        response.headers["Content-Encoding"] = "gzip"
+    if asset["gz"]:
+        response.vary.add("Accept-Encoding")
+    if request.args.get("v") == asset["hash"]:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = ASSET_MAX_AGE_SECONDS
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     """Affiche et traite le formulaire de connexion."""
@@ -686,9 +979,9 @@ def config_general_page():
     # Importer les constantes ici pour les passer au template
     from constants import DEPARTEMENTS_ZONES, LISTE_DEPARTEMENTS
     # On passe current_user et les constantes au template
-    return render_template('config_general.html', current_user=current_user,
-                           constants={"DEPARTEMENTS_ZONES": DEPARTEMENTS_ZONES,
-                                      "LISTE_DEPARTEMENTS": LISTE_DEPARTEMENTS})
+    return render_page('config_general.html', current_user=current_user,
+                       constants={"DEPARTEMENTS_ZONES": DEPARTEMENTS_ZONES,
+                                  "LISTE_DEPARTEMENTS": LISTE_DEPARTEMENTS})
 
 @app.route('/config/weekly')
 @login_required
@@ -698,7 +991,7 @@ def config_weekly_page():
     user_id = current_user.id
     logger.info(f"User '{user_id}' accède à la page /config/weekly")
     # On passe current_user pour la barre de navigation du template
-    return render_template('config_weekly.html', current_user=current_user)
+    return render_page('config_weekly.html', current_user=current_user)
 
 @app.route('/config/day_types')
 @login_required
@@ -709,7 +1002,7 @@ def config_day_types_page():
     logger.info(f"User '{user_id}' accède à la page /config/day_types")
     # On pourrait passer la liste des noms de JT directement ici pour éviter un appel API initial,
     # mais pour l'instant on laisse le JS faire l'appel API.
-    return render_template('config_day_types.html', current_user=current_user)
+    return render_page('config_day_types.html', current_user=current_user)
 
 @app.route('/config/exceptions')
 @login_required
@@ -719,7 +1012,7 @@ def config_exceptions_page():
     user_id = current_user.id
     logger.info(f"User '{user_id}' accède à la page /config/exceptions")
     # On pourrait passer la liste des JT ici pour le select, mais le JS la chargera.
-    return render_template('config_exceptions.html', current_user=current_user)
+    return render_page('config_exceptions.html', current_user=current_user)
 @app.route('/api/config/sounds', methods=['GET'])
 @login_required
 @require_permission("page:view_config_sounds")
@@ -734,9 +1027,8 @@ def get_configured_sounds():
         donnees_path = os.path.join(CONFIG_PATH, DONNEES_SONNERIES_FILE)
         configured_sounds = {}
 
-        if os.path.exists(donnees_path):
-            with open(donnees_path, 'r', encoding='utf-8') as f:
-                donnees_sonneries = json.load(f)
+        if path_exists(donnees_path):
+            donnees_sonneries = read_json_file(donnees_path)
             configured_sounds = donnees_sonneries.get("sonneries", {})
             if not isinstance(configured_sounds, dict):
                 logger.warning(f"Section 'sonneries' invalide dans {DONNEES_SONNERIES_FILE}, retour liste vide.")
@@ -746,7 +1038,7 @@ def get_configured_sounds():
             # Renvoyer un objet vide si le fichier n'existe pas
 
         logger.debug(f"API List Configured Sounds renvoie: {len(configured_sounds)} sonneries")
-        return jsonify({"configured_sounds": configured_sounds}), 200
+        return jsonify({"configured_sounds": configured_sounds, "catalog": sound_catalog.get_summary()}), 200
 
     except json.JSONDecodeError as e_json:
         logger.error(f"Erreur JSON lecture {DONNEES_SONNERIES_FILE} pour API sounds: {e_json}", exc_info=True)
@@ -762,7 +1054,7 @@ def config_sounds_page():
     """Sert la page de configuration des sonneries disponibles."""
     user_id = current_user.id
     logger.info(f"User '{user_id}' accède à la page /config/sounds")
-    return render_template('config_sounds.html', current_user=current_user)
+    return render_page('config_sounds.html', current_user=current_user)
 
 @app.route('/config/users')
 @login_required
@@ -771,11 +1063,11 @@ def config_users_page():
     """Sert la page de gestion des utilisateurs."""
     user_id = current_user.id
     logger.info(f"User '{user_id}' (admin) accède à la page /config/users")
-    return render_template('config_users.html',
-                           current_user=current_user,
-                           available_permissions=AVAILABLE_PERMISSIONS,
-                           default_role_permissions=DEFAULT_ROLE_PERMISSIONS,
-                           friendly_permission_names=FRIENDLY_PERMISSION_NAMES)
+    return render_page('config_users.html',
+                       current_user=current_user,
+                       available_permissions=AVAILABLE_PERMISSIONS,
+                       default_role_permissions=DEFAULT_ROLE_PERMISSIONS,
+                       friendly_permission_names=FRIENDLY_PERMISSION_NAMES)
 
 @app.route('/')
 @login_required
@@ -783,7 +1075,7 @@ def config_users_page():
 def index():
     """Sert la page de contrôle principale (control.html)."""
     user = current_user.id; logger.info(f"User '{user}' accède à '/'...")
-    try: return render_template('control.html', current_user=current_user) # Passer l'user au template
+    try: return render_page('control.html', current_user=current_user) # Passer l'user au template
     except Exception as e: logger.error(f"Erreur rendu template control.html: {e}", exc_info=True); return "Erreur interne serveur.", 500
 
 
@@ -794,52 +1086,29 @@ def index():
 @app.route('/api/status')
 # @login_required # Laisser public pour affichage initial simple
 def api_status():
-    logger.debug("Requête /api/status")
-    global current_alert_filename, alert_process # Accéder aux variables globales
-
-    sch_running = False
-    next_time = None
-    next_label = None
-    last_err = "Scheduler non initialisé"
-
-    alert_is_truly_active = False # Sera déterminée ci-dessous
-
-    # Vérifier l'état du processus d'alerte
-    if alert_process is not None:
-        if alert_process.poll() is None: # Le processus est toujours en cours
-            alert_is_truly_active = True
-            # current_alert_filename devrait déjà être correct s'il est en cours
-        else: # Le processus s'est terminé (ou n'a pas pu démarrer correctement)
-            logger.info(f"Le processus d'alerte pour '{current_alert_filename}' (PID: {alert_process.pid if alert_process else 'N/A'}) semble terminé. Nettoyage de l'état.")
-            # Appeler stop_current_alert_process pour nettoyer current_alert_filename et alert_process
-            # Cela mettra current_alert_filename à None et alert_is_truly_active restera False.
-            stop_current_alert_process()
-            alert_is_truly_active = False # Explicitement False après nettoyage
+    """
+    Renvoie le dernier statut publié (précalculé, voir publish_status).
+    Lecture seule: aucun appel au scheduler ni au processus d'alerte ici.
+    """
+    snapshot = status_broadcaster.get_snapshot()
+    if request.if_none_match.contains(snapshot.etag):
+        response = Response(status=304)
     else:
-        # S'il n'y a pas de processus, current_alert_filename devrait être None.
-        # On s'en assure au cas où.
-        if current_alert_filename is not None:
-            logger.warning(f"alert_process est None, mais current_alert_filename ('{current_alert_filename}') ne l'est pas. Réinitialisation.")
-            current_alert_filename = None
-
-
-    if schedule_manager:
-        sch_running = schedule_manager.is_running()
-        next_time = schedule_manager.get_next_ring_time_iso()
-        next_label = schedule_manager.get_next_ring_label()
-        last_err = schedule_manager.get_last_error()
-
-    status = {
-        "scheduler_running": sch_running,
-        "next_ring_time": next_time,
-        "next_ring_label": next_label,
-        "last_error": last_err or "Aucune",
-        "alert_active": alert_is_truly_active,
-        "alert_type": current_alert_filename if alert_is_truly_active else None, # AJOUT DE LA CLÉ alert_type
-        "current_time": datetime.now().isoformat()
-    }
-    logger.debug(f"Statut renvoyé par /api/status: {status}")
-    return jsonify(status)
+        response = Response(snapshot.body, mimetype='application/json')
+    response.set_etag(snapshot.etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+@app.route('/api/status/stream')
+# Public comme /api/status
+def api_status_stream():
+    """Flux Server-Sent Events poussant le statut à chaque changement (le polling reste en secours)."""
+    if not status_broadcaster.try_acquire_stream():
+        logger.warning(f"Flux SSE refusé: plafond de {status_broadcaster.max_streams} flux simultanés atteint. Le client utilisera le polling.")
+        return jsonify({"error": "Trop de flux de statut ouverts, utilisez /api/status."}), 503
+    logger.debug(f"Ouverture flux SSE ({status_broadcaster.get_stream_count()}/{status_broadcaster.max_streams}).")
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(status_broadcaster.stream(), mimetype='text/event-stream', headers=headers)
 
 @app.route('/api/planning/activate', methods=['POST'])
 @login_required
@@ -865,58 +1134,18 @@ def deactivate_planning():
     else: msg = "Scheduler non initialisé."; code = 500; logger.error(msg)
     return jsonify({"message": msg}), code
 
-# --- Fonction Helper pour arrêter l'alerte ---
-def stop_current_alert_process():
-    """Tente d'arrêter le processus d'alerte courant et réinitialise current_alert_filename."""
-    global alert_process, current_alert_filename # Déclaration des globales
-    action_taken = False
-    if alert_process and alert_process.poll() is None: # Si le processus existe et est en cours
-        pid = alert_process.pid
-        logger.warning(f"Arrêt processus alerte (PID: {pid}) pour l'alerte '{current_alert_filename}'...")
-        try:
-            alert_process.terminate()
-            alert_process.wait(timeout=2) # Attendre que le processus se termine
-            logger.info(f"Alerte (PID: {pid}, type: '{current_alert_filename}') arrêtée (terminate).")
-        except subprocess.TimeoutExpired:
-            logger.error(f"Timeout arrêt alerte (PID:{pid}, type: '{current_alert_filename}'), tentative de kill.")
-            alert_process.kill()
-            alert_process.wait() # Attendre après kill
-            logger.info(f"Alerte (PID: {pid}, type: '{current_alert_filename}') arrêtée (kill).")
-        except Exception as e:
-            logger.error(f"Erreur lors de l'arrêt de l'alerte (PID:{pid}, type: '{current_alert_filename}'): {e}", exc_info=True)
-        finally:
-            alert_process = None
-            current_alert_filename = None # RÉINITIALISER ICI
-            action_taken = True # Une action a été tentée
-    else: # Pas de processus actif ou processus déjà terminé
-        if alert_process: # Le processus existe mais n'est plus en cours (poll() is not None)
-             logger.debug(f"stop_current_alert_process: Processus d'alerte (type: '{current_alert_filename}') déjà terminé. Nettoyage.")
-             alert_process = None # Nettoyer la référence au processus
-        else:
-             logger.debug("stop_current_alert_process: Pas de processus d'alerte actif à arrêter.")
-        current_alert_filename = None # S'ASSURER QUE C'EST RÉINITIALISÉ AUSSI DANS CE CAS
-        # action_taken reste False si aucun processus n'était activement en cours
-    return action_taken
-
 @app.route('/api/alert/trigger/<filename>', methods=['POST'])
 @login_required
 @require_permission("control:alert_trigger_any")
 def trigger_alert(filename):
-    """Déclenche une alerte (arrête la précédente si besoin)."""
+    """Déclenche une alerte (remplace la précédente). '?loop=1' la joue en boucle jusqu'à l'arrêt."""
     user = current_user.id
-    global alert_process, current_alert_filename # Déclaration des globales
-    logger.info(f"User '{user}': Trigger alert: {filename}")
+    alert_logger.info(f"User '{user}': Trigger alert: {filename}")
 
-    logger.info("Vérification et arrêt alerte précédente...");
-    stop_current_alert_process() # Cela va aussi mettre current_alert_filename à None
-
-    if not MP3_PATH or not os.path.isdir(MP3_PATH):
-        logger.error(f"Trigger alert échoué: MP3_PATH invalide: {MP3_PATH}")
-        return jsonify({"error": "Config MP3 invalide."}), 500
-
-    sound_path = os.path.join(MP3_PATH, filename)
+    sound_path = resolve_sound_path(filename) # Copie locale du miroir si disponible
     if not os.path.isfile(sound_path):
-        logger.error(f"Alert file not found: {sound_path}")
+        alert_logger.error(f"Alert file not found: {sound_path}")
+        history_store.record("alert", "missing", sound=filename, user=user, error=f"Fichier introuvable: {sound_path}")
         return jsonify({"error": f"Fichier alerte '{filename}' introuvable."}), 404
 
     try:
@@ -930,35 +1159,26 @@ def trigger_alert(filename):
             return permission_access_denied("control:alert_trigger_attentat")
         # Si ce n'est ni PPMS ni Attentat, la permission "control:alert_trigger_any" est suffisante (déjà vérifiée par le décorateur).
 
-        logger.info(f"Lancement processus alerte '{filename}' (non-boucle)...")
-        audio_device_name = college_params.get("nom_peripherique_audio_sonneries")
-        cmd = [sys.executable, __file__, '--play-sound', sound_path]
-        if audio_device_name:
-            cmd.extend(['--device', audio_device_name])
-            logger.info(f"Triggering alert '{filename}' on device: {audio_device_name}")
-        else:
-            logger.info(f"Triggering alert '{filename}' on default device.")
-
-        logger.debug(f"Cmd: {' '.join(cmd)}")
-        flags = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-        alert_process = subprocess.Popen(cmd, creationflags=flags)
-        current_alert_filename = filename  # STOCKER LE NOM DU FICHIER
-        logger.info(f"Nouveau processus alerte démarré (PID: {alert_process.pid}) pour '{current_alert_filename}'.")
+        loop = request.args.get("loop") in ("1", "true")
+        device = resolve_audio_device()
+        alert_manager.trigger(filename, sound_path, device=device, loop=loop,
+                              history={"event_type": "alert", "user": user, "label": "boucle" if loop else None})
         return jsonify({"message": f"Alerte '{filename}' déclenchée."}), 200
     except Exception as e:
-        logger.error(f"Erreur lancement processus alerte: {e}", exc_info=True)
-        alert_process = None
-        current_alert_filename = None # RÉINITIALISER EN CAS D'ERREUR
+        alert_logger.error(f"Erreur lancement alerte: {e}", exc_info=True)
+        history_store.record("alert", "error", sound=filename, user=user, error=str(e))
         return jsonify({"error": f"Erreur serveur: {e}"}), 500
 
 @app.route('/api/alert/stop', methods=['POST'])
 @login_required
 @require_permission("control:alert_stop")
 def stop_alert():
-    """Arrête l'alerte active."""
-    user = current_user.id; logger.info(f"User '{user}': Stop alert via API")
-    stopped = stop_current_alert_process()
-    return jsonify({"message": "Tentative d'arrêt effectuée." if stopped else "Aucune alerte active."}), 200
+    """Arrête l'alerte active (le son est coupé sans attendre la fin du lecteur)."""
+    user = current_user.id; alert_logger.info(f"User '{user}': Stop alert via API")
+    stopped = alert_manager.stop()
+    if stopped:
+        history_store.record("alert_stop", "ok", user=user)
+    return jsonify({"message": "Alerte arrêtée." if stopped else "Aucune alerte active."}), 200
 
 @app.route('/api/alert/end', methods=['POST'])
 @login_required
@@ -966,47 +1186,33 @@ def stop_alert():
 def end_alert():
     """Arrête l'alerte en cours ET joue le son de fin d'alerte."""
     user = current_user.id
-    logger.info(f"User '{user}': Déclenchement FIN d'alerte")
-    global alert_process # On va lire college_params
+    alert_logger.info(f"User '{user}': Déclenchement FIN d'alerte")
 
-    # 1. Arrêter l'alerte en cours
-    logger.info("Arrêt de l'alerte en cours (si active)...")
-    stop_current_alert_process() # Utilise la fonction helper
-
-    # 2. Jouer le son de fin d'alerte
     fin_alerte_filename = college_params.get("sonnerie_fin_alerte")
     if not fin_alerte_filename:
-        logger.warning("Aucune sonnerie de fin d'alerte configurée.")
+        alert_logger.warning("Aucune sonnerie de fin d'alerte configurée.")
+        alert_manager.stop()
+        history_store.record("alert_stop", "ok", user=user)
         # On retourne succès quand même, car l'alerte principale est arrêtée
         return jsonify({"message": "Alerte arrêtée (pas de son de fin configuré)."}), 200
 
-    # Vérifier MP3_PATH et fichier
-    if not MP3_PATH or not os.path.isdir(MP3_PATH):
-        logger.error(f"Fin alerte échouée: MP3_PATH invalide: {MP3_PATH}")
-        return jsonify({"error": "Config MP3 invalide."}), 500
-    sound_path = os.path.join(MP3_PATH, fin_alerte_filename)
+    # Vérifier le fichier (copie locale du miroir si disponible)
+    sound_path = resolve_sound_path(fin_alerte_filename)
     if not os.path.isfile(sound_path):
-        logger.error(f"Fichier fin d'alerte introuvable: {sound_path}")
+        alert_logger.error(f"Fichier fin d'alerte introuvable: {sound_path}")
+        alert_manager.stop()
+        history_store.record("alert_end", "missing", sound=fin_alerte_filename, user=user, error=f"Fichier introuvable: {sound_path}")
         return jsonify({"error": f"Fichier fin d'alerte '{fin_alerte_filename}' introuvable."}), 404
 
-    # Lancer le son de fin (non bloquant, sans boucle)
+    # Le son de fin remplace directement l'alerte dans le lecteur
     try:
-        logger.info(f"Lancement processus pour son de fin d'alerte: {fin_alerte_filename}")
-        audio_device_name = college_params.get("nom_peripherique_audio_sonneries")
-        cmd = [sys.executable, __file__, '--play-sound', sound_path] # Pas de --loop
-        if audio_device_name:
-            cmd.extend(['--device', audio_device_name])
-            logger.info(f"Playing end_alert sound '{fin_alerte_filename}' on device: {audio_device_name}")
-        else:
-            logger.info(f"Playing end_alert sound '{fin_alerte_filename}' on default device.")
-        logger.debug(f"Cmd fin alerte: {' '.join(cmd)}")
-        flags = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-        # On ne suit pas ce processus
-        subprocess.Popen(cmd, creationflags=flags)
-        logger.info(f"Processus fin d'alerte lancé pour jouer {fin_alerte_filename}.")
+        device = resolve_audio_device()
+        alert_manager.end(fin_alerte_filename, sound_path, device=device, history={"event_type": "alert_end", "user": user})
         return jsonify({"message": f"Fin d'alerte déclenchée ({fin_alerte_filename})."}), 200
     except Exception as e:
-        logger.error(f"Erreur lancement processus fin d'alerte: {e}", exc_info=True)
+        alert_logger.error(f"Erreur lancement son de fin d'alerte: {e}", exc_info=True)
+        alert_manager.stop()
+        history_store.record("alert_end", "error", sound=fin_alerte_filename, user=user, error=str(e))
         return jsonify({"error": f"Erreur serveur lancement fin alerte: {e}"}), 500
 
 @app.route('/api/config/reload', methods=['POST'])
@@ -1032,6 +1238,85 @@ def reload_config_route():
         return jsonify({"message": msg}), 200
     except Exception as e: logger.error(f"Erreur majeure reload config API: {e}", exc_info=True); return jsonify({"error": f"Erreur serveur reload: {e}"}), 500
 
+@app.route('/api/admin/log_levels', methods=['GET'])
+@login_required
+@require_permission("admin:has_all_permissions")
+def get_log_levels():
+    """Renvoie le niveau de log effectif de chaque sous-système."""
+    return jsonify(get_subsystem_levels()), 200
+
+@app.route('/api/admin/log_levels', methods=['PUT'])
+@login_required
+@require_permission("admin:has_all_permissions")
+def update_log_levels():
+    """
+    Change à chaud le niveau de log d'un ou plusieurs sous-systèmes.
+    Corps attendu: {"scheduler": "DEBUG", "backend": "INFO", ...}. Non persistant (retour à INFO au redémarrage).
+    """
+    user_id = current_user.id
+    new_levels = request.get_json(silent=True)
+    if not isinstance(new_levels, dict) or not new_levels:
+        return jsonify({"error": "Format invalide. Un dictionnaire {sous_systeme: niveau} est attendu."}), 400
+
+    try:
+        set_subsystem_levels(new_levels)
+    except ValueError as e:
+        logger.warning(f"User '{user_id}': Changement niveaux de log refusé: {e}")
+        return jsonify({"error": str(e), "levels": get_subsystem_levels()}), 400
+
+    logger.warning(f"User '{user_id}': Niveaux de log modifiés: {new_levels}")
+    return jsonify({"message": "Niveaux de log mis à jour.", "levels": get_subsystem_levels()}), 200
+
+@app.route('/api/admin/processes', methods=['GET'])
+@login_required
+@require_permission("admin:has_all_permissions")
+def get_child_processes():
+    """Sous-processus audio en cours (type, âge, CPU, mémoire) et compteurs lancés/récupérés/tués/refusés."""
+    return jsonify(process_supervisor.get_stats()), 200
+
+@app.route('/api/admin/profiling', methods=['GET'])
+@login_required
+@require_permission("admin:has_all_permissions")
+def get_request_profiling():
+    """Réglages du profilage des requêtes et profils capturés (les requêtes les plus lentes d'abord)."""
+    return jsonify({"settings": request_profiler.get_settings(), "profiles": request_profiler.list_profiles()}), 200
+
+@app.route('/api/admin/profiling', methods=['PUT'])
+@login_required
+@require_permission("admin:has_all_permissions")
+def update_request_profiling():
+    """
+    Active/désactive le profilage des requêtes. Corps: {"enabled": true, "threshold_ms": 1000, "sample_rate": 0.05}
+    (champs facultatifs). Non persistant (désactivé au redémarrage).
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data:
+        return jsonify({"error": "Format invalide. Un objet {enabled, threshold_ms, sample_rate} est attendu."}), 400
+    try:
+        request_profiler.configure(enabled=data.get("enabled"), threshold_ms=data.get("threshold_ms"),
+                                   sample_rate=data.get("sample_rate"))
+    except ValueError as e:
+        return jsonify({"error": str(e), "settings": request_profiler.get_settings()}), 400
+    logger.warning(f"User '{current_user.id}': Profilage des requêtes modifié: {data}")
+    return jsonify({"message": "Profilage mis à jour.", "settings": request_profiler.get_settings()}), 200
+
+@app.route('/api/admin/profiling/<path:name>', methods=['GET'])
+@login_required
+@require_permission("admin:has_all_permissions")
+def download_request_profile(name):
+    """Télécharge un profil capturé (.prof pour pstats/snakeviz, .collapsed.txt pour un flamegraph)."""
+    if not request_profiler.profile_path(name):
+        return jsonify({"error": "Profil introuvable."}), 404
+    return send_from_directory(request_profiler.profile_dir, name, as_attachment=True)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Métriques au format texte Prometheus (adresses locales, ou administrateur connecté)."""
+    if request.remote_addr not in METRICS_ALLOWED_ADDRESSES and not (
+            current_user.is_authenticated and user_has_permission(current_user, "admin:has_all_permissions")):
+        return Response("Accès refusé.\n", status=403, mimetype="text/plain")
+    return Response(metrics_registry.render(), content_type=METRICS_CONTENT_TYPE)
+
 @app.route('/api/config/settings')
 @login_required
 @require_permission("page:view_control")
@@ -1069,72 +1354,17 @@ def get_audio_devices():
     user_id = current_user.id
     logger.info(f"User '{user_id}' requête GET /api/audio_devices")
 
-    if not SOUNDDEVICE_AVAILABLE:
-        logger.error("API /api/audio_devices: sounddevice n'est pas disponible.")
-        return jsonify({"audio_devices": [{"name": "Périphérique par défaut système", "id": None}], "error": "sounddevice_unavailable"}), 503
-
-    devices_options = []
     default_device_option = {"name": "Périphérique par défaut système", "id": None}
-    devices_options.append(default_device_option)
-
-    processed_devices = {} # Utiliser un dictionnaire pour stocker les noms candidats
+    devices, error = audio_device_cache.get_devices(wait=True) # Liste en cache, rafraîchie en arrière-plan (énumérée ici au premier appel)
+    if error == "sounddevice_unavailable":
+        logger.error("API /api/audio_devices: sounddevice n'est pas disponible.")
+        return jsonify({"audio_devices": [default_device_option], "error": error}), 503
+    if error and not devices:
+        return jsonify({"audio_devices": [default_device_option], "error": error}), 500
 
-    try:
-        device_list = sd.query_devices()
-
-        for device_info in device_list:
-            if device_info.get('max_output_channels', 0) > 0:
-                device_name_full = device_info.get('name', 'Périphérique inconnu').strip()
-                if not device_name_full:
-                    continue
-
-                # Filtrer les noms clairement tronqués ou non désirés
-                if '(' in device_name_full and ')' not in device_name_full:
-                    logger.debug(f"Périphérique ignoré (parenthèse non fermée): {device_name_full}")
-                    continue
-                if "Microsoft Sound Mapper" in device_name_full or                    "Périphérique audio principal" in device_name_full or                    "Primary Sound Capture Driver" in device_name_full or                    "Pilote de capture audio principal" in device_name_full: # Exemples de noms à ignorer
-                    logger.debug(f"Périphérique ignoré (générique système/entrée): {device_name_full}")
-                    continue
-
-                # Logique pour préférer les noms plus longs/complets
-                # Si un nom est un préfixe d'un nom déjà dans processed_devices, on ne fait rien.
-                # Si un nom dans processed_devices est un préfixe du nom actuel, on remplace.
-                # Sinon, on ajoute.
-
-                should_add_new = True
-                keys_to_remove = []
-
-                for existing_name in processed_devices.keys():
-                    if device_name_full.startswith(existing_name) and len(device_name_full) > len(existing_name):
-                        # Le nouveau est plus long et l'existant est un préfixe, marquer l'existant pour suppression
-                        keys_to_remove.append(existing_name)
-                    elif existing_name.startswith(device_name_full) and len(existing_name) > len(device_name_full):
-                        # L'existant est plus long et le nouveau est un préfixe, ne pas ajouter le nouveau
-                        should_add_new = False
-                        break
-                    elif device_name_full == existing_name: # Exactement le même nom
-                        should_add_new = False
-                        break
-
-                for key_rem in keys_to_remove:
-                    logger.debug(f"Remplacement de '{key_rem}' par une version plus longue '{device_name_full}'")
-                    del processed_devices[key_rem]
-
-                if should_add_new:
-                    logger.debug(f"Ajout du périphérique candidat: {device_name_full}")
-                    processed_devices[device_name_full] = device_name_full
-
-        # Convertir le dictionnaire de noms traités en liste pour l'API, triée pour un ordre consistant
-        for name_id in sorted(list(processed_devices.keys())):
-            devices_options.append({"name": name_id, "id": name_id})
-
-        logger.info(f"API /api/audio_devices: {len(processed_devices)} périphériques de sortie uniques et filtrés trouvés.")
-        return jsonify({"audio_devices": devices_options})
-
-    except Exception as e:
-        logger.error(f"Erreur lors de la récupération des périphériques audio: {e}", exc_info=True)
-        # En cas d'erreur majeure, retourner seulement l'option par défaut
-        return jsonify({"audio_devices": [default_device_option], "error": str(e)}), 500
+    devices_options = [default_device_option] + [{"name": d["name"], "id": d["name"], "index": d["index"]} for d in devices]
+    logger.info(f"API /api/audio_devices: {len(devices)} périphériques de sortie uniques et filtrés (cache).")
+    return jsonify({"audio_devices": devices_options})
 
 @app.route('/api/calendar_view')
 @login_required
@@ -1448,6 +1678,30 @@ def api_daily_schedule():
     if "error" in schedule_details: return jsonify(schedule_details), 500
     else: return jsonify(schedule_details), 200
 
+@app.route('/api/history')
+@login_required
+@require_permission("page:view_control")
+def api_history():
+    """
+    Historique paginé des sonneries et alertes, du plus récent au plus ancien.
+    Paramètres: from / to (YYYY-MM-DD, inclus), type (ring, alert, alert_end, alert_stop), page, per_page.
+    Avec rollups=1, renvoie aussi les cumuls journaliers de la période.
+    """
+    try:
+        date_from = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+        date_to = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+    except ValueError:
+        return jsonify({"error": "Format date invalide (YYYY-MM-DD)."}), 400
+    event_type = request.args.get('type') or None
+    if event_type and event_type not in EVENT_TYPES:
+        return jsonify({"error": f"Type inconnu. Types possibles: {', '.join(EVENT_TYPES)}."}), 400
+    page = request.args.get('page', default=1, type=int)
+    per_page = request.args.get('per_page', default=HISTORY_PAGE_SIZE, type=int)
+    result = history_store.query(date_from, date_to, event_type, page, per_page)
+    if request.args.get('rollups') in ("1", "true"):
+        result["rollups"] = history_store.get_rollups(date_from, date_to)
+    return jsonify(result), 200
+
 def get_daily_schedule_data(date_str):
     logger.debug(f"get_daily_schedule_data pour: {date_str}")
     try: target_date = date.fromisoformat(date_str)
@@ -1472,9 +1726,8 @@ def get_general_and_alerts_config():
         # Charger parametres_college.json
         params_path = os.path.join(CONFIG_PATH, PARAMS_FILE)
         current_params = {}
-        if os.path.exists(params_path):
-            with open(params_path, 'r', encoding='utf-8') as f:
-                current_params = json.load(f)
+        if path_exists(params_path):
+            current_params = read_json_file(params_path)
         else:
             logger.warning(f"Fichier {PARAMS_FILE} introuvable lors de la lecture pour l'API config.")
             # Renvoyer des valeurs par défaut ou une erreur ? Pour GET, valeurs par défaut est plus souple.
@@ -1487,9 +1740,8 @@ def get_general_and_alerts_config():
         # Charger la liste des sonneries depuis donnees_sonneries.json
         sonneries_data_path = os.path.join(CONFIG_PATH, DONNEES_SONNERIES_FILE)
         available_ringtones = {}
-        if os.path.exists(sonneries_data_path):
-            with open(sonneries_data_path, 'r', encoding='utf-8') as f:
-                donnees_sonneries = json.load(f)
+        if path_exists(sonneries_data_path):
+            donnees_sonneries = read_json_file(sonneries_data_path)
             available_ringtones = donnees_sonneries.get("sonneries", {})
             if not isinstance(available_ringtones, dict):
                 logger.warning(f"La section 'sonneries' dans {DONNEES_SONNERIES_FILE} n'est pas un dictionnaire. Renvoyer liste vide.")
@@ -1546,9 +1798,8 @@ def set_general_and_alerts_config():
 
         # Charger la configuration actuelle pour ne modifier que les clés nécessaires
         current_params = {}
-        if os.path.exists(params_path):
-            with open(params_path, 'r', encoding='utf-8') as f:
-                current_params = json.load(f)
+        if path_exists(params_path):
+            current_params = read_json_file(params_path)
         else:
             # Si le fichier n'existe pas, on va le créer.
             # Cela ne devrait pas arriver si le backend a démarré correctement.
@@ -1621,8 +1872,7 @@ def set_general_and_alerts_config():
                 # return jsonify({"error": "status_refresh_interval_seconds doit être un entier."}), 400
 
         # Sauvegarder le fichier mis à jour
-        with open(params_path, 'w', encoding='utf-8') as f:
-            json.dump(current_params, f, indent=2, ensure_ascii=False)
+        write_json_file(params_path, current_params)
 
         logger.info(f"Fichier {PARAMS_FILE} mis à jour avec succès.")
 
@@ -1657,7 +1907,7 @@ def serve_sound_file(filename):
     user_id = current_user.id
     logger.info(f"User '{user_id}' demande le fichier son: {filename} depuis MP3_PATH: {MP3_PATH}")
 
-    if not MP3_PATH or not os.path.isdir(MP3_PATH):
+    if not MP3_PATH or not path_isdir(MP3_PATH):
         logger.error(f"MP3_PATH ('{MP3_PATH}') n'est pas configuré ou n'est pas un dossier.")
         return jsonify({"error": "Le répertoire des sons n'est pas configuré sur le serveur."}), 500
 
@@ -1694,9 +1944,8 @@ def get_weekly_schedule_config():
         current_weekly_planning = {}
         available_day_types_names = []
 
-        if os.path.exists(donnees_path):
-            with open(donnees_path, 'r', encoding='utf-8') as f:
-                donnees_sonneries = json.load(f)
+        if path_exists(donnees_path):
+            donnees_sonneries = read_json_file(donnees_path)
 
             current_weekly_planning = donnees_sonneries.get("planning_hebdomadaire", {})
             if not isinstance(current_weekly_planning, dict):
@@ -1760,9 +2009,8 @@ def set_weekly_schedule_config():
         donnees_path = os.path.join(CONFIG_PATH, DONNEES_SONNERIES_FILE)
 
         # Charger l'intégralité du fichier donnees_sonneries.json
-        if os.path.exists(donnees_path):
-            with open(donnees_path, 'r', encoding='utf-8') as f:
-                donnees_sonneries = json.load(f)
+        if path_exists(donnees_path):
+            donnees_sonneries = read_json_file(donnees_path)
         else:
             # Si le fichier n'existe pas, c'est un problème plus grave.
             # Le backend n'aurait pas dû démarrer sans. On logue une erreur critique.
@@ -1788,8 +2036,7 @@ def set_weekly_schedule_config():
         donnees_sonneries["planning_hebdomadaire"] = new_planning
 
         # Sauvegarder le fichier donnees_sonneries.json complet
-        with open(donnees_path, 'w', encoding='utf-8') as f:
-            json.dump(donnees_sonneries, f, indent=2, ensure_ascii=False)
+        write_json_file(donnees_path, donnees_sonneries)
 
         logger.info(f"Section 'planning_hebdomadaire' dans {DONNEES_SONNERIES_FILE} mise à jour avec succès.")
 
@@ -1818,9 +2065,8 @@ def get_day_type_list():
         donnees_path = os.path.join(CONFIG_PATH, DONNEES_SONNERIES_FILE)
         available_day_types_names = []
 
-        if os.path.exists(donnees_path):
-            with open(donnees_path, 'r', encoding='utf-8') as f:
-                donnees_sonneries = json.load(f)
+        if path_exists(donnees_path):
+            donnees_sonneries = read_json_file(donnees_path)
 
             day_types_data = donnees_sonneries.get("journees_types", {})
             if isinstance(day_types_data, dict):
@@ -1860,9 +2106,8 @@ def get_day_type_details(day_type_name):
         donnees_path = os.path.join(CONFIG_PATH, DONNEES_SONNERIES_FILE)
         day_type_details = None
 
-        if os.path.exists(donnees_path):
-            with open(donnees_path, 'r', encoding='utf-8') as f:
-                donnees_sonneries = json.load(f)
+        if path_exists(donnees_path):
+            donnees_sonneries = read_json_file(donnees_path)
 
             day_types_data = donnees_sonneries.get("journees_types", {})
             if isinstance(day_types_data, dict):
@@ -1917,9 +2162,8 @@ def create_day_type():
 
     try:
         donnees_sonneries = {}
-        if os.path.exists(donnees_path):
-            with open(donnees_path, 'r', encoding='utf-8') as f:
-                donnees_sonneries = json.load(f)
+        if path_exists(donnees_path):
+            donnees_sonneries = read_json_file(donnees_path)
         else:
             # Devrait être créé au démarrage du backend, mais par sécurité
             logger.warning(f"Fichier {DONNEES_SONNERIES_FILE} non trouvé, création d'une nouvelle structure.")
@@ -1939,8 +2183,7 @@ def create_day_type():
         }
 
         # Sauvegarder le fichier complet
-        with open(donnees_path, 'w', encoding='utf-8') as f:
-            json.dump(donnees_sonneries, f, indent=2, ensure_ascii=False)
+        write_json_file(donnees_path, donnees_sonneries)
 
         logger.info(f"Journée type '{new_day_type_name}' créée avec succès par user '{user_id}'.")
 
@@ -1978,9 +2221,8 @@ def delete_day_type_entry(day_type_name): # Renommé pour éviter conflit avec g
 
     try:
         donnees_sonneries = {}
-        if os.path.exists(donnees_path):
-            with open(donnees_path, 'r', encoding='utf-8') as f:
-                donnees_sonneries = json.load(f)
+        if path_exists(donnees_path):
+            donnees_sonneries = read_json_file(donnees_path)
         else:
             logger.error(f"Fichier critique {DONNEES_SONNERIES_FILE} introuvable lors suppression JT '{day_type_name}'.")
             return jsonify({"error": "Fichier de configuration principal manquant."}), 500
@@ -2023,8 +2265,7 @@ def delete_day_type_entry(day_type_name): # Renommé pour éviter conflit avec g
 
 
         # Sauvegarder le fichier complet
-        with open(donnees_path, 'w', encoding='utf-8') as f:
-            json.dump(donnees_sonneries, f, indent=2, ensure_ascii=False)
+        write_json_file(donnees_path, donnees_sonneries)
 
         logger.info(f"Journée type '{day_type_name}' supprimée avec succès par user '{user_id}'.")
         return jsonify({"message": f"Journée type '{day_type_name}' supprimée avec succès."}), 200 # Ou 204 No Content
@@ -2059,9 +2300,8 @@ def update_day_type_entry(day_type_name_url):
     donnees_path = os.path.join(CONFIG_PATH, DONNEES_SONNERIES_FILE)
     donnees_sonneries = {}
     try:
-        if os.path.exists(donnees_path):
-            with open(donnees_path, 'r', encoding='utf-8') as f:
-                donnees_sonneries = json.load(f)
+        if path_exists(donnees_path):
+            donnees_sonneries = read_json_file(donnees_path)
         else:
             logger.error(f"Fichier critique {DONNEES_SONNERIES_FILE} introuvable (PUT day_type).")
             return jsonify({"error": "Fichier de configuration principal manquant."}), 500
@@ -2124,6 +2364,12 @@ def update_day_type_entry(day_type_name_url):
 
             p_data["sonnerie_debut"] = p_data.get("sonnerie_debut")
             p_data["sonnerie_fin"] = p_data.get("sonnerie_fin")
+            # Groupe de sorties audio de la période (lecture simultanée), absent = périphérique des paramètres
+            devices = p_data.pop("peripheriques_audio", None)
+            if devices:
+                if not isinstance(devices, list) or not all(isinstance(d, str) and d.strip() for d in devices):
+                    return jsonify({"error": f"'peripheriques_audio' invalide pour la période à l'index {p_idx} (liste de noms attendue)."}), 400
+                p_data["peripheriques_audio"] = list(dict.fromkeys(d.strip() for d in devices))
             valid_periods.append(p_data)
 
         day_type_data_to_update["periodes"] = valid_periods
@@ -2149,8 +2395,7 @@ def update_day_type_entry(day_type_name_url):
                     if details_exc.get("action") == "utiliser_jt" and details_exc.get("journee_type") == current_day_type_key_in_file:
                         donnees_sonneries["exceptions_planning"][date_exc]["journee_type"] = new_name_for_key
 
-        with open(donnees_path, 'w', encoding='utf-8') as f:
-            json.dump(donnees_sonneries, f, indent=2, ensure_ascii=False)
+        write_json_file(donnees_path, donnees_sonneries)
 
         msg = f"Journée type '{new_name_for_key}' mise à jour avec succès."
         if renamed and current_day_type_key_in_file != new_name_for_key:
@@ -2183,9 +2428,8 @@ def get_all_exceptions():
         donnees_path = os.path.join(CONFIG_PATH, DONNEES_SONNERIES_FILE)
         exceptions_planning = {}
 
-        if os.path.exists(donnees_path):
-            with open(donnees_path, 'r', encoding='utf-8') as f:
-                donnees_sonneries = json.load(f)
+        if path_exists(donnees_path):
+            donnees_sonneries = read_json_file(donnees_path)
             exceptions_planning = donnees_sonneries.get("exceptions_planning", {})
             if not isinstance(exceptions_planning, dict):
                 logger.warning(f"Section 'exceptions_planning' invalide dans {DONNEES_SONNERIES_FILE}, retour liste vide.")
@@ -2244,9 +2488,8 @@ def update_exception(date_str):
     donnees_path = os.path.join(CONFIG_PATH, DONNEES_SONNERIES_FILE)
     try:
         donnees_sonneries = {}
-        if os.path.exists(donnees_path):
-            with open(donnees_path, 'r', encoding='utf-8') as f:
-                donnees_sonneries = json.load(f)
+        if path_exists(donnees_path):
+            donnees_sonneries = read_json_file(donnees_path)
         else:
             logger.error(f"Fichier {DONNEES_SONNERIES_FILE} non trouvé lors modif. exception pour '{date_str}'.")
             return jsonify({"error": "Fichier de configuration principal manquant."}), 500
@@ -2275,8 +2518,7 @@ def update_exception(date_str):
         exceptions_planning[date_str] = updated_exception
         donnees_sonneries["exceptions_planning"] = exceptions_planning # Réassigner au cas où c'était None avant
 
-        with open(donnees_path, 'w', encoding='utf-8') as f:
-            json.dump(donnees_sonneries, f, indent=2, ensure_ascii=False)
+        write_json_file(donnees_path, donnees_sonneries)
 
         logger.info(f"Exception pour date '{date_str}' modifiée avec succès par user '{user_id}'.")
         return jsonify({
@@ -2308,9 +2550,8 @@ def delete_exception(date_str):
     donnees_path = os.path.join(CONFIG_PATH, DONNEES_SONNERIES_FILE)
     try:
         donnees_sonneries = {}
-        if os.path.exists(donnees_path):
-            with open(donnees_path, 'r', encoding='utf-8') as f:
-                donnees_sonneries = json.load(f)
+        if path_exists(donnees_path):
+            donnees_sonneries = read_json_file(donnees_path)
         else:
             logger.error(f"Fichier {DONNEES_SONNERIES_FILE} non trouvé lors suppression exception pour '{date_str}'.")
             return jsonify({"error": "Fichier de configuration principal manquant."}), 500
@@ -2323,8 +2564,7 @@ def delete_exception(date_str):
         del exceptions_planning[date_str]
         donnees_sonneries["exceptions_planning"] = exceptions_planning
 
-        with open(donnees_path, 'w', encoding='utf-8') as f:
-            json.dump(donnees_sonneries, f, indent=2, ensure_ascii=False)
+        write_json_file(donnees_path, donnees_sonneries)
 
         logger.info(f"Exception pour date '{date_str}' supprimée avec succès par user '{user_id}'.")
         return jsonify({"message": f"Exception pour la date '{date_str}' supprimée avec succès."}), 200 # ou 204
@@ -2372,9 +2612,8 @@ def add_exception():
     donnees_path = os.path.join(CONFIG_PATH, DONNEES_SONNERIES_FILE)
     try:
         donnees_sonneries = {}
-        if os.path.exists(donnees_path):
-            with open(donnees_path, 'r', encoding='utf-8') as f:
-                donnees_sonneries = json.load(f)
+        if path_exists(donnees_path):
+            donnees_sonneries = read_json_file(donnees_path)
         else: # Ne devrait pas arriver
             logger.error(f"Fichier {DONNEES_SONNERIES_FILE} non trouvé lors de l'ajout d'exception.")
             return jsonify({"error": "Fichier de configuration principal manquant."}), 500
@@ -2401,8 +2640,7 @@ def add_exception():
 
         donnees_sonneries["exceptions_planning"][date_str] = new_exception
 
-        with open(donnees_path, 'w', encoding='utf-8') as f:
-            json.dump(donnees_sonneries, f, indent=2, ensure_ascii=False)
+        write_json_file(donnees_path, donnees_sonneries)
 
         logger.info(f"Exception pour date '{date_str}' ajoutée avec succès par user '{user_id}'.")
         return jsonify({
@@ -2427,7 +2665,7 @@ def scan_mp3_folder_and_update_config():
     user_id = current_user.id
     logger.info(f"User '{user_id}' - POST /api/config/sounds/scan: Demande de scan du dossier MP3.")
 
-    if not MP3_PATH or not os.path.isdir(MP3_PATH):
+    if not MP3_PATH or not path_isdir(MP3_PATH):
         logger.error(f"Scan MP3 échoué: MP3_PATH ('{MP3_PATH}') non configuré ou inaccessible.")
         return jsonify({"error": "Répertoire MP3 non configuré ou inaccessible sur le serveur."}), 500
 
@@ -2435,9 +2673,8 @@ def scan_mp3_folder_and_update_config():
 
     try:
         donnees_sonneries = {}
-        if os.path.exists(donnees_path):
-            with open(donnees_path, 'r', encoding='utf-8') as f:
-                donnees_sonneries = json.load(f)
+        if path_exists(donnees_path):
+            donnees_sonneries = read_json_file(donnees_path)
         else:
             logger.warning(f"Fichier {DONNEES_SONNERIES_FILE} non trouvé, création nouvelle structure pour scan.")
             donnees_sonneries = {"sonneries": {}, "journees_types": {}, "planning_hebdomadaire": {}, "exceptions_planning": {}, "vacances": {}}
@@ -2448,12 +2685,12 @@ def scan_mp3_folder_and_update_config():
         current_configured_files = set(donnees_sonneries["sonneries"].values())
         current_display_names = set(donnees_sonneries["sonneries"].keys())
 
-        files_on_disk = []
-        # Utiliser glob pour trouver les .mp3 de manière insensible à la casse si possible (plus complexe)
-        # Pour l'instant, sensible à la casse pour .mp3
-        for f_name in os.listdir(MP3_PATH):
-            if f_name.lower().endswith('.mp3') and os.path.isfile(os.path.join(MP3_PATH, f_name)):
-                 files_on_disk.append(f_name)
+        # Scan incrémental: seuls les fichiers nouveaux ou modifiés sont réanalysés (voir sound_catalog.py)
+        try:
+            sound_catalog.refresh()
+        except OSError as e_scan:
+            logger.warning(f"Scan MP3: dossier inaccessible ({e_scan}), utilisation du dernier catalogue connu.")
+        files_on_disk = sound_catalog.list_files()
 
         logger.info(f"Scan MP3: {len(files_on_disk)} fichiers .mp3 trouvés dans {MP3_PATH}.")
         logger.debug(f"Scan MP3: Fichiers disques: {files_on_disk}")
@@ -2479,8 +2716,7 @@ def scan_mp3_folder_and_update_config():
 
         if added_count > 0:
             donnees_sonneries["sonneries"] = updated_sonneries
-            with open(donnees_path, 'w', encoding='utf-8') as f:
-                json.dump(donnees_sonneries, f, indent=2, ensure_ascii=False)
+            write_json_file(donnees_path, donnees_sonneries)
             message = f"{added_count} nouvelle(s) sonnerie(s) ajoutée(s) à la configuration."
             logger.info(message)
         else:
@@ -2491,7 +2727,8 @@ def scan_mp3_folder_and_update_config():
             "message": message,
             "added_count": added_count,
             "total_configured": len(updated_sonneries),
-            "configured_sounds": updated_sonneries # Renvoyer la liste mise à jour
+            "configured_sounds": updated_sonneries, # Renvoyer la liste mise à jour
+            "catalog": sound_catalog.get_summary()
         }), 200
 
     except Exception as e:
@@ -2523,9 +2760,8 @@ def update_sound_display_name(file_name):
     donnees_path = os.path.join(CONFIG_PATH, DONNEES_SONNERIES_FILE)
     try:
         donnees_sonneries = {}
-        if os.path.exists(donnees_path):
-            with open(donnees_path, 'r', encoding='utf-8') as f:
-                donnees_sonneries = json.load(f)
+        if path_exists(donnees_path):
+            donnees_sonneries = read_json_file(donnees_path)
         else:
             logger.error(f"Fichier {DONNEES_SONNERIES_FILE} non trouvé (update_sound_display_name).")
             return jsonify({"error": "Fichier de configuration principal manquant."}), 500
@@ -2561,8 +2797,7 @@ def update_sound_display_name(file_name):
 
         donnees_sonneries["sonneries"] = updated_sonneries
 
-        with open(donnees_path, 'w', encoding='utf-8') as f:
-            json.dump(donnees_sonneries, f, indent=2, ensure_ascii=False)
+        write_json_file(donnees_path, donnees_sonneries)
 
         logger.info(f"Nom convivial pour '{file_name}' mis à jour de '{old_display_name}' à '{new_display_name}'.")
         return jsonify({
@@ -2588,9 +2823,8 @@ def dissociate_sound_only(file_name):
     params_path = os.path.join(CONFIG_PATH, PARAMS_FILE)
     try:
         donnees_sonneries = {}
-        if os.path.exists(donnees_path):
-            with open(donnees_path, 'r', encoding='utf-8') as f:
-                donnees_sonneries = json.load(f)
+        if path_exists(donnees_path):
+            donnees_sonneries = read_json_file(donnees_path)
         else:
             logger.error(f"Fichier de configuration des sonneries {DONNEES_SONNERIES_FILE} non trouvé.")
             return jsonify({"error": "Fichier de configuration principal des sonneries manquant."}), 500
@@ -2622,22 +2856,19 @@ def dissociate_sound_only(file_name):
                             periode["sonnerie_fin"] = None
         params_modified = False
         current_college_params_on_disk = {}
-        if os.path.exists(params_path):
-            with open(params_path, 'r', encoding='utf-8') as f_params:
-                current_college_params_on_disk = json.load(f_params)
+        if path_exists(params_path):
+            current_college_params_on_disk = read_json_file(params_path)
             alert_keys_to_check = ["sonnerie_ppms", "sonnerie_attentat", "sonnerie_fin_alerte"]
             for key in alert_keys_to_check:
                 if current_college_params_on_disk.get(key) == file_name:
                     current_college_params_on_disk[key] = None
                     params_modified = True
             if params_modified:
-                with open(params_path, 'w', encoding='utf-8') as f_params:
-                    json.dump(current_college_params_on_disk, f_params, indent=2, ensure_ascii=False)
+                write_json_file(params_path, current_college_params_on_disk)
                 logger.info(f"Fichier des paramètres ({PARAMS_FILE}) mis à jour après nettoyage des références à '{file_name}'.")
                 global college_params
                 college_params = current_college_params_on_disk.copy()
-        with open(donnees_path, 'w', encoding='utf-8') as f:
-            json.dump(donnees_sonneries, f, indent=2, ensure_ascii=False)
+        write_json_file(donnees_path, donnees_sonneries)
         final_message = f"L'association pour la sonnerie '{display_name_to_delete}' (fichier: {file_name}) a été retirée de la configuration. Le fichier MP3 est conservé sur le disque."
         return jsonify({"message": final_message}), 200
     except Exception as e:
@@ -2656,9 +2887,8 @@ def delete_sound_association_and_file(file_name):
 
     try:
         donnees_sonneries = {}
-        if os.path.exists(donnees_path):
-            with open(donnees_path, 'r', encoding='utf-8') as f:
-                donnees_sonneries = json.load(f)
+        if path_exists(donnees_path):
+            donnees_sonneries = read_json_file(donnees_path)
         else:
             logger.error(f"Fichier de configuration des sonneries {DONNEES_SONNERIES_FILE} non trouvé.")
             return jsonify({"error": "Fichier de configuration principal des sonneries manquant."}), 500
@@ -2681,10 +2911,15 @@ def delete_sound_association_and_file(file_name):
         action_on_physical_file_message = ""
         physical_file_path = os.path.join(MP3_PATH, file_name)
 
-        if os.path.exists(physical_file_path):
+        if sound_catalog.contains(file_name):
             try:
-                os.remove(physical_file_path)
-                logger.info(f"Fichier MP3 '{physical_file_path}' supprimé physiquement avec succès.")
+                try:
+                    os.remove(physical_file_path)
+                    logger.info(f"Fichier MP3 '{physical_file_path}' supprimé physiquement avec succès.")
+                except FileNotFoundError:
+                    logger.warning(f"Fichier MP3 '{physical_file_path}' déjà absent du disque (catalogue en retard).")
+                sound_catalog.remove_file(file_name)
+                if mp3_mirror: mp3_mirror.request_sync()
                 file_deleted_physically = True
                 action_on_physical_file_message = "Le fichier MP3 a également été supprimé du disque."
             except OSError as e_remove:
@@ -2708,23 +2943,20 @@ def delete_sound_association_and_file(file_name):
 
         params_modified = False
         current_college_params_on_disk = {}
-        if os.path.exists(params_path):
-            with open(params_path, 'r', encoding='utf-8') as f_params:
-                current_college_params_on_disk = json.load(f_params)
+        if path_exists(params_path):
+            current_college_params_on_disk = read_json_file(params_path)
             alert_keys_to_check = ["sonnerie_ppms", "sonnerie_attentat", "sonnerie_fin_alerte"]
             for key in alert_keys_to_check:
                 if current_college_params_on_disk.get(key) == file_name:
                     current_college_params_on_disk[key] = None
                     params_modified = True
             if params_modified:
-                with open(params_path, 'w', encoding='utf-8') as f_params:
-                    json.dump(current_college_params_on_disk, f_params, indent=2, ensure_ascii=False)
+                write_json_file(params_path, current_college_params_on_disk)
                 logger.info(f"Fichier des paramètres ({PARAMS_FILE}) mis à jour après nettoyage des références à '{file_name}'.")
                 global college_params
                 college_params = current_college_params_on_disk.copy()
 
-        with open(donnees_path, 'w', encoding='utf-8') as f:
-            json.dump(donnees_sonneries, f, indent=2, ensure_ascii=False)
+        write_json_file(donnees_path, donnees_sonneries)
 
         final_message = f"L'association pour la sonnerie '{display_name_to_delete}' (fichier: {file_name}) a été retirée de la configuration."
         if action_on_physical_file_message:
@@ -2736,102 +2968,248 @@ def delete_sound_association_and_file(file_name):
         logger.error(f"Erreur API DELETE /api/config/sounds/{file_name}: {e}", exc_info=True)
         return jsonify({"error": f"Erreur serveur inattendue: {str(e)}"}), 500
 
+def check_upload_filename(raw_filename):
+    """Nom sécurisé d'un MP3 à uploader. Retourne (nom, None) ou (None, (réponse d'erreur, code))."""
+    if not MP3_PATH or not path_isdir(MP3_PATH):
+        logger.error(f"Upload échoué: MP3_PATH ('{MP3_PATH}') non configuré ou inaccessible.")
+        return None, ({"error": "Répertoire de destination des MP3 non configuré sur le serveur."}, 500)
+
+    if not raw_filename:
+        logger.warning("Upload: Nom de fichier vide soumis.")
+        return None, ({"error": "Aucun fichier sélectionné (nom de fichier vide)."}, 400)
+
+    # Valider l'extension et le type MIME (basique)
+    allowed_extensions = {'mp3'}
+    filename = secure_filename(raw_filename) # Sécuriser le nom du fichier
+
+    if '.' not in filename or filename.rsplit('.', 1)[1].lower() not in allowed_extensions:
+        logger.warning(f"Upload: Type de fichier non autorisé pour '{filename}'.")
+        return None, ({"error": "Type de fichier non autorisé. Seuls les .mp3 sont acceptés."}, 400)
+
+    # Vérifier si un fichier avec le même nom existe déjà pour éviter l'écrasement
+    # ou gérer le renommage. Pour l'instant, on refuse si le nom existe.
+    # Catalogue d'abord (sans accès au partage), puis le partage lui-même: un fichier
+    # déposé directement n'y figure qu'après le prochain scan.
+    if sound_catalog.contains(filename) or path_exists(os.path.join(MP3_PATH, filename)):
+        logger.warning(f"Upload: Fichier '{filename}' existe déjà à destination.")
+        return None, ({"error": f"Un fichier nommé '{filename}' existe déjà sur le serveur. Veuillez renommer votre fichier ou supprimer l'existant."}, 409) # Conflict
+    return filename, None
+
+def check_upload_content(filename, analysis):
+    """Refuse un contenu illisible ou déjà présent sous un autre nom. Retourne None ou (réponse d'erreur, code)."""
+    if not analysis["decode_ok"]:
+        logger.warning(f"Upload: '{filename}' n'est pas un MP3 lisible: {analysis['decode_error']}")
+        return {"error": f"Le fichier '{filename}' n'est pas un MP3 lisible ({analysis['decode_error']})."}, 400
+    duplicate_of = sound_catalog.find_by_sha1(analysis["sha1"])
+    if duplicate_of:
+        logger.warning(f"Upload: '{filename}' a le même contenu que '{duplicate_of}', refusé.")
+        return {"error": f"Ce son est déjà sur le serveur sous le nom '{duplicate_of}'.", "duplicate_of": duplicate_of}, 409
+    return None
+
+def register_uploaded_sound(filename, analysis):
+    """
+    Après écriture du fichier dans MP3_PATH: ajout au catalogue, au miroir local et à
+    la configuration des sonneries (nom convivial unique). Retourne la réponse JSON.
+    """
+    logger.info(f"Upload: Fichier '{filename}' sauvegardé avec succès dans '{MP3_PATH}'.")
+    sound_catalog.add_file(filename, analysis)
+    if mp3_mirror: mp3_mirror.request_sync() # Copier le nouveau fichier dans le miroir local
+
+    # Mettre à jour donnees_sonneries.json
+    donnees_path = os.path.join(CONFIG_PATH, DONNEES_SONNERIES_FILE)
+    donnees_sonneries = {}
+    if path_exists(donnees_path):
+        donnees_sonneries = read_json_file(donnees_path)
+    else:
+        donnees_sonneries = {"sonneries": {}, "journees_types": {}, "planning_hebdomadaire": {}, "exceptions_planning": {}, "vacances": {}}
+
+    if "sonneries" not in donnees_sonneries or not isinstance(donnees_sonneries["sonneries"], dict):
+        donnees_sonneries["sonneries"] = {}
+
+    # Générer un nom convivial unique pour ce nouveau fichier
+    base_name = os.path.splitext(filename)[0]
+    display_name = base_name
+    counter = 1
+    current_display_names = set(donnees_sonneries["sonneries"].keys())
+    while display_name in current_display_names:
+        display_name = f"{base_name}_{counter}"
+        counter += 1
+
+    donnees_sonneries["sonneries"][display_name] = filename
+
+    write_json_file(donnees_path, donnees_sonneries)
+
+    logger.info(f"Upload: Fichier '{filename}' ajouté à la config avec nom convivial '{display_name}'.")
+
+    return {
+        "message": f"Sonnerie '{filename}' uploadée et ajoutée avec succès sous le nom '{display_name}'.",
+        "fileName": filename,
+        "displayName": display_name,
+        "configured_sounds": donnees_sonneries["sonneries"], # Renvoyer la liste mise à jour
+        "catalog": sound_catalog.get_summary()
+    }
+
+def cleanup_failed_upload(filename, destination_path):
+    """Retire du catalogue et supprime le fichier écrit quand l'ajout a échoué après la sauvegarde."""
+    sound_catalog.remove_file(filename)
+    if path_exists(destination_path):
+        try:
+            os.remove(destination_path)
+            logger.info(f"Nettoyage: Fichier '{destination_path}' supprimé suite à une erreur post-upload.")
+        except Exception as e_remove:
+            logger.error(f"Erreur lors de la suppression du fichier '{destination_path}' après erreur: {e_remove}")
+
 # Route pour uploader un nouveau fichier son
 @app.route('/api/config/sounds/upload', methods=['POST'])
 @login_required
 @require_permission("sound:upload")
 def upload_sound_file():
     """
-    Reçoit un fichier MP3 uploadé, le sauvegarde dans MP3_PATH,
-    et l'ajoute à la configuration des sonneries.
+    Reçoit un fichier MP3 uploadé en une fois, le sauvegarde dans MP3_PATH,
+    et l'ajoute à la configuration des sonneries (voir aussi l'upload par morceaux ci-dessous).
     """
     user_id = current_user.id
     logger.info(f"User '{user_id}' - POST /api/config/sounds/upload: Tentative d'upload de fichier son.")
 
-    if not MP3_PATH or not os.path.isdir(MP3_PATH):
-        logger.error(f"Upload échoué: MP3_PATH ('{MP3_PATH}') non configuré ou inaccessible.")
-        return jsonify({"error": "Répertoire de destination des MP3 non configuré sur le serveur."}), 500
-
     if 'soundfile' not in request.files:
         logger.warning("Upload: Aucune partie 'soundfile' dans la requête.")
         return jsonify({"error": "Aucun fichier sélectionné pour l'upload."}), 400
 
     file = request.files['soundfile']
-
-    if file.filename == '':
-        logger.warning("Upload: Nom de fichier vide soumis.")
-        return jsonify({"error": "Aucun fichier sélectionné (nom de fichier vide)."}), 400
-
-    # Valider l'extension et le type MIME (basique)
-    allowed_extensions = {'mp3'}
-    filename = secure_filename(file.filename) # Sécuriser le nom du fichier
-
-    if '.' not in filename or filename.rsplit('.', 1)[1].lower() not in allowed_extensions:
-        logger.warning(f"Upload: Type de fichier non autorisé pour '{filename}'.")
-        return jsonify({"error": "Type de fichier non autorisé. Seuls les .mp3 sont acceptés."}), 400
-
-    # Optionnel: Vérifier le type MIME si possible (plus robuste)
-    # if file.mimetype != 'audio/mpeg':
-    #     logger.warning(f"Upload: Type MIME incorrect '{file.mimetype}' pour '{filename}'.")
-    #     return jsonify({"error": "Contenu du fichier incorrect (doit être audio/mpeg)."}), 400
-
-    # Vérifier si un fichier avec le même nom existe déjà pour éviter l'écrasement
-    # ou gérer le renommage. Pour l'instant, on refuse si le nom existe.
+    filename, error = check_upload_filename(file.filename)
+    if error:
+        return jsonify(error[0]), error[1]
     destination_path = os.path.join(MP3_PATH, filename)
-    if os.path.exists(destination_path):
-        logger.warning(f"Upload: Fichier '{filename}' existe déjà à destination.")
-        return jsonify({"error": f"Un fichier nommé '{filename}' existe déjà sur le serveur. Veuillez renommer votre fichier ou supprimer l'existant."}), 409 # Conflict
+
+    # Analyse (durée, fréquence, décodage, empreinte) sur le contenu reçu, avant écriture sur le partage
+    analysis = analyze_mp3(file.stream)
+    file.stream.seek(0)
+    error = check_upload_content(filename, analysis)
+    if error:
+        return jsonify(error[0]), error[1]
 
     try:
         # Sauvegarder le fichier uploadé
         file.save(destination_path)
-        logger.info(f"Upload: Fichier '{filename}' sauvegardé avec succès dans '{MP3_PATH}'.")
+        return jsonify(register_uploaded_sound(filename, analysis)), 201 # Created
 
-        # Mettre à jour donnees_sonneries.json
-        donnees_path = os.path.join(CONFIG_PATH, DONNEES_SONNERIES_FILE)
-        donnees_sonneries = {}
-        if os.path.exists(donnees_path):
-            with open(donnees_path, 'r', encoding='utf-8') as f:
-                donnees_sonneries = json.load(f)
-        else:
-            donnees_sonneries = {"sonneries": {}, "journees_types": {}, "planning_hebdomadaire": {}, "exceptions_planning": {}, "vacances": {}}
-
-        if "sonneries" not in donnees_sonneries or not isinstance(donnees_sonneries["sonneries"], dict):
-            donnees_sonneries["sonneries"] = {}
+    except Exception as e:
+        logger.error(f"Erreur lors de l'upload ou de la mise à jour config pour '{filename}': {e}", exc_info=True)
+        # Essayer de supprimer le fichier partiellement uploadé en cas d'erreur après la sauvegarde
+        cleanup_failed_upload(filename, destination_path)
+        return jsonify({"error": f"Erreur serveur lors de l'upload: {str(e)}"}), 500
 
-        # Générer un nom convivial unique pour ce nouveau fichier
-        base_name = os.path.splitext(filename)[0]
-        display_name = base_name
-        counter = 1
-        current_display_names = set(donnees_sonneries["sonneries"].keys())
-        while display_name in current_display_names:
-            display_name = f"{base_name}_{counter}"
-            counter += 1
 
-        donnees_sonneries["sonneries"][display_name] = filename
+# --- Upload par morceaux avec reprise (voir upload_sessions.py) ---
+# POST .../uploads {filename, size} -> session (ou session en cours à reprendre),
+# PUT .../uploads/<id>?offset=N (corps brut) -> ajout, POST .../uploads/<id>/commit -> validation.
 
-        with open(donnees_path, 'w', encoding='utf-8') as f:
-            json.dump(donnees_sonneries, f, indent=2, ensure_ascii=False)
+def upload_error_response(e):
+    return jsonify({"error": str(e), **e.details}), e.status
 
-        logger.info(f"Upload: Fichier '{filename}' ajouté à la config avec nom convivial '{display_name}'.")
+@app.route('/api/config/sounds/uploads', methods=['POST'])
+@login_required
+@require_permission("sound:upload")
+def init_sound_upload():
+    """Ouvre une session d'upload (ou renvoie celle en cours pour ce fichier, avec la taille déjà reçue)."""
+    data = request.get_json(silent=True) or {}
+    filename, error = check_upload_filename(data.get("filename"))
+    if error:
+        return jsonify(error[0]), error[1]
+    try:
+        session = upload_sessions.init(filename, int(data.get("size") or 0), current_user.id)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Taille de fichier invalide."}), 400
+    except UploadError as e:
+        return upload_error_response(e)
+    logger.info(f"User '{current_user.id}' - Upload de '{filename}': session {session['id']}, {session['received']}/{session['size']} octet(s) déjà reçu(s).")
+    return jsonify({"upload_id": session["id"], "filename": filename, "size": session["size"],
+                    "received": session["received"], "chunk_size": UPLOAD_CHUNK_BYTES}), 201
+
+@app.route('/api/config/sounds/uploads/<upload_id>', methods=['GET'])
+@login_required
+@require_permission("sound:upload")
+def get_sound_upload(upload_id):
+    """Taille déjà reçue, pour reprendre un upload interrompu."""
+    try:
+        session = upload_sessions.status(upload_id, current_user.id)
+    except UploadError as e:
+        return upload_error_response(e)
+    return jsonify({"upload_id": upload_id, "filename": session["filename"], "size": session["size"], "received": session["received"]})
 
-        return jsonify({
-            "message": f"Sonnerie '{filename}' uploadée et ajoutée avec succès sous le nom '{display_name}'.",
-            "fileName": filename,
-            "displayName": display_name,
-            "configured_sounds": donnees_sonneries["sonneries"] # Renvoyer la liste mise à jour
-        }), 201 # Created
+@app.route('/api/config/sounds/uploads/<upload_id>', methods=['PUT'])
+@login_required
+@require_permission("sound:upload")
+def append_sound_upload(upload_id):
+    """Ajoute un morceau (corps brut de la requête) à la position 'offset'."""
+    try:
+        offset = int(request.args.get("offset", ""))
+    except ValueError:
+        return jsonify({"error": "Paramètre 'offset' manquant ou invalide."}), 400
+    try:
+        session = upload_sessions.append(upload_id, current_user.id, offset, request.stream)
+    except UploadError as e:
+        return upload_error_response(e)
+    except OSError as e:
+        logger.error(f"Upload {upload_id}: écriture du morceau impossible: {e}", exc_info=True)
+        return jsonify({"error": f"Erreur serveur lors de l'écriture du morceau: {e}"}), 500
+    return jsonify({"upload_id": upload_id, "size": session["size"], "received": session["received"]})
+
+@app.route('/api/config/sounds/uploads/<upload_id>/commit', methods=['POST'])
+@login_required
+@require_permission("sound:upload")
+def commit_sound_upload(upload_id):
+    """Valide un upload complet: contrôle du contenu et des doublons, copie atomique sur le partage, ajout à la config."""
+    try:
+        session, part_path, sha1 = upload_sessions.complete(upload_id, current_user.id)
+    except UploadError as e:
+        return upload_error_response(e)
+
+    # La session reste occupée jusqu'à finish() / release(): pas de seconde validation en parallèle
+    filename, error = check_upload_filename(session["filename"]) # Catalogue puis partage (path_exists)
+    if not error:
+        with open(part_path, 'rb') as f:
+            analysis = analyze_mp3(f)
+        analysis["sha1"] = sha1 # Empreinte calculée au fil de l'upload (identique)
+        error = check_upload_content(filename, analysis)
+    if error:
+        if error[1] != 500:
+            upload_sessions.finish(upload_id) # Contenu ou nom refusé: inutile de reprendre
+        else:
+            upload_sessions.release(upload_id)
+        return jsonify(error[0]), error[1]
 
+    destination_path = os.path.join(MP3_PATH, filename)
+    try:
+        # Copie à délai borné, renommage sans écrasement (FileExistsError si le nom a été pris entre-temps)
+        share_io.run("upload_copy", move_to_share, part_path, destination_path, timeout=SHARE_COPY_TIMEOUT_SECONDS)
+    except FileExistsError:
+        logger.warning(f"Upload {upload_id}: '{filename}' apparu sur le partage pendant la validation, fichier existant conservé.")
+        upload_sessions.finish(upload_id)
+        return jsonify({"error": f"Un fichier nommé '{filename}' existe déjà sur le serveur. Veuillez renommer votre fichier ou supprimer l'existant."}), 409
+    except Exception as e: # Dont ShareTimeoutError: rien n'a été enregistré, la validation peut être retentée
+        logger.error(f"Erreur lors de la copie de l'upload {upload_id} ('{filename}') sur le partage: {e}", exc_info=True)
+        upload_sessions.release(upload_id)
+        return jsonify({"error": f"Erreur serveur lors de l'upload: {str(e)}"}), 500
+    try:
+        response = register_uploaded_sound(filename, analysis)
     except Exception as e:
-        logger.error(f"Erreur lors de l'upload ou de la mise à jour config pour '{filename}': {e}", exc_info=True)
-        # Essayer de supprimer le fichier partiellement uploadé en cas d'erreur après la sauvegarde
-        if os.path.exists(destination_path):
-            try:
-                os.remove(destination_path)
-                logger.info(f"Nettoyage: Fichier '{destination_path}' supprimé suite à une erreur post-upload.")
-            except Exception as e_remove:
-                logger.error(f"Erreur lors de la suppression du fichier '{destination_path}' après erreur: {e_remove}")
+        logger.error(f"Erreur lors de la validation de l'upload {upload_id} ('{filename}'): {e}", exc_info=True)
+        cleanup_failed_upload(filename, destination_path)
+        upload_sessions.release(upload_id)
         return jsonify({"error": f"Erreur serveur lors de l'upload: {str(e)}"}), 500
+    upload_sessions.finish(upload_id)
+    return jsonify(response), 201
+
+@app.route('/api/config/sounds/uploads/<upload_id>', methods=['DELETE'])
+@login_required
+@require_permission("sound:upload")
+def abort_sound_upload(upload_id):
+    try:
+        upload_sessions.abort(upload_id, current_user.id)
+    except UploadError as e:
+        return upload_error_response(e)
+    return jsonify({"message": "Upload annulé."})
 
 
 # ==============================================================================
@@ -3137,6 +3515,7 @@ def update_role_permissions(role_name):
     if not save_roles_config():
         # En cas d'échec de sauvegarde, il serait prudent de recharger l'ancienne config pour éviter une désynchronisation
         load_roles_config() # Recharge l'ancienne version depuis le disque
+        permission_cache.invalidate("annulation modification rôle")
         logger.error(f"Échec de la sauvegarde de roles_config.json après modification du rôle '{normalized_role_name}'. Les modifications ont été annulées en mémoire.")
         return jsonify({"error": "Erreur serveur lors de la sauvegarde de la configuration des rôles."}), 500
 
@@ -3228,181 +3607,79 @@ def get_user_calendar_preference():
 # Point d'Entrée et Lancement du Serveur / Gestionnaire de Son
 # ==============================================================================
 
-def run_sound_cli():
-    import os
-    # SDL_AUDIODRIVER n'est PAS défini ici pour ce test.
-
-    import pygame
-    import time
-    import argparse
-    import traceback
-    import sys # Nécessaire pour sys.argv et sys.exit
-
-    # --- Argument Parsing ---
-    parser = argparse.ArgumentParser(description="CLI for playing sounds with Pygame")
-    parser.add_argument("sound_file", help="Path to the sound file")
-    parser.add_argument("--loop", action='store_true', help="Loop the sound continuously")
-    parser.add_argument("--device", help="Name of the audio output device for Pygame")
-
-    # Log initial pour voir les arguments bruts passés au script
-    raw_args_for_log = sys.argv[2:] # sys.argv[0] is script name, sys.argv[1] is '--play-sound'
-    # print(f"[SoundCLI] Raw CLI arguments: {raw_args_for_log}") # Optionnel, pour débogage avancé
-
-    cli_args = parser.parse_args(raw_args_for_log)
-
-    sound_path = cli_args.sound_file
-    loop_flag = cli_args.loop
-    loops = -1 if loop_flag else 0
-    device_name_arg = cli_args.device
-
-    # Log initial amélioré
-    print(f"[SoundCLI] PID:{os.getpid()} Play:'{os.path.basename(sound_path)}' Loop:{loop_flag} Device Requested:'{device_name_arg if device_name_arg else 'Default'}'")
-
-    if not os.path.isfile(sound_path):
-        print(f"[SoundCLI] ERR: Sound file not found: {sound_path}")
-        sys.exit(1)
-
-    pg_ok = False
-    mix_ok = False # Sera mis à True seulement si pygame.mixer.init() réussit
-    sound = None
-
-    # --- pre_init ---
-    try:
-        if device_name_arg:
-            print(f"[SoundCLI] Attempting to pre-initialize mixer with device: '{device_name_arg}'")
-            pygame.mixer.pre_init(devicename=device_name_arg, frequency=44100, size=-16, channels=2, buffer=2048)
-            print(f"[SoundCLI] Mixer pre_init called for device: '{device_name_arg}'")
-        else:
-            print("[SoundCLI] No specific audio device for pre_init. Calling pre_init with default audio parameters.")
-            pygame.mixer.pre_init(frequency=44100, size=-16, channels=2, buffer=2048)
-            print("[SoundCLI] Mixer pre_init called with default audio parameters.")
-    except pygame.error as pre_init_err:
-        # Si pre_init échoue (par exemple, format audio non supporté par le device même en pre_init)
-        # Ce n'est pas toujours fatal pour init() qui pourrait avoir d'autres mécanismes.
-        print(f"[SoundCLI] WARNING Pygame during pre_init: {pre_init_err}. Will proceed to full init.")
-
-
-    # --- Main Initialization Block ---
-    try:
-        print("[SoundCLI] Init Pygame module..."); pygame.init(); pg_ok = True
-
-        # Tentative d'initialisation du mixer
-        if device_name_arg:
-            print(f"[SoundCLI] Attempting to initialize mixer with device: '{device_name_arg}'")
-            try:
-                pygame.mixer.init(devicename=device_name_arg, frequency=44100, size=-16, channels=2, buffer=2048)
-                mix_ok = True
-                print(f"[SoundCLI] Mixer initialized successfully with device: '{device_name_arg}'")
-            except pygame.error as pg_err_device:
-                print(f"[SoundCLI] ERR Pygame: Failed to initialize mixer with device '{device_name_arg}'. Error: {pg_err_device}")
-                print("[SoundCLI] Attempting to initialize mixer with default device as fallback...")
-                try:
-                    pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=2048)
-                    mix_ok = True
-                    print("[SoundCLI] Mixer initialized successfully with default device (fallback).")
-                except pygame.error as pg_err_default_fallback:
-                    print(f"[SoundCLI] ERR Pygame: Failed to initialize mixer with default device (fallback). Error: {pg_err_default_fallback}")
-                    # Laisser l'erreur se propager au bloc except extérieur principal pour ce script.
-                    raise pg_err_default_fallback # Relancer pour être attrapé par le bloc pg_err général
-        else:
-            print("[SoundCLI] No specific audio device requested. Initializing mixer with default device...")
-            try:
-                pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=2048)
-                mix_ok = True
-                print("[SoundCLI] Mixer initialized successfully with default device.")
-            except pygame.error as pg_err_default:
-                print(f"[SoundCLI] ERR Pygame: Failed to initialize mixer with default device. Error: {pg_err_default}")
-                raise pg_err_default # Relancer pour être attrapé
-
-        if not mix_ok: # Si aucune tentative d'initialisation du mixer n'a réussi
-            # Ce cas ne devrait pas être atteint si les exceptions ci-dessus sont bien relancées et attrapées par le bloc pg_err général.
-            # Mais par sécurité :
-            print("[SoundCLI] CRITICAL: Mixer could not be initialized. Sound playback aborted.")
-            raise pygame.error("Mixer initialization failed after all attempts.")
-
-
-        # --- Load and Play Sound ---
-        print(f"[SoundCLI] Loading sound: '{sound_path}'")
-        try:
-            sound = pygame.mixer.Sound(sound_path)
-            print(f"[SoundCLI] Sound loaded successfully: '{os.path.basename(sound_path)}'")
-        except pygame.error as load_err:
-            print(f"[SoundCLI] ERR Pygame during sound load: {load_err}")
-            raise load_err # Relancer pour être attrapé
-
-        print(f"[SoundCLI] Playing sound (loops={loops})...")
-        channel = sound.play(loops=loops)
-        if channel is None:
-            mixer_err_msg = pygame.mixer.get_error() # Obtenir l'erreur spécifique du mixer si disponible
-            print(f"[SoundCLI] ERR: Failed to play sound. play() returned None. Mixer error: '{mixer_err_msg if mixer_err_msg else 'Unknown'}'")
-            # Pas besoin de 'raise' ici, car l'absence de channel est une condition d'erreur que nous gérons.
-            # Le script va quand même se terminer proprement via le bloc finally.
-        else:
-            print(f"[SoundCLI] Sound playing on channel: {channel}. Waiting for playback to finish...")
-            while channel.get_busy(): # pygame.mixer.get_busy() n'est pas suffisant, il faut vérifier le channel spécifique.
-                time.sleep(0.1)
-            print("[SoundCLI] Sound playback finished.")
-
-    except pygame.error as pg_err: # Attrape les erreurs Pygame relancées (init, load) ou nouvelles
-        print(f"[SoundCLI] ERR Pygame (General): {pg_err}")
-        traceback.print_exc(file=sys.stderr) # Imprimer la trace sur stderr
-    except Exception as e: # Attrape toutes les autres exceptions
-        print(f"[SoundCLI] ERR Unexpected: {e}")
-        traceback.print_exc(file=sys.stderr)
-    finally:
-        # --- Cleanup ---
-        # Quitter le mixer seulement s'il a été initialisé (mix_ok est True) ET s'il est toujours initialisé
-        if mix_ok and pygame.mixer.get_init():
-            print("[SoundCLI] Quitting mixer...")
-            pygame.mixer.quit()
-        # Quitter Pygame seulement s'il a été initialisé (pg_ok est True) ET s'il est toujours initialisé
-        if pg_ok and pygame.get_init():
-            print("[SoundCLI] Quitting Pygame module...")
-            pygame.quit()
-        print("[SoundCLI] Exiting cli_sound process.")
-        # Toujours sortir avec 0 pour ne pas causer de panique au scheduler,
-        # les erreurs sont logguées et visibles.
-        sys.exit(0)
-
 if __name__ == '__main__':
-    if len(sys.argv) > 1 and sys.argv[1] == '--play-sound':
-        run_sound_cli() # Exécuter le lecteur de son si argument présent
-    else:
-        # --- Démarrage du serveur Web Backend ---
-        logger.info("Démarrage application backend...")
-        try:
-            logger.info("Chargement config initiale...")
-            if not load_all_configs():
-                logger.critical("ERREUR chargement config initiale. Vérifier fichiers JSON et chemins.")
-                # Continuer ? Ou arrêter ? Préférable d'arrêter si config échoue.
-                sys.exit("Arrêt dû à une erreur de configuration.")
-            else: logger.info("Config initiale chargée.")
-
-            logger.info("Tentative démarrage scheduler...")
+    # ('--play-sound' est traité tout en haut du fichier, voir sound_cli.py)
+    # --- Démarrage du serveur Web Backend ---
+    logger.info("Démarrage application backend...")
+    if startup_profiler:
+        startup_profiler.mark("module_init_done") # Logging, application Flask, routes
+        startup_profiler.report_path = os.path.join(LOG_DIR, 'startup_profile.json')
+
+        @app.after_request
+        def profile_first_request(response):
+            """Profilage du démarrage: la première réponse servie complète le rapport."""
+            if startup_profiler.mark("first_request"):
+                logger.info(f"Profilage démarrage: première requête servie, rapport écrit dans {startup_profiler.write_report()}")
+            return response
+    try:
+        logger.info("Chargement config initiale...")
+        with profile_phase("load_all_configs"):
+            configs_ok = load_all_configs()
+        if not configs_ok:
+            logger.critical("ERREUR chargement config initiale. Vérifier fichiers JSON et chemins.")
+            # Continuer ? Ou arrêter ? Préférable d'arrêter si config échoue.
+            sys.exit("Arrêt dû à une erreur de configuration.")
+        else: logger.info("Config initiale chargée.")
+
+        with profile_phase("config_snapshot:start"):
+            start_config_snapshot() # Sonde le partage en fond et rafraîchit la copie locale de la config
+        with profile_phase("mp3_mirror:start"):
+            start_mp3_mirror() # Synchro en fond: en attendant, les sons absents du miroir sont lus sur le partage
+        audio_analyzer.analyze_pending() # Sons restés sans mesure audio (ex: arrêt pendant une analyse)
+        audio_device_cache.start() # Énumération des périphériques audio en fond, puis surveillance des branchements
+        alert_manager.start() # Lecteur d'alertes lancé à l'avance: pygame déjà chargé à la première alerte
+        with profile_phase("static_assets:prepare"):
+            static_assets.prepare() # Empreintes + copies gzip (refaites seulement pour les fichiers modifiés)
+        with profile_phase("templates:warm"):
+            app.jinja_env.bytecode_cache = make_bytecode_cache(JINJA_CACHE_PATH, logger) # Pas de recompilation après un redémarrage
+            warm_templates(app.jinja_env, logger) # Première page servie sans compilation
+
+        logger.info("Tentative démarrage scheduler...")
+        with profile_phase("scheduler:start"):
             if start_scheduler_thread():
                 if schedule_manager: logger.info("Activation scheduler par défaut..."); schedule_manager.start()
                 else: logger.error("Incohérence: start_scheduler_thread OK mais manager None?")
             else: logger.error("Échec démarrage scheduler (voir logs).")
 
-            logger.info(f"Lancement serveur sur 0.0.0.0:5000...")
-            try:
-                 from waitress import serve
-                 logger.info("Utilisation serveur: Waitress"); serve(app, host='0.0.0.0', port=5000, threads=8) # Augmenter threads?
-            except ImportError:
-                 logger.warning("Serveur: Flask dev (Waitress non trouvé - NON RECOMMANDÉ PROD)"); app.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False)
-
-        except Exception as e: logger.critical(f"Erreur critique démarrage/exécution: {e}", exc_info=True)
-        finally:
-            logger.info("Arrêt application demandé.")
-            # --- Nettoyage ---
-            if alert_process and alert_process.poll() is None:
-                 pid = alert_process.pid; logger.warning(f"Arrêt alerte active (PID {pid})...");
-                 try: alert_process.kill(); alert_process.wait(timeout=2); logger.info(f"Alerte (PID {pid}) tuée.")
-                 except Exception as kill_e: logger.error(f"Erreur kill alerte: {kill_e}")
-                 alert_process = None
-            if schedule_manager: logger.info("Arrêt scheduler..."); schedule_manager.shutdown()
-            if scheduler_thread and scheduler_thread.is_alive():
-                logger.info("Attente fin scheduler thread (max 5s)..."); scheduler_thread.join(timeout=5)
-                if scheduler_thread.is_alive(): logger.warning("Scheduler thread n'a pas terminé.")
-                else: logger.info("Scheduler thread terminé.")
-            logging.shutdown(); print("Application Sonnerie Backend terminée.")
\ No newline at end of file
+        if startup_profiler:
+            startup_profiler.mark("server_starting")
+            logger.info(f"Profilage démarrage: rapport intermédiaire écrit dans {startup_profiler.write_report()} (complété à la première requête).")
+
+        # Les flux SSE ont leurs propres threads pour ne pas bloquer les requêtes classiques
+        status_broadcaster.max_streams = college_params.get("sse_max_streams", status_broadcaster.max_streams)
+        server_options = build_waitress_options(college_params, logger, extra_threads=status_broadcaster.max_streams)
+        logger.info(f"Lancement serveur sur {describe_waitress_options(server_options)}, dont {status_broadcaster.max_streams} threads flux SSE...")
+        try:
+             from waitress import serve
+             logger.info("Utilisation serveur: Waitress"); serve(app, **server_options)
+        except ImportError:
+             logger.warning("Serveur: Flask dev (Waitress non trouvé - NON RECOMMANDÉ PROD)"); app.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False)
+
+    except Exception as e: logger.critical(f"Erreur critique démarrage/exécution: {e}", exc_info=True)
+    finally:
+        logger.info("Arrêt application demandé.")
+        # --- Nettoyage ---
+        status_broadcaster.close()
+        if mp3_mirror: mp3_mirror.stop()
+        if config_snapshot: config_snapshot.stop()
+        share_io.shutdown()
+        audio_analyzer.shutdown()
+        audio_device_cache.stop()
+        alert_manager.shutdown() # Coupe l'alerte éventuelle et arrête le lecteur persistant
+        if schedule_manager: logger.info("Arrêt scheduler..."); schedule_manager.shutdown()
+        if scheduler_thread and scheduler_thread.is_alive():
+            logger.info("Attente fin scheduler thread (max 5s)..."); scheduler_thread.join(timeout=5)
+            if scheduler_thread.is_alive(): logger.warning("Scheduler thread n'a pas terminé.")
+            else: logger.info("Scheduler thread terminé.")
+        process_supervisor.shutdown() # Tue les sous-processus audio restants
+        stop_logging(); logging.shutdown(); print("Application Sonnerie Backend terminée.")
\ No newline at end of file
@@ -0,0 +1,252 @@
+# benchmarks.py
+"""
+Microbenchmarks des chemins critiques (planification, calendrier, permissions, chargement config).
+
+Usage: python benchmarks.py [--scale small|large|all] [--output resultats.json] [--compare precedent.json]
+
+Les mesures tournent sur des configurations synthétiques générées dans un dossier
+temporaire (de quelques journées types à plusieurs dizaines, et des milliers
+d'exceptions), sans réseau ni partage : les résultats sont comparables d'une
+version à l'autre. Le résultat est un JSON (sur la sortie standard ou dans --output) ;
+--compare affiche l'écart avec un résultat précédent, à vérifier avant de déployer.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from datetime import date, datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Taille des configurations synthétiques
+SCALES = {
+    "small": {"day_types": 3, "periods": 10, "exceptions": 20, "users": 5},
+    "large": {"day_types": 60, "periods": 24, "exceptions": 3000, "users": 300},
+}
+
+BENCH_MIN_RUN_SECONDS = 0.05 # Durée minimale d'une mesure (nombre d'appels ajusté en conséquence)
+BENCH_REPEAT = 5
+
+# Année scolaire de référence pour les mesures calendrier / grandes vacances
+ACADEMIC_YEAR_START = date(2025, 9, 1)
+SUMMER_BREAK_START = date(2026, 7, 4)
+
+
+# --- Configurations synthétiques ---
+
+def _vacations(first_year: int, last_year: int) -> list:
+    """Périodes de vacances type (début, fin incluse, description) pour chaque année scolaire."""
+    periods = []
+    for year in range(first_year, last_year + 1):
+        periods += [(date(year, 10, 18), date(year, 11, 3), "Vacances de la Toussaint"),
+                    (date(year, 12, 20), date(year + 1, 1, 5), "Vacances de Noël"),
+                    (date(year + 1, 2, 14), date(year + 1, 3, 2), "Vacances d'hiver"),
+                    (date(year + 1, 4, 11), date(year + 1, 4, 27), "Vacances de printemps"),
+                    (date(year + 1, 7, 4), date(year + 1, 8, 31), "Vacances d'été")]
+    return periods
+
+
+def _write_ics(path: str, periods: list):
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//benchmarks//FR"]
+    for i, (start, end, description) in enumerate(periods):
+        lines += ["BEGIN:VEVENT", f"UID:bench-{i}", f"DTSTART;VALUE=DATE:{start:%Y%m%d}",
+                  f"DTEND;VALUE=DATE:{end + timedelta(days=1):%Y%m%d}", f"SUMMARY:{description}", "END:VEVENT"]
+    lines.append("END:VCALENDAR")
+    with open(path, 'w', encoding='utf-8', newline='\r\n') as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def _write_json(path: str, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def build_fixture(config_dir: str, scale: dict):
+    """Écrit une configuration complète (params, sonneries, rôles, utilisateurs, fériés, ICS) dans config_dir."""
+    from constants import AVAILABLE_PERMISSIONS
+
+    day_types = {}
+    for t in range(scale["day_types"]):
+        name = f"JT {t:02d}"
+        periods = []
+        for p in range(scale["periods"]):
+            start = datetime(2000, 1, 1, 8, 0) + timedelta(minutes=25 * p)
+            periods.append({"nom": f"Cours {p + 1}", "heure_debut": f"{start:%H:%M:%S}",
+                            "heure_fin": f"{start + timedelta(minutes=20):%H:%M:%S}",
+                            "sonnerie_debut": "debut.mp3", "sonnerie_fin": "fin.mp3"})
+        day_types[name] = {"nom": name, "periodes": periods}
+    names = list(day_types)
+    weekly = {day: names[i % len(names)] for i, day in enumerate(["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi"])}
+    weekly.update({"Samedi": "Aucune", "Dimanche": "Aucune"})
+
+    # Exceptions étalées sur 2018-2030, hors grandes vacances et rentrée (la recherche de la prochaine sonnerie traverse l'été)
+    candidates = [day for day in (date(2018, 1, 1) + timedelta(days=i) for i in range((date(2031, 1, 1) - date(2018, 1, 1)).days))
+                  if day.month not in (7, 8) and not (day.month == 9 and day.day <= 7)]
+    step = max(1, len(candidates) // scale["exceptions"])
+    exceptions = {}
+    for i, day in enumerate(candidates[::step][:scale["exceptions"]]):
+        if i % 3:
+            exceptions[day.isoformat()] = {"action": "utiliser_jt", "journee_type": names[i % len(names)],
+                                           "description": "Emploi du temps modifié"}
+        else:
+            exceptions[day.isoformat()] = {"action": "silence", "description": "Sortie scolaire"}
+
+    ics_path = os.path.join(config_dir, "vacances_bench.ics")
+    _write_ics(ics_path, _vacations(2017, 2030))
+    _write_json(os.path.join(config_dir, "donnees_sonneries.json"), {
+        "sonneries": {"debut.mp3": "Début", "fin.mp3": "Fin"}, "journees_types": day_types,
+        "planning_hebdomadaire": weekly, "exceptions_planning": exceptions, "vacances": {"ics_file_path": ics_path}})
+    # Ni URL d'API ni zone: aucun téléchargement pendant les mesures
+    _write_json(os.path.join(config_dir, "parametres_college.json"), {
+        "zone": "", "api_holidays_url": "", "country_code_holidays": "FR", "sonnerie_ppms": "debut.mp3"})
+
+    holidays = {}
+    for year in range(2017, 2031):
+        for month, day, label in ((1, 1, "Jour de l'an"), (5, 1, "Fête du Travail"), (5, 8, "Victoire 1945"),
+                                  (7, 14, "Fête nationale"), (8, 15, "Assomption"), (11, 1, "Toussaint"),
+                                  (11, 11, "Armistice 1918"), (12, 25, "Noël")):
+            holidays[date(year, month, day).isoformat()] = label
+    _write_json(os.path.join(config_dir, "holiday_cache.json"), holidays)
+
+    half = len(AVAILABLE_PERMISSIONS) // 2
+    _write_json(os.path.join(config_dir, "roles_config.json"), {"roles": {
+        "Administrateur": {"description": "Tout", "permissions": {"admin:has_all_permissions": True}},
+        "Collaborateur": {"description": "Moitié", "permissions": {p: True for p in AVAILABLE_PERMISSIONS[:half]}},
+        "Lecteur": {"description": "Lecture", "permissions": {p: True for p in AVAILABLE_PERMISSIONS if p.startswith("page:")}}}})
+    roles = ["Administrateur", "Collaborateur", "Lecteur"]
+    _write_json(os.path.join(config_dir, "users.json"), {
+        f"user{u:03d}": {"hash": "pbkdf2:sha256:1$bench$0", "role": roles[u % 3], "nom_complet": f"Utilisateur {u}",
+                         "custom_permissions": {AVAILABLE_PERMISSIONS[-1]: True} if u % 7 == 0 else None}
+        for u in range(scale["users"])})
+
+
+# --- Mesure ---
+
+def measure(func, min_run_seconds: float = BENCH_MIN_RUN_SECONDS, repeat: int = BENCH_REPEAT) -> dict:
+    """Durée par appel (ms): nombre d'appels ajusté pour durer au moins min_run_seconds, meilleure et médiane de `repeat` mesures."""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - started >= min_run_seconds or number >= 1 << 20:
+            break
+        number *= 2
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        runs.append((time.perf_counter() - started) / number * 1000)
+    median_ms = statistics.median(runs)
+    return {"median_ms": round(median_ms, 4), "best_ms": round(min(runs), 4),
+            "ops_per_s": round(1000 / median_ms, 1) if median_ms else None, "calls_per_run": number, "runs": repeat}
+
+
+def run_scale(backend, scale_name: str) -> dict:
+    """Charge la configuration synthétique dans le backend puis mesure chaque chemin critique."""
+    from scheduler import SchedulerManager
+    from constants import AVAILABLE_PERMISSIONS
+
+    scale = SCALES[scale_name]
+    config_dir = tempfile.mkdtemp(prefix=f"bench_{scale_name}_")
+    try:
+        build_fixture(config_dir, scale)
+        backend.CONFIG_PATH = config_dir
+        backend.holiday_manager = None # Recréé sur le cache de fériés de la configuration synthétique
+        if not backend.load_all_configs():
+            raise RuntimeError(f"Chargement de la configuration synthétique '{scale_name}' échoué.")
+        hm = backend.holiday_manager
+        weekly, exceptions = backend.weekly_planning, backend.planning_exceptions
+
+        year_days = [ACADEMIC_YEAR_START + timedelta(days=i) for i in range(365)]
+        def day_types_for_year():
+            for day in year_days:
+                hm.get_day_type_and_desc(day, weekly, exceptions)
+
+        scheduler_logger = logging.getLogger("benchmarks.scheduler")
+        scheduler_logger.setLevel(logging.ERROR)
+        scheduler = SchedulerManager(backend.day_types, weekly, exceptions, hm, config_dir, scheduler_logger)
+        first_day_type = next(iter(backend.day_types))
+        day_info = {"schedule_name": first_day_type}
+
+        users = [backend.load_user(user_id) for user_id in list(backend.users_data)[:3]] # Un utilisateur par rôle
+        def permission_checks():
+            for user in users:
+                for permission in AVAILABLE_PERMISSIONS:
+                    backend.user_has_permission(user, permission)
+        checks_per_call = len(users) * len(AVAILABLE_PERMISSIONS)
+
+        results = {}
+        results["get_day_type_and_desc"] = measure(day_types_for_year)
+        results["get_day_type_and_desc"]["days_per_call"] = len(year_days)
+        results["calendar_view_year"] = measure(
+            lambda: backend.get_calendar_view_data_range(ACADEMIC_YEAR_START, ACADEMIC_YEAR_START + timedelta(days=364)))
+        results["find_next_event_summer_break"] = measure(lambda: scheduler._find_absolute_next_event(SUMMER_BREAK_START))
+        results["generate_daily_events"] = measure(
+            lambda: scheduler._generate_daily_events(day_info, backend.day_types, ACADEMIC_YEAR_START))
+        results["user_has_permission"] = measure(permission_checks)
+        results["user_has_permission"]["checks_per_call"] = checks_per_call
+        results["load_all_configs"] = measure(backend.load_all_configs, repeat=3)
+        return {"fixture": scale, "results": results}
+    finally:
+        shutil.rmtree(config_dir, ignore_errors=True)
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_comparison(current: dict, baseline: dict):
+    """Écart de la médiane par mesure (négatif = plus rapide que le résultat précédent)."""
+    print(f"Comparaison avec {baseline.get('revision') or '?'} ({baseline.get('generated_at', '?')}):", file=sys.stderr)
+    for scale_name, scale in current["scales"].items():
+        previous = baseline.get("scales", {}).get(scale_name, {}).get("results", {})
+        for bench, result in scale["results"].items():
+            before = previous.get(bench, {}).get("median_ms")
+            change = f"{(result['median_ms'] - before) / before:+.1%}" if before else "nouveau"
+            print(f"  [{scale_name}] {bench:32} {result['median_ms']:>10.3f} ms  ({change})", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks des chemins critiques du backend")
+    parser.add_argument("--scale", choices=list(SCALES) + ["all"], default="all", help="Taille de la configuration synthétique")
+    parser.add_argument("--output", help="Fichier JSON de résultat (défaut: sortie standard)")
+    parser.add_argument("--compare", help="Résultat JSON précédent à comparer")
+    args = parser.parse_args()
+
+    sys.path.insert(0, BASE_DIR)
+    import backend_server as backend
+    from logging_setup import SUBSYSTEMS, set_subsystem_levels
+    # Journaux coupés pendant les mesures (y compris les avertissements attendus: ni zone ni API configurées)
+    set_subsystem_levels({name: "ERROR" for name in SUBSYSTEMS})
+
+    report = {"generated_at": datetime.now().isoformat(timespec='seconds'), "revision": _git_revision(),
+              "python": platform.python_version(), "platform": platform.platform(), "scales": {}}
+    for scale_name in (SCALES if args.scale == "all" else [args.scale]):
+        report["scales"][scale_name] = run_scale(backend, scale_name)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            print_comparison(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
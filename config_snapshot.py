@@ -0,0 +1,220 @@
+# config_snapshot.py
+"""
+Copie locale « dernière version connue » du dossier de configuration du partage.
+
+Au démarrage, si une copie existe, l'application la lit immédiatement (aucun accès
+au partage). Le partage est ensuite sondé en arrière-plan avec un délai strict ;
+dès qu'il répond, les deux côtés sont réconciliés et l'application bascule sur le
+partage. Tant que le partage est lisible, la copie locale est rafraîchie régulièrement.
+"""
+import os
+import json
+import shutil
+import threading
+import logging
+from datetime import datetime
+
+MANIFEST_FILE = "snapshot_manifest.json"
+
+_snapshot_startup = False # Démarrage sur la copie locale: réservé au serveur (voir enable_snapshot_startup)
+_probes = {} # chemin -> sondage en cours {"thread", "result"} (au plus un par chemin)
+_probes_lock = threading.Lock()
+
+
+def enable_snapshot_startup():
+    """
+    Autorise constants.py à démarrer sur la copie locale de la configuration.
+    Appelé par le serveur avant d'importer constants : les autres programmes (outil
+    d'administration...) continuent de lire et d'écrire directement sur le partage.
+    """
+    global _snapshot_startup
+    _snapshot_startup = True
+
+
+def snapshot_startup_enabled() -> bool:
+    return _snapshot_startup
+
+
+def has_snapshot(snapshot_dir: str) -> bool:
+    """True si une copie complète a déjà été faite (manifeste présent)."""
+    return os.path.isfile(os.path.join(snapshot_dir, MANIFEST_FILE))
+
+
+def probe_path(path: str, timeout: float) -> bool:
+    """
+    Vérifie qu'un dossier est lisible, sans jamais bloquer plus de `timeout` secondes
+    (un partage SMB injoignable peut bloquer os.path.exists plusieurs dizaines de secondes).
+    Un sondage resté bloqué n'est pas relancé : on attend sa réponse au lieu d'empiler
+    un nouveau thread bloqué sur le partage à chaque appel.
+    """
+    with _probes_lock:
+        probe = _probes.get(path)
+        if probe is None or not probe["thread"].is_alive():
+            probe = {"result": None}
+            def _probe():
+                probe["result"] = os.path.isdir(path) and os.access(path, os.R_OK)
+            probe["thread"] = threading.Thread(target=_probe, name="SharePathProbe", daemon=True)
+            probe["thread"].start()
+            _probes[path] = probe
+    probe["thread"].join(timeout)
+    return bool(probe["result"])
+
+
+class ConfigSnapshot:
+    """Synchronise share_dir (config du partage) et snapshot_dir (copie locale)."""
+
+    def __init__(self, share_dir: str, snapshot_dir: str, logger: logging.Logger,
+                 probe_timeout: float = 3, refresh_interval_seconds: int = 300, on_share_available=None):
+        """
+        Args:
+            share_dir: Dossier config du partage réseau.
+            snapshot_dir: Dossier local de la copie.
+            logger: Instance du logger.
+            probe_timeout: Délai max (s) pour sonder le partage.
+            refresh_interval_seconds: Délai entre deux rafraîchissements/sondages.
+            on_share_available: Fonction appelée (avec la liste des fichiers modifiés par la
+                                réconciliation) la première fois que le partage redevient lisible.
+        """
+        self.share_dir = share_dir
+        self.snapshot_dir = snapshot_dir
+        self.logger = logger
+        self.probe_timeout = probe_timeout
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self._on_share_available = on_share_available
+
+        self._lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._share_available = False
+        self._last_refresh = None
+
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        self._manifest = self._load_manifest()
+
+    # --- Manifeste: pour chaque fichier, mtime local et mtime du partage lors de la dernière copie ---
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(os.path.join(self.snapshot_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f).get("files", {})
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.logger.warning(f"Manifeste de la copie de configuration illisible: {e}")
+            return {}
+
+    def _save_manifest(self):
+        path = os.path.join(self.snapshot_dir, MANIFEST_FILE)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({"files": self._manifest, "refreshed_at": datetime.now().isoformat(timespec='seconds')}, f, indent=2, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    @staticmethod
+    def _copy(src: str, dst: str):
+        shutil.copy2(src, dst + ".part")
+        os.replace(dst + ".part", dst)
+
+    def _record(self, name: str):
+        self._manifest[name] = {
+            "local_mtime": os.path.getmtime(os.path.join(self.snapshot_dir, name)),
+            "share_mtime": os.path.getmtime(os.path.join(self.share_dir, name))
+        }
+
+    def reconcile(self) -> list:
+        """
+        Réconcilie la copie locale et le partage. Doit être appelé quand le partage est lisible.
+        - Fichier modifié localement (pendant une coupure) et inchangé sur le partage -> renvoyé sur le partage.
+        - Sinon, la version du partage est recopiée localement. En cas de conflit (modifié des deux
+          côtés), le partage gagne et la version locale est conservée en '<nom>.conflit-<date>'.
+        Retourne la liste des fichiers dont le contenu local a changé.
+        """
+        changed = []
+        with self._lock:
+            share_files = {e.name for e in os.scandir(self.share_dir) if e.is_file()}
+            local_files = {e.name for e in os.scandir(self.snapshot_dir)
+                           if e.is_file() and e.name != MANIFEST_FILE and not e.name.endswith((".part", ".tmp")) and ".conflit-" not in e.name}
+
+            for name in sorted(share_files | local_files):
+                local_path = os.path.join(self.snapshot_dir, name)
+                share_path = os.path.join(self.share_dir, name)
+                entry = self._manifest.get(name)
+                local_modified = name in local_files and (entry is None or os.path.getmtime(local_path) != entry.get("local_mtime"))
+                share_modified = name in share_files and (entry is None or os.path.getmtime(share_path) != entry.get("share_mtime"))
+
+                try:
+                    if name not in share_files:
+                        if entry is None: # Créé localement pendant une coupure
+                            self._copy(local_path, share_path)
+                            self.logger.info(f"Copie config: '{name}' créé hors ligne, envoyé sur le partage.")
+                            self._record(name)
+                        else: # Supprimé du partage
+                            os.remove(local_path)
+                            self._manifest.pop(name, None)
+                            changed.append(name)
+                        continue
+                    if local_modified and not share_modified and entry is not None:
+                        self._copy(local_path, share_path)
+                        self.logger.warning(f"Copie config: '{name}' modifié hors ligne, envoyé sur le partage.")
+                    elif share_modified or name not in local_files:
+                        if local_modified and entry is not None:
+                            conflict_path = f"{local_path}.conflit-{datetime.now():%Y%m%d-%H%M%S}"
+                            shutil.copy2(local_path, conflict_path)
+                            self.logger.warning(f"Copie config: conflit sur '{name}' (modifié des deux côtés). Version du partage gardée, version locale sauvegardée: {conflict_path}")
+                        self._copy(share_path, local_path)
+                        changed.append(name)
+                    self._record(name)
+                except OSError as e:
+                    self.logger.error(f"Copie config: échec réconciliation '{name}': {e}")
+
+            self._save_manifest()
+            self._last_refresh = datetime.now()
+        if changed:
+            self.logger.info(f"Copie config réconciliée avec le partage, fichiers mis à jour: {changed}")
+        return changed
+
+    # --- Thread de fond ---
+
+    def _run(self):
+        self.logger.info(f"Thread copie de configuration démarré (partage: {self.share_dir}).")
+        while not self._stop_event.is_set():
+            if probe_path(self.share_dir, self.probe_timeout):
+                try:
+                    changed = self.reconcile()
+                    if not self._share_available:
+                        self._share_available = True
+                        self.logger.info("Partage de configuration accessible.")
+                        if self._on_share_available:
+                            self._on_share_available(changed)
+                except Exception as e:
+                    self.logger.error(f"Erreur synchronisation copie de configuration: {e}", exc_info=True)
+            else:
+                if self._share_available:
+                    self.logger.warning(f"Partage de configuration injoignable (délai {self.probe_timeout}s). Copie locale conservée.")
+                self._share_available = False
+            self._wake_event.wait(timeout=self.refresh_interval_seconds)
+            self._wake_event.clear()
+        self.logger.info("Thread copie de configuration terminé.")
+
+    def start(self, share_available: bool = False):
+        """
+        Démarre le thread de fond.
+        share_available: True si l'application lit déjà le partage (pas de bascule à faire).
+        """
+        self._share_available = share_available
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="ConfigSnapshotSync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def request_refresh(self):
+        """Demande un rafraîchissement immédiat (ex: après modification de la configuration)."""
+        self._wake_event.set()
+
+    def is_share_available(self) -> bool:
+        return self._share_available
@@ -3,8 +3,10 @@
 Constantes, chemins et données statiques pour l'application Sonneries Collège.
 """
 import os
+import time
 import logging
 import sys # Pour stderr
+from config_snapshot import has_snapshot, probe_path, snapshot_startup_enabled
 
 # --- Configuration du Logger (simple pour ce fichier) ---
 log_constants = logging.getLogger('constants_setup')
@@ -25,21 +27,42 @@ log_constants.info("Chargement du module constants...")
 # Chemin UNC (\\serveur\partage\) ou chemin local (C:\...) vers le dossier racine
 # contenant les sous-dossiers 'config' et 'mp3'.
 NETWORK_BASE_PATH = r"\\192.168.10.15\AppSonnerieCollege" # <--- Chemin actuel (Vérifié OK)
+SHARE_CONFIG_PATH = os.path.join(NETWORK_BASE_PATH, 'config')
+SHARE_MP3_PATH = os.path.join(NETWORK_BASE_PATH, 'mp3')
+NETWORK_PROBE_TIMEOUT_SECONDS = 3 # Un partage injoignable ne doit jamais bloquer le démarrage plus longtemps
+
+# --- Cache local (toujours sur le disque de la machine, jamais sur le partage) ---
+LOCAL_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+MP3_MIRROR_PATH = os.path.join(LOCAL_CACHE_PATH, 'mp3') # Miroir local de MP3_PATH (voir mp3_mirror.py)
+LOCAL_CONFIG_SNAPSHOT_PATH = os.path.join(LOCAL_CACHE_PATH, 'config') # Dernière config connue du partage (voir config_snapshot.py)
+SOUND_CATALOG_FILE = os.path.join(LOCAL_CACHE_PATH, 'sound_catalog.json') # Catalogue des MP3 (voir sound_catalog.py)
+RING_READY_CACHE_PATH = os.path.join(LOCAL_CACHE_PATH, 'ring_ready') # Copies WAV prêtes à sonner (voir audio_analysis.py)
+UPLOAD_TMP_PATH = os.path.join(LOCAL_CACHE_PATH, 'uploads') # Uploads de sons en cours (voir upload_sessions.py)
+STATIC_GZIP_CACHE_PATH = os.path.join(LOCAL_CACHE_PATH, 'static_gz') # Copies gzip des fichiers statiques (voir static_assets.py)
+JINJA_CACHE_PATH = os.path.join(LOCAL_CACHE_PATH, 'jinja') # Bytecode des templates compilés (voir template_cache.py)
+# Historique des sonneries et alertes: sur le disque local, hors du cache (ne doit pas être vidé)
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'history') # Voir history_store.py
 
 # Définir des valeurs initiales
 CONFIG_PATH = None
 MP3_PATH = None
 USING_NETWORK_PATH = False
+CONFIG_FROM_SNAPSHOT = False # True si le démarrage se fait sur la copie locale (partage sondé en arrière-plan)
 
+_path_probe_started = time.perf_counter()
 try:
     log_constants.info(f"Chemin réseau/base configuré: {NETWORK_BASE_PATH}")
-    log_constants.info(f"Vérification de l'accessibilité...")
-    network_accessible = os.path.exists(NETWORK_BASE_PATH) and os.access(NETWORK_BASE_PATH, os.R_OK)
-
-    if network_accessible:
+    if snapshot_startup_enabled() and has_snapshot(LOCAL_CONFIG_SNAPSHOT_PATH):
+        # Serveur uniquement: démarrage immédiat sur la copie locale, sans toucher au partage
+        log_constants.info(f"Copie locale de la configuration trouvée: démarrage sur '{LOCAL_CONFIG_SNAPSHOT_PATH}', partage sondé en arrière-plan.")
+        CONFIG_PATH = LOCAL_CONFIG_SNAPSHOT_PATH
+        MP3_PATH = SHARE_MP3_PATH # Lu via le miroir MP3 local
+        USING_NETWORK_PATH = True
+        CONFIG_FROM_SNAPSHOT = True
+    elif probe_path(NETWORK_BASE_PATH, NETWORK_PROBE_TIMEOUT_SECONDS):
         log_constants.info(f"Chemin trouvé et accessible. Utilisation de: {NETWORK_BASE_PATH}")
-        CONFIG_PATH = os.path.join(NETWORK_BASE_PATH, 'config')
-        MP3_PATH = os.path.join(NETWORK_BASE_PATH, 'mp3')
+        CONFIG_PATH = SHARE_CONFIG_PATH
+        MP3_PATH = SHARE_MP3_PATH
         USING_NETWORK_PATH = True
         # Vérifier existence sous-dossiers (avertissement seulement)
         if not os.path.isdir(CONFIG_PATH): log_constants.warning(f"Sous-dossier 'config' non trouvé dans {NETWORK_BASE_PATH}")
@@ -63,6 +86,7 @@ try:
 
 except Exception as e_global:
     log_constants.error(f"Erreur globale détermination chemins: {e_global}", exc_info=True)
+PATH_PROBE_SECONDS = time.perf_counter() - _path_probe_started # Durée de détermination des chemins (rapport --profile-startup)
 
 # --- Noms des Fichiers de Configuration (dans CONFIG_PATH) ---
 DONNEES_SONNERIES_FILE = "donnees_sonneries.json"
@@ -0,0 +1,204 @@
+# history_store.py
+"""
+Historique des sonneries et alertes (ajout seul), consultable par /api/history.
+
+Chaque événement (sonnerie planifiée, alerte manuelle, fin ou arrêt d'alerte) est
+ajouté en une ligne JSON au fichier du jour (<dossier>/AAAA-MM-JJ.jsonl) : rien n'est
+jamais réécrit, et le journal applicatif peut tourner sans perdre la trace de ce qui
+a sonné. Un cumul par jour (rollups.json : nombre d'événements par type et par
+résultat, retard moyen/maximal) est mis à jour à chaque ajout ; il sert aux
+rapports et à la pagination (les jours entiers hors de la page ne sont pas relus).
+"""
+import os
+import json
+import threading
+import logging
+from datetime import datetime, date
+
+HISTORY_FILE_SUFFIX = ".jsonl"
+ROLLUPS_FILE_NAME = "rollups.json"
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 500
+
+# Types d'événements
+RING = "ring" # Sonnerie planifiée (scheduler)
+ALERT = "alert" # Alerte déclenchée manuellement
+ALERT_END = "alert_end" # Son de fin d'alerte
+ALERT_STOP = "alert_stop" # Alerte coupée sans son de fin
+EVENT_TYPES = (RING, ALERT, ALERT_END, ALERT_STOP)
+
+# Résultats
+OK = "ok"
+ERROR = "error"
+TIMEOUT = "timeout" # Lecture arrêtée de force (plus longue que prévu)
+MISSING = "missing" # Fichier son introuvable
+
+
+def _empty_rollup() -> dict:
+    # bytes: taille du fichier du jour couverte par le cumul (détecte un cumul en retard après un arrêt brutal)
+    return {"total": 0, "by_type": {}, "by_outcome": {}, "delay_count": 0, "delay_ms_sum": 0, "delay_ms_max": None, "bytes": 0}
+
+
+def _add_to_rollup(rollup: dict, event: dict):
+    rollup["total"] += 1
+    rollup["by_type"][event["type"]] = rollup["by_type"].get(event["type"], 0) + 1
+    rollup["by_outcome"][event["outcome"]] = rollup["by_outcome"].get(event["outcome"], 0) + 1
+    delay_ms = event.get("delay_ms")
+    if delay_ms is not None:
+        rollup["delay_count"] += 1
+        rollup["delay_ms_sum"] += delay_ms
+        rollup["delay_ms_max"] = delay_ms if rollup["delay_ms_max"] is None else max(rollup["delay_ms_max"], delay_ms)
+
+
+class HistoryStore:
+    """Événements par jour en JSON lines, cumuls journaliers incrémentaux."""
+
+    def __init__(self, history_dir: str, logger: logging.Logger):
+        """
+        Args:
+            history_dir: Dossier local de l'historique (un fichier par jour + rollups.json).
+            logger: Instance du logger.
+        """
+        self.history_dir = history_dir
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._rollups = None # date ISO -> cumul, chargé au premier besoin
+
+    # --- Fichiers ---
+
+    def _day_path(self, day: str) -> str:
+        return os.path.join(self.history_dir, day + HISTORY_FILE_SUFFIX)
+
+    def _days_on_disk(self) -> list:
+        if not os.path.isdir(self.history_dir):
+            return []
+        return sorted(name[:-len(HISTORY_FILE_SUFFIX)] for name in os.listdir(self.history_dir)
+                      if name.endswith(HISTORY_FILE_SUFFIX))
+
+    def _read_day(self, day: str) -> list:
+        events = []
+        try:
+            with open(self._day_path(day), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        continue # Ligne tronquée (arrêt brutal pendant l'écriture)
+        except FileNotFoundError:
+            pass
+        return events
+
+    def _load_rollups(self) -> dict:
+        """Charge les cumuls (appelé avec le verrou) et recalcule ceux des jours absents ou incohérents."""
+        if self._rollups is not None:
+            return self._rollups
+        rollups = {}
+        try:
+            with open(os.path.join(self.history_dir, ROLLUPS_FILE_NAME), 'r', encoding='utf-8') as f:
+                rollups = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Historique: cumuls illisibles, recalcul: {e}")
+        rebuilt = 0
+        for day in self._days_on_disk():
+            size = os.path.getsize(self._day_path(day))
+            if day not in rollups or rollups[day].get("bytes") != size:
+                rollups[day] = _empty_rollup()
+                for event in self._read_day(day):
+                    _add_to_rollup(rollups[day], event)
+                rollups[day]["bytes"] = size
+                rebuilt += 1
+        self._rollups = rollups
+        if rebuilt:
+            self.logger.info(f"Historique: cumuls recalculés pour {rebuilt} jour(s).")
+            self._save_rollups()
+        return rollups
+
+    def _save_rollups(self):
+        path = os.path.join(self.history_dir, ROLLUPS_FILE_NAME)
+        try:
+            with open(path + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump(self._rollups, f, ensure_ascii=False, sort_keys=True)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            self.logger.error(f"Historique: écriture des cumuls impossible: {e}")
+
+    # --- Écriture ---
+
+    def record(self, event_type: str, outcome: str, sound: str = None, scheduled_at: datetime = None,
+               started_at: datetime = None, devices=None, user: str = None, label: str = None, error: str = None):
+        """
+        Ajoute un événement. started_at: heure réelle de lancement (défaut: maintenant) ;
+        scheduled_at: heure prévue (sonneries planifiées), pour mesurer le retard.
+        Une erreur d'écriture est journalisée mais ne remonte jamais (la sonnerie prime).
+        """
+        started_at = started_at or datetime.now()
+        event = {"ts": started_at.isoformat(timespec='milliseconds'), "type": event_type, "outcome": outcome,
+                 "sound": sound, "devices": list(devices) if devices else None}
+        if scheduled_at:
+            event["scheduled"] = scheduled_at.isoformat(timespec='seconds')
+            event["delay_ms"] = round((started_at - scheduled_at).total_seconds() * 1000)
+        for key, value in (("label", label), ("user", user), ("error", error)):
+            if value:
+                event[key] = value
+        day = started_at.date().isoformat()
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock:
+            try:
+                rollups = self._load_rollups()
+                os.makedirs(self.history_dir, exist_ok=True)
+                with open(self._day_path(day), 'a', encoding='utf-8') as f:
+                    f.write(line)
+                    size = f.tell()
+                rollup = rollups.setdefault(day, _empty_rollup())
+                _add_to_rollup(rollup, event)
+                rollup["bytes"] = size
+                self._save_rollups()
+            except OSError as e:
+                self.logger.error(f"Historique: événement non enregistré ({event_type} '{sound}'): {e}")
+
+    # --- Lecture ---
+
+    def query(self, date_from: date = None, date_to: date = None, event_type: str = None,
+              page: int = 1, per_page: int = HISTORY_PAGE_SIZE) -> dict:
+        """
+        Événements du plus récent au plus ancien, entre date_from et date_to inclus,
+        éventuellement d'un seul type. Seuls les fichiers des jours de la page demandée
+        sont lus : le nombre d'événements de chaque jour vient des cumuls.
+        """
+        per_page = max(1, min(per_page, HISTORY_MAX_PAGE_SIZE))
+        page = max(1, page)
+        low = date_from.isoformat() if date_from else ""
+        high = date_to.isoformat() if date_to else "9999"
+        with self._lock:
+            rollups = self._load_rollups()
+            days = sorted((day for day in rollups if low <= day <= high), reverse=True)
+            counts = {day: (rollups[day]["by_type"].get(event_type, 0) if event_type else rollups[day]["total"]) for day in days}
+        total = sum(counts.values())
+        skip = (page - 1) * per_page
+        events = []
+        for day in days:
+            if len(events) >= per_page:
+                break
+            if skip >= counts[day]:
+                skip -= counts[day] # Jour entièrement avant la page: pas besoin de le lire
+                continue
+            day_events = [e for e in reversed(self._read_day(day)) if not event_type or e.get("type") == event_type]
+            events.extend(day_events[skip:skip + per_page - len(events)])
+            skip = 0
+        return {"events": events, "page": page, "per_page": per_page, "total": total,
+                "pages": (total + per_page - 1) // per_page}
+
+    def get_rollups(self, date_from: date = None, date_to: date = None) -> dict:
+        """Cumuls journaliers (date ISO -> cumul, avec retard moyen en ms) entre deux dates incluses."""
+        low = date_from.isoformat() if date_from else ""
+        high = date_to.isoformat() if date_to else "9999"
+        with self._lock:
+            rollups = self._load_rollups()
+            selected = {day: dict(rollup) for day, rollup in rollups.items() if low <= day <= high}
+        for rollup in selected.values():
+            count = rollup.pop("delay_count")
+            rollup["delay_ms_avg"] = round(rollup.pop("delay_ms_sum") / count) if count else None
+            rollup.pop("bytes", None)
+        return selected
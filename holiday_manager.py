@@ -2,19 +2,32 @@
 
 import logging
 from datetime import date, datetime, timedelta
-import requests
+from functools import lru_cache
 import json
 import os
 import sys # Importer sys pour stderr dans le logger fallback
 
-# Essayer d'importer icalendar et logguer si absent
-try:
-    from icalendar import Calendar
-    ICALENDAR_AVAILABLE = True
-except ImportError:
-    Calendar = None
-    ICALENDAR_AVAILABLE = False
-    logging.getLogger(__name__).warning("Librairie 'icalendar' non installée. Import/parsing ICS échouera.")
+from metrics import REGISTRY
+
+HOLIDAY_FETCH_SECONDS = REGISTRY.histogram("holiday_fetch_duration_seconds",
+                                           "Durée des téléchargements (API jours fériés, ICS vacances).", ("source",))
+HOLIDAY_FETCH_FAILURES = REGISTRY.counter("holiday_fetch_failures_total",
+                                          "Téléchargements de jours fériés / vacances en échec.", ("source",))
+CALENDAR_CACHE_LOOKUPS = REGISTRY.counter("calendar_cache_lookups_total",
+                                          "Chargements du calendrier servis par le cache local (hit) ou téléchargés (miss).",
+                                          ("cache", "result"))
+
+# requests et icalendar sont importés à la première utilisation (téléchargement / analyse ICS) :
+# imports coûteux, inutiles au démarrage quand les caches sont à jour.
+@lru_cache(maxsize=None)
+def _load_icalendar():
+    """Retourne icalendar.Calendar, ou None (et un avertissement) si la librairie est absente."""
+    try:
+        from icalendar import Calendar
+        return Calendar
+    except ImportError:
+        logging.getLogger(__name__).warning("Librairie 'icalendar' non installée. Import/parsing ICS échouera.")
+        return None
 
 # Importer les constantes nécessaires
 try:
@@ -44,7 +57,7 @@ class HolidayManager:
     TEMP_ICS_FILENAME = "temp_vacances_downloaded.ics"
     CACHE_EXPIRY_DAYS = 7
 
-    Calendar = Calendar
+    Calendar = None # Remplaçable (ex: tests), sinon icalendar.Calendar chargé à la demande
 
     def __init__(self, logger_instance: logging.Logger, cache_dir=None):
         """ Initialise le gestionnaire. """
@@ -105,16 +118,22 @@ class HolidayManager:
             except Exception as e: self.logger.warning(f"Vérif âge cache fériés échouée ({self.holiday_cache_path}): {e}. Considéré expiré.")
 
         if not force_refresh and not cache_expired and self._holidays:
+             CALENDAR_CACHE_LOOKUPS.inc(cache="holidays", result="hit")
              self.logger.info("Utilisation jours fériés depuis cache (non expiré/forcé)."); return True
+        CALENDAR_CACHE_LOOKUPS.inc(cache="holidays", result="miss")
 
         # --- Reste de la logique API ---
         self.logger.info("Récupération jours fériés depuis API..."); current_year = datetime.now().year; years_to_load = [current_year - 1, current_year, current_year + 1, current_year + 2]
         self.logger.info(f"Années à charger/màj depuis API: {years_to_load}") # Log ajouté pour confirmer
         new_holidays = {}; api_ok = True
+        import requests # Import différé (voir en tête de fichier)
         for year in years_to_load:
             full_url = f"{api_url.rstrip('/')}/{year}/{country_code}"; self.logger.debug(f"Appel API {year}: {full_url}")
+            year_ok = api_ok
             try:
-                response = requests.get(full_url, timeout=15); self.logger.debug(f"API {year} status: {response.status_code}"); response.raise_for_status(); api_data = response.json()
+                with HOLIDAY_FETCH_SECONDS.time(source="holidays_api"):
+                    response = requests.get(full_url, timeout=15)
+                self.logger.debug(f"API {year} status: {response.status_code}"); response.raise_for_status(); api_data = response.json()
                 self.logger.info(f"API {year} data OK ({len(api_data)} jours).")
                 for item in api_data:
                     try:
@@ -125,6 +144,7 @@ class HolidayManager:
             except requests.exceptions.RequestException as e_req: self.logger.error(f"API fériés {year} erreur req: {e_req}"); api_ok = False
             except json.JSONDecodeError as e_json: self.logger.error(f"API fériés {year} erreur JSON: {e_json}"); api_ok = False
             except Exception as e_glob: self.logger.error(f"API fériés {year} erreur glob: {e_glob}", exc_info=True); api_ok = False
+            if year_ok and not api_ok: HOLIDAY_FETCH_FAILURES.inc(source="holidays_api")
         if new_holidays and api_ok:
              self.logger.info(f"Total {len(new_holidays)} fériés chargés API {years_to_load}."); self._holidays = new_holidays; self._save_holidays_to_cache(); return True
         elif not new_holidays and api_ok: self.logger.warning("Aucun férié valide retourné par API."); return bool(self._holidays)
@@ -157,8 +177,10 @@ class HolidayManager:
         """Télécharge un fichier ICS depuis une URL et le sauvegarde."""
         if not save_path: self.logger.error("Chemin de sauvegarde ICS temporaire non défini."); return False
         self.logger.info(f"Tentative téléchargement ICS: {url}")
+        import requests # Import différé (voir en tête de fichier)
         try:
-            response = requests.get(url, timeout=20, allow_redirects=True, headers={'User-Agent': 'CollegeSonnerieApp/1.0'})
+            with HOLIDAY_FETCH_SECONDS.time(source="vacations_ics"):
+                response = requests.get(url, timeout=20, allow_redirects=True, headers={'User-Agent': 'CollegeSonnerieApp/1.0'})
             self.logger.debug(f"DL ICS status: {response.status_code}")
             response.raise_for_status()
             content_type = response.headers.get('content-type', '').lower()
@@ -167,9 +189,11 @@ class HolidayManager:
             with open(save_path, 'wb') as f: f.write(response.content)
             self.logger.info(f"ICS téléchargé et sauvé dans: {save_path}")
             return True
-        except requests.exceptions.Timeout: self.logger.error(f"Timeout DL ICS: {url}"); return False
-        except requests.exceptions.RequestException as e: self.logger.error(f"Erreur DL ICS {url}: {e}"); return False
-        except Exception as e: self.logger.error(f"Erreur inattendue DL/Save ICS: {e}", exc_info=True); return False
+        except requests.exceptions.Timeout: self.logger.error(f"Timeout DL ICS: {url}")
+        except requests.exceptions.RequestException as e: self.logger.error(f"Erreur DL ICS {url}: {e}")
+        except Exception as e: self.logger.error(f"Erreur inattendue DL/Save ICS: {e}", exc_info=True)
+        HOLIDAY_FETCH_FAILURES.inc(source="vacations_ics")
+        return False
 
     def load_vacations(self, zone, local_ics_path=None, manual_ics_base_url=None):
         self.logger.info(f"Load vacances: Zone={zone}, PathLocal={local_ics_path}, URLManuelle={manual_ics_base_url}")
@@ -262,12 +286,13 @@ class HolidayManager:
 
     def _parse_ics_file(self, ics_file_path):
         """ Analyse fichier ICS. Retourne la LISTE des vacances trouvées ou None si erreur. """
-        if not ICALENDAR_AVAILABLE or self.Calendar is None: self.logger.error("icalendar non dispo."); return None
+        calendar_cls = self.Calendar or _load_icalendar()
+        if calendar_cls is None: self.logger.error("icalendar non dispo."); return None
         if not os.path.isfile(ics_file_path): self.logger.error(f"Fichier ICS à parser introuvable: {ics_file_path}"); return None
         
         parsed_vacations = []; count=0; ignored=0
         try:
-            with open(ics_file_path, 'rb') as f: cal = self.Calendar.from_ical(f.read())
+            with open(ics_file_path, 'rb') as f: cal = calendar_cls.from_ical(f.read())
             for comp in cal.walk('VEVENT'):
                 # ... (logique de parsing existante) ...
                 count += 1; summary = comp.get('summary'); dtstart = comp.get('dtstart'); dtend = comp.get('dtend')
@@ -330,7 +355,8 @@ class HolidayManager:
             return {"type": "Erreur", "description": "Date invalide", "schedule_name": None}
 
         date_str = target_date.strftime('%Y-%m-%d')
-        self.logger.debug(f"Détermination du type de jour pour : {date_str}")
+        # Appelé pour chaque jour scanné par le scheduler : formatage différé (%s)
+        self.logger.debug("Détermination du type de jour pour : %s", date_str)
 
         # 1. Priorité absolue : les Exceptions
         if planning_exceptions and date_str in planning_exceptions:
@@ -338,7 +364,7 @@ class HolidayManager:
             action = details.get("action", "silence")
             jt_name = details.get("journee_type")
             desc = details.get("description", "") or (f"Exception: {action.upper()}" + (f" ({jt_name})" if jt_name else ""))
-            self.logger.debug(f"-> Règle trouvée : Exception '{action}' pour {date_str}")
+            self.logger.debug("-> Règle trouvée : Exception '%s' pour %s", action, date_str)
             if action == "utiliser_jt":
                 return {"type": f"Exception (utiliser_jt)", "description": desc, "schedule_name": jt_name}
             # Toutes les autres actions (silence, ou action inconnue) sont traitées comme silence
@@ -347,14 +373,14 @@ class HolidayManager:
         # 2. Priorité suivante : les Jours Fériés
         holiday_desc = self.get_holiday_description(target_date)
         if holiday_desc:
-            self.logger.debug(f"-> Règle trouvée : Férié ({holiday_desc})")
+            self.logger.debug("-> Règle trouvée : Férié (%s)", holiday_desc)
             return {"type": "Férié", "description": holiday_desc, "schedule_name": None}
 
         # 3. Priorité suivante : les Vacances
         vac_info = self.get_vacation_info(target_date)
         if vac_info:
             desc = vac_info.get('description', 'Vacances')
-            self.logger.debug(f"-> Règle trouvée : Vacances ({desc})")
+            self.logger.debug("-> Règle trouvée : Vacances (%s)", desc)
             return {"type": "Vacances", "description": desc, "schedule_name": None}
 
         # 4. Si ce n'est rien de tout ça, on regarde le Planning Hebdomadaire
@@ -362,7 +388,7 @@ class HolidayManager:
         current_day_key = day_name_fr[target_date.weekday()]
 
         applicable_schedule_name = weekly_planning.get(current_day_key) if weekly_planning else None
-        self.logger.debug(f"-> Planning Hebdo pour {current_day_key} : Valeur lue = '{applicable_schedule_name}'")
+        self.logger.debug("-> Planning Hebdo pour %s : Valeur lue = '%s'", current_day_key, applicable_schedule_name)
 
         # Si la valeur est None (absente), une chaîne vide, ou "Aucune" (insensible à la casse) -> c'est un jour SANS COURS.
         # Correction demandée:
@@ -370,7 +396,7 @@ class HolidayManager:
         # alors le type de jour DOIT être "Weekend".
         # SINON, le type de jour est "Classe (Nom de la Journée Type)".
         if not applicable_schedule_name or not applicable_schedule_name.strip() or applicable_schedule_name.lower() == "aucune":
-            self.logger.debug(f"   -> Interprétation : Jour sans cours (type Weekend) - Nom lu: '{applicable_schedule_name}'")
+            self.logger.debug("   -> Interprétation : Jour sans cours (type Weekend) - Nom lu: '%s'", applicable_schedule_name)
             return {
                 "type": "Weekend",
                 "description": "Aucun planning pour ce jour (Weekend/Aucune)", # Description mise à jour pour clarté
@@ -378,7 +404,7 @@ class HolidayManager:
             }
         else:
             # Sinon, une journée type est assignée -> c'est un jour DE COURS.
-            self.logger.debug(f"   -> Interprétation : Jour de classe (JT: {applicable_schedule_name})")
+            self.logger.debug("   -> Interprétation : Jour de classe (JT: %s)", applicable_schedule_name)
             return {
                 "type": f"Classe ({applicable_schedule_name})", # Format "Classe (Nom de la Journée Type)"
                 "description": f"Planning: {applicable_schedule_name}",
@@ -0,0 +1,99 @@
+# import_budget.py
+"""
+Mesure le temps d'import des modules du backend et le compare à un budget.
+
+Usage: python import_budget.py [--runs N]
+Chaque mesure est faite dans un processus Python neuf (python -X importtime) ;
+on garde la meilleure de N exécutions (la première compile les .pyc).
+Code retour 1 si un budget est dépassé (utilisable avant une mise en production).
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Budgets en millisecondes (import complet, dépendances comprises)
+IMPORT_BUDGETS_MS = {
+    "sound_cli": 20, # Lecteur de son seul (pygame est importé à la lecture)
+    "scheduler": 60,
+    "permissions": 20,
+    "share_io": 40,
+    "backend_server": 900, # Serveur complet: Flask, Flask-Login, config, logging
+}
+
+# Démarrage du sous-processus de lecture ('backend_server.py --play-sound'), pygame compris
+PLAY_SOUND_BUDGET_MS = 300
+
+
+def _parse_importtime(stderr: str) -> dict:
+    """Lignes 'import time: self | cumulé | module' -> {module (niveau 0): cumulé en ms}."""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()[1:] # Un espace de séparation, puis l'indentation d'imbrication
+        if not name or name.startswith(" "):
+            continue # Import imbriqué, déjà compté dans le cumul de son parent
+        timings[name] = timings.get(name, 0) + int(parts[1]) / 1000
+    return timings
+
+
+def measure_import(module: str) -> float:
+    """Temps (ms) d'import de `module` dans un processus neuf."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=BASE_DIR, capture_output=True, text=True, encoding="utf-8", errors="replace")
+    if result.returncode != 0:
+        raise RuntimeError(f"Import de '{module}' échoué: {result.stderr.strip().splitlines()[-1:]}")
+    timings = _parse_importtime(result.stderr)
+    if module not in timings:
+        raise RuntimeError(f"Pas de mesure pour '{module}' dans la sortie de -X importtime.")
+    return timings[module]
+
+
+def measure_play_sound() -> float:
+    """Temps (ms) des imports du sous-processus de lecture (fichier inexistant: il s'arrête aussitôt)."""
+    missing_file = os.path.join(BASE_DIR, "__import_budget_absent__.mp3")
+    result = subprocess.run([sys.executable, "-X", "importtime", os.path.join(BASE_DIR, "backend_server.py"),
+                             "--play-sound", missing_file],
+                            cwd=BASE_DIR, capture_output=True, text=True, encoding="utf-8", errors="replace")
+    timings = _parse_importtime(result.stderr)
+    if "flask" in timings:
+        raise RuntimeError("Le sous-processus --play-sound importe Flask (le basculement vers sound_cli ne fonctionne plus).")
+    return sum(timings.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérifie le budget de temps d'import des modules du backend")
+    parser.add_argument("--runs", type=int, default=3, help="Nombre de mesures par module (on garde la meilleure)")
+    args = parser.parse_args()
+
+    checks = [(module, budget, lambda m=module: measure_import(m)) for module, budget in IMPORT_BUDGETS_MS.items()]
+    checks.append(("--play-sound", PLAY_SOUND_BUDGET_MS, measure_play_sound))
+
+    over_budget = []
+    print(f"{'Module':<20} {'Mesuré (ms)':>12} {'Budget (ms)':>12}")
+    for name, budget, measure in checks:
+        try:
+            best = min(measure() for _ in range(max(1, args.runs)))
+        except RuntimeError as e:
+            print(f"{name:<20} {'ERREUR':>12} {budget:>12}  {e}")
+            over_budget.append(name)
+            continue
+        status = "OK" if best <= budget else "DÉPASSÉ"
+        print(f"{name:<20} {best:>12.1f} {budget:>12}  {status}")
+        if best > budget:
+            over_budget.append(name)
+
+    if over_budget:
+        print(f"Budget dépassé: {', '.join(over_budget)}")
+        sys.exit(1)
+    print("Tous les budgets d'import sont respectés.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+# load_test.py
+"""
+Test de charge: plusieurs postes connectés en même temps sur un serveur Waitress local.
+
+Usage: python load_test.py [--browsers 30] [--admins 1] [--duration 60] [--threads 8] [--gzip-min-size 1400]
+                           [--scale small|large] [--output resultat.json]
+
+Simule les écrans de la salle des professeurs, l'affichage du hall et les postes
+d'administration: chaque navigateur se connecte, charge control.html, interroge
+/api/status (avec ETag, comme global_status.js en polling) et parcourt les vues du
+calendrier ; les administrateurs enregistrent le planning hebdomadaire puis
+rechargent la configuration. Le serveur tourne dans ce processus (Waitress, mêmes
+réglages et même compression qu'en production, voir wsgi_serving.py) sur une
+configuration synthétique (voir benchmarks.py), scheduler démarré : le rapport donne
+le débit, les latences (p50/p95/p99/max) et le volume par type de requête, ainsi que
+le retard de réveil de la boucle du scheduler pendant la charge. À relancer pour
+dimensionner les threads ou valider un changement de cache ou de compression.
+"""
+import os
+import sys
+import gzip
+import json
+import time
+import random
+import logging
+import shutil
+import argparse
+import tempfile
+import threading
+import statistics
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.cookiejar import CookieJar
+from datetime import date, datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LOAD_TEST_PASSWORD = "charge-test"
+STAFF_USER = "poste"
+ADMIN_USER = "admin_charge"
+REQUEST_TIMEOUT_SECONDS = 30
+CALENDAR_VIEWS = ("year", "month", "week", "trimester", "semester")
+QUEUE_SAMPLE_INTERVAL_SECONDS = 0.1
+
+
+def _academic_year(day: date) -> str:
+    start = day.year if day.month >= 8 else day.year - 1
+    return f"{start}-{start + 1}"
+
+
+def prepare_config(config_dir: str, scale: dict, params_overrides: dict = None):
+    """
+    Configuration synthétique + comptes de test ; journée silencieuse aujourd'hui et demain (aucune sonnerie lancée).
+    params_overrides: réglages écrits dans parametres_college.json (conservés aux rechargements des admins).
+    """
+    from benchmarks import build_fixture
+    from werkzeug.security import generate_password_hash
+
+    build_fixture(config_dir, scale)
+    path = os.path.join(config_dir, "donnees_sonneries.json")
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    for day in (date.today(), date.today() + timedelta(days=1)):
+        data["exceptions_planning"][day.isoformat()] = {"action": "silence", "description": "Test de charge"}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+    if params_overrides:
+        params_path = os.path.join(config_dir, "parametres_college.json")
+        with open(params_path, 'r', encoding='utf-8') as f:
+            params = json.load(f)
+        params.update(params_overrides)
+        with open(params_path, 'w', encoding='utf-8') as f:
+            json.dump(params, f, ensure_ascii=False, indent=2)
+
+    password_hash = generate_password_hash(LOAD_TEST_PASSWORD)
+    users_path = os.path.join(config_dir, "users.json")
+    with open(users_path, 'r', encoding='utf-8') as f:
+        users = json.load(f)
+    users[STAFF_USER] = {"hash": password_hash, "role": "Lecteur", "nom_complet": "Poste salle des professeurs"}
+    users[ADMIN_USER] = {"hash": password_hash, "role": "Administrateur", "nom_complet": "Administration"}
+    with open(users_path, 'w', encoding='utf-8') as f:
+        json.dump(users, f, ensure_ascii=False, indent=2)
+
+
+# --- Résultats ---
+
+class LoadStats:
+    """Latences (s) et erreurs par type de requête, partagées par tous les navigateurs simulés."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = {} # nom -> liste des durées
+        self._errors = {} # nom -> nombre de réponses en erreur (hors 304)
+        self._bytes = {} # nom -> octets reçus (corps tel que transmis, compressé ou non)
+
+    def add(self, name: str, duration: float, ok: bool, size: int = 0):
+        with self._lock:
+            self._latencies.setdefault(name, []).append(duration)
+            self._bytes[name] = self._bytes.get(name, 0) + size
+            if not ok:
+                self._errors[name] = self._errors.get(name, 0) + 1
+
+    def report(self, elapsed: float) -> dict:
+        with self._lock:
+            latencies = {name: sorted(values) for name, values in self._latencies.items()}
+            errors, sizes = dict(self._errors), dict(self._bytes)
+        every = sorted(v for values in latencies.values() for v in values)
+        by_request = {name: _summary(values, errors.get(name, 0), elapsed, sizes.get(name, 0))
+                      for name, values in sorted(latencies.items())}
+        return {"total": _summary(every, sum(errors.values()), elapsed, sum(sizes.values())), "by_request": by_request}
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def _summary(sorted_values: list, errors: int, elapsed: float, size: int = 0) -> dict:
+    if not sorted_values:
+        return {"count": 0, "errors": errors}
+    ms = lambda seconds: round(seconds * 1000, 1)
+    return {"count": len(sorted_values), "errors": errors, "per_second": round(len(sorted_values) / elapsed, 1),
+            "avg_bytes": round(size / len(sorted_values)),
+            "p50_ms": ms(statistics.median(sorted_values)), "p95_ms": ms(_percentile(sorted_values, 0.95)),
+            "p99_ms": ms(_percentile(sorted_values, 0.99)), "max_ms": ms(sorted_values[-1])}
+
+
+def scheduler_lag_report(before: dict, after: dict) -> dict:
+    """Retard de réveil de la boucle du scheduler pendant le test (différence de deux relevés de l'histogramme)."""
+    counts = [a - b for a, b in zip(after["counts"], before["counts"])]
+    count = sum(counts)
+    if not count:
+        return {"count": 0}
+    def upper_bound(fraction):
+        cumulative = 0
+        for bound, bucket_count in zip(after["buckets"], counts):
+            cumulative += bucket_count
+            if cumulative >= count * fraction:
+                return bound
+    ms = lambda seconds: "+Inf" if seconds == float("inf") else round(seconds * 1000, 1)
+    # Tranches de l'histogramme: les percentiles sont des bornes supérieures
+    return {"count": count, "mean_ms": round((after["sum"] - before["sum"]) / count * 1000, 2),
+            "p50_le_ms": ms(upper_bound(0.5)), "p95_le_ms": ms(upper_bound(0.95)), "p99_le_ms": ms(upper_bound(0.99)),
+            "max_le_ms": ms(upper_bound(1.0))}
+
+
+# --- Navigateurs simulés ---
+
+class Browser:
+    """Session d'un navigateur (cookie de session, ETag du statut)."""
+
+    def __init__(self, base_url: str, stats: LoadStats):
+        self.base_url = base_url
+        self.stats = stats
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+        self.status_etag = None
+
+    def request(self, name: str, path: str, data=None, json_body=None, method=None, headers=None):
+        headers = {"Accept-Encoding": "gzip", **(headers or {})}
+        if json_body is not None:
+            data = json.dumps(json_body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        elif isinstance(data, dict):
+            data = urllib.parse.urlencode(data).encode("utf-8")
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        started = time.perf_counter()
+        status, body, response_headers = None, b"", {}
+        try:
+            with self.opener.open(req, timeout=REQUEST_TIMEOUT_SECONDS) as response:
+                status, body, response_headers = response.status, response.read(), response.headers
+        except urllib.error.HTTPError as e:
+            status, response_headers = e.code, e.headers
+        except (urllib.error.URLError, OSError):
+            status = None
+        self.stats.add(name, time.perf_counter() - started, status is not None and (status < 400), len(body))
+        if response_headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        return status, body, response_headers
+
+    def login(self, username: str):
+        status, _, _ = self.request("login", "/login", data={"username": username, "password": LOAD_TEST_PASSWORD})
+        if status != 200:
+            raise RuntimeError(f"Connexion de '{username}' impossible (HTTP {status}).")
+
+    def poll_status(self):
+        status, _, headers = self.request("status", "/api/status",
+                                          headers={"If-None-Match": self.status_etag} if self.status_etag else None)
+        if status in (200, 304) and headers.get("ETag"):
+            self.status_etag = headers["ETag"]
+
+    def open_calendar_view(self, today: date, rng: random.Random):
+        year = _academic_year(today)
+        view = rng.choice(CALENDAR_VIEWS)
+        params = {"year": year, "view_type": view}
+        if view == "month":
+            params["month"] = rng.randint(1, 12)
+        elif view == "week":
+            params["start_date"] = (today - timedelta(days=today.weekday())).isoformat()
+        elif view == "trimester":
+            params["trimester"] = rng.randint(1, 3)
+        elif view == "semester":
+            params["semester"] = rng.randint(1, 2)
+        self.request(f"calendar_{view}", "/api/calendar_view?" + urllib.parse.urlencode(params))
+        self.request("daily_schedule", f"/api/daily_schedule?date={today.isoformat()}")
+
+
+def _connect(base_url: str, warmup_stats: LoadStats, stats: LoadStats, start_barrier: threading.Barrier, username: str) -> Browser:
+    """Connexion pendant la mise en route (hachage du mot de passe: hors mesure), puis attente du départ commun."""
+    browser = Browser(base_url, warmup_stats)
+    try:
+        browser.login(username) # Redirige vers control.html
+    except RuntimeError:
+        start_barrier.abort() # Test annulé: run_load_test lève BrokenBarrierError
+        raise
+    start_barrier.wait()
+    browser.stats = stats
+    return browser
+
+
+def run_staff_browser(base_url: str, warmup_stats: LoadStats, stats: LoadStats, start_barrier: threading.Barrier,
+                      stop_event: threading.Event, poll_interval: float, navigate_every: int, seed: int):
+    """Poste de consultation: page de contrôle, statut à intervalle régulier, navigation dans le calendrier."""
+    rng = random.Random(seed)
+    browser = _connect(base_url, warmup_stats, stats, start_barrier, STAFF_USER)
+    browser.request("settings", "/api/config/settings")
+    today = date.today()
+    stop_event.wait(rng.uniform(0, poll_interval)) # Postes désynchronisés, comme des écrans allumés à des heures différentes
+    polls = 0
+    while not stop_event.is_set():
+        browser.poll_status()
+        polls += 1
+        if polls % navigate_every == 0:
+            browser.open_calendar_view(today, rng)
+            if rng.random() < 0.2:
+                browser.request("control_page", "/")
+        stop_event.wait(poll_interval)
+
+
+def run_admin(base_url: str, warmup_stats: LoadStats, stats: LoadStats, start_barrier: threading.Barrier,
+              stop_event: threading.Event, save_interval: float, seed: int):
+    """Poste d'administration: relit puis enregistre le planning hebdomadaire et recharge la configuration."""
+    rng = random.Random(seed)
+    browser = _connect(base_url, warmup_stats, stats, start_barrier, ADMIN_USER)
+    stop_event.wait(rng.uniform(0, save_interval))
+    while not stop_event.is_set():
+        status, body, _ = browser.request("config_weekly_get", "/api/config/weekly_schedule")
+        if status == 200:
+            planning = json.loads(body).get("weekly_planning")
+            browser.request("config_weekly_save", "/api/config/weekly_schedule", json_body={"weekly_planning": planning}, method="POST")
+            browser.request("config_reload", "/api/config/reload", data=b"", method="POST")
+        stop_event.wait(save_interval)
+
+
+# --- Exécution ---
+
+def _serve(server, stop_event: threading.Event):
+    try:
+        server.run()
+    except (OSError, ValueError):
+        if not stop_event.is_set(): # Sockets fermés par server.close() en fin de test: attendu
+            raise
+
+def run_load_test(args) -> dict:
+    sys.path.insert(0, BASE_DIR)
+    from benchmarks import SCALES
+    from waitress.server import create_server
+    from wsgi_serving import build_waitress_options
+    import backend_server as backend
+    from history_store import HistoryStore
+    from logging_setup import SUBSYSTEMS, set_subsystem_levels
+    from scheduler import SCHEDULER_LOOP_LAG
+
+    set_subsystem_levels({name: "ERROR" for name in SUBSYSTEMS}) # Journaux coupés: leur écriture fausserait les latences
+    logging.getLogger("waitress.queue").setLevel(logging.ERROR) # File d'attente relevée dans le rapport ('waitress_queue')
+    work_dir = tempfile.mkdtemp(prefix="load_test_")
+    config_dir = os.path.join(work_dir, "config")
+    os.makedirs(config_dir)
+    server = None
+    stop_event = threading.Event()
+    try:
+        # Réglages du serveur et de la compression comme en production (parametres_college.json), sauf surcharge
+        overrides = {key: value for key, value in (("server_threads", args.threads), ("gzip_min_size_bytes", args.gzip_min_size))
+                     if value is not None}
+        prepare_config(config_dir, SCALES[args.scale], overrides)
+        backend.CONFIG_PATH = config_dir
+        backend.holiday_manager = None
+        backend.history_store = HistoryStore(os.path.join(work_dir, "history"), backend.get_subsystem_logger("history"))
+        if not backend.load_all_configs():
+            raise RuntimeError("Chargement de la configuration synthétique échoué.")
+        if not backend.start_scheduler_thread():
+            raise RuntimeError("Démarrage du scheduler impossible (voir journaux).")
+        backend.schedule_manager.start()
+
+        server_options = build_waitress_options(backend.college_params, backend.logger)
+        server_options.pop("unix_socket", None) # Clients HTTP du test: toujours en TCP local
+        server_options["listen"] = "127.0.0.1:0"
+        args.threads = server_options["threads"]
+        server = create_server(backend.app, **server_options)
+        threading.Thread(target=_serve, args=(server, stop_event), name="LoadTestWaitress", daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.effective_port}"
+        print(f"Serveur de test: {base_url} ({args.threads} threads), {args.browsers} navigateur(s), {args.admins} admin(s), "
+              f"{args.duration}s...", file=sys.stderr)
+
+        warmup_stats, stats = LoadStats(), LoadStats()
+        start_barrier = threading.Barrier(args.browsers + args.admins + 1)
+        workers = [threading.Thread(target=run_staff_browser, name=f"Navigateur-{i}", daemon=True,
+                                    args=(base_url, warmup_stats, stats, start_barrier, stop_event,
+                                          args.poll_interval, args.navigate_every, i))
+                   for i in range(args.browsers)]
+        workers += [threading.Thread(target=run_admin, name=f"Admin-{i}", daemon=True,
+                                     args=(base_url, warmup_stats, stats, start_barrier, stop_event, args.save_interval, 1000 + i))
+                    for i in range(args.admins)]
+        warmup_started = time.monotonic()
+        for worker in workers:
+            worker.start()
+        start_barrier.wait(timeout=REQUEST_TIMEOUT_SECONDS * 10) # Tous connectés
+        warmup_elapsed = time.monotonic() - warmup_started
+
+        # Mesure: file d'attente de Waitress relevée en continu (requêtes en attente d'un thread libre)
+        lag_before = SCHEDULER_LOOP_LAG.snapshot()
+        dispatcher = server.task_dispatcher
+        queue_depths = []
+        started = time.monotonic()
+        while not stop_event.wait(QUEUE_SAMPLE_INTERVAL_SECONDS):
+            queue_depths.append(len(dispatcher.queue))
+            if time.monotonic() - started >= args.duration:
+                stop_event.set()
+        for worker in workers:
+            worker.join(timeout=REQUEST_TIMEOUT_SECONDS)
+        elapsed = time.monotonic() - started
+        lag_after = SCHEDULER_LOOP_LAG.snapshot()
+
+        report = stats.report(elapsed)
+        return {"generated_at": datetime.now().isoformat(timespec='seconds'),
+                "settings": {"browsers": args.browsers, "admins": args.admins, "duration_s": args.duration,
+                             "threads": args.threads, "gzip_min_size_bytes": backend.college_params.get("gzip_min_size_bytes"),
+                             "scale": args.scale, "poll_interval_s": args.poll_interval,
+                             "navigate_every": args.navigate_every, "save_interval_s": args.save_interval},
+                "warmup_login": warmup_stats.report(warmup_elapsed)["total"],
+                "elapsed_s": round(elapsed, 1), "requests": report["total"], "by_request": report["by_request"],
+                "waitress_queue": {"mean": round(statistics.mean(queue_depths), 2) if queue_depths else 0,
+                                   "max": max(queue_depths, default=0),
+                                   "saturated_ratio": round(sum(1 for d in queue_depths if d) / len(queue_depths), 3) if queue_depths else 0},
+                "scheduler_loop_lag": scheduler_lag_report(lag_before, lag_after)}
+    finally:
+        stop_event.set()
+        if server:
+            server.close()
+        if backend.schedule_manager:
+            backend.schedule_manager.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge des tableaux de bord (serveur Waitress local)")
+    parser.add_argument("--browsers", type=int, default=30, help="Navigateurs de consultation simulés")
+    parser.add_argument("--admins", type=int, default=1, help="Postes d'administration simulés")
+    parser.add_argument("--duration", type=float, default=60, help="Durée du test (s)")
+    parser.add_argument("--threads", type=int, help="Threads Waitress (défaut: server_threads, comme en production)")
+    parser.add_argument("--gzip-min-size", type=int, help="Taille minimale des réponses JSON compressées (0: sans compression)")
+    parser.add_argument("--scale", choices=["small", "large"], default="small", help="Configuration synthétique (voir benchmarks.py)")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Intervalle d'interrogation de /api/status (s)")
+    parser.add_argument("--navigate-every", type=int, default=5, help="Vue calendrier ouverte toutes les N interrogations du statut")
+    parser.add_argument("--save-interval", type=float, default=10.0, help="Intervalle entre deux enregistrements admin (s)")
+    parser.add_argument("--output", help="Fichier JSON de résultat (défaut: sortie standard)")
+    args = parser.parse_args()
+
+    output = json.dumps(run_load_test(args), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
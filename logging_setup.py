@@ -0,0 +1,113 @@
+# logging_setup.py
+"""
+Pipeline de logging asynchrone du backend.
+
+Tous les threads (requêtes Waitress, scheduler, flux SSE...) écrivent dans une file
+via un QueueHandler ; un seul thread (QueueListener) fait les écritures disque/console.
+Une rotation de fichier ou un disque lent ne bloque donc plus le scheduler.
+
+Chaque sous-système a son logger enfant ('sonnerie_backend.scheduler', ...), dont le
+niveau peut être changé à chaud (voir set_subsystem_levels).
+"""
+import sys
+import queue
+import atexit
+import logging
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+
+ROOT_LOGGER_NAME = 'sonnerie_backend'
+
+# Sous-systèmes dont le niveau est réglable (clé API -> suffixe du logger enfant)
+SUBSYSTEMS = {
+    "backend": None, # Logger principal (routes, chargement config...)
+    "scheduler": "scheduler",
+    "holidays": "holidays",
+    "alerts": "alerts",
+    "status": "status",
+    "permissions": "permissions",
+    "mp3_mirror": "mp3_mirror",
+    "config_snapshot": "config_snapshot",
+    "share_io": "share_io",
+    "sound_catalog": "sound_catalog",
+    "audio_devices": "audio_devices",
+    "processes": "processes",
+    "history": "history",
+}
+
+VALID_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+_listener = None
+
+
+def setup_logging(log_file=None, level=logging.INFO):
+    """
+    Configure le logger principal avec un QueueHandler et démarre le QueueListener
+    (fichier rotatif + console). Retourne le logger principal.
+    """
+    global _listener
+    logger = logging.getLogger(ROOT_LOGGER_NAME)
+    logger.setLevel(level)
+    logger.propagate = False # Éviter double logging si logger racine configuré
+    if _listener is not None:
+        return logger # Déjà configuré
+
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - [%(threadName)s] - %(name)s:%(lineno)d - %(message)s')
+    handlers = []
+
+    if log_file:
+        try:
+            file_handler = RotatingFileHandler(log_file, maxBytes=5*1024*1024, backupCount=3, encoding='utf-8') # 5MB x 3 fichiers
+            file_handler.setFormatter(log_formatter)
+            handlers.append(file_handler)
+        except Exception as e:
+            print(f"AVERTISSEMENT: Échec création handler log fichier {log_file}: {e}", file=sys.stderr)
+
+    # Console (stderr, visible via NSSM/systemd)
+    console_handler = logging.StreamHandler(sys.stderr)
+    console_handler.setFormatter(log_formatter)
+    handlers.append(console_handler)
+
+    # Les niveaux sont portés par les loggers (réglables à chaud), pas par les handlers
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging) # Vider la file même si l'arrêt n'appelle pas stop_logging (ex: sous-processus --play-sound)
+    return logger
+
+
+def stop_logging():
+    """Vide la file et arrête le thread d'écriture des logs (à appeler à l'arrêt)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_subsystem_logger(subsystem: str) -> logging.Logger:
+    """Retourne le logger d'un sous-système (le logger principal pour 'backend')."""
+    suffix = SUBSYSTEMS[subsystem]
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    return root.getChild(suffix) if suffix else root
+
+
+def get_subsystem_levels() -> dict:
+    """Niveau effectif de chaque sous-système, ex: {"scheduler": "INFO", ...}."""
+    return {name: logging.getLevelName(get_subsystem_logger(name).getEffectiveLevel()) for name in SUBSYSTEMS}
+
+
+def set_subsystem_levels(levels: dict):
+    """
+    Change le niveau de plusieurs sous-systèmes, ex: {"scheduler": "DEBUG"}.
+    Tout est validé avant application : ValueError si un sous-système ou un niveau est inconnu.
+    """
+    validated = {}
+    for subsystem, level_name in levels.items():
+        if subsystem not in SUBSYSTEMS:
+            raise ValueError(f"Sous-système inconnu: '{subsystem}'. Valides: {', '.join(SUBSYSTEMS)}")
+        level_name = str(level_name).upper()
+        if level_name not in VALID_LEVELS:
+            raise ValueError(f"Niveau invalide: '{level_name}'. Valides: {', '.join(VALID_LEVELS)}")
+        validated[subsystem] = level_name
+    for subsystem, level_name in validated.items():
+        get_subsystem_logger(subsystem).setLevel(level_name)
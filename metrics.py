@@ -0,0 +1,180 @@
+# metrics.py
+"""
+Registre de métriques partagé (compteurs, jauges, histogrammes), exposé par /metrics
+au format texte de Prometheus.
+
+Les modules déclarent leurs métriques une fois au chargement (REGISTRY.counter(...),
+REGISTRY.histogram(...)) puis les alimentent : une mesure ne coûte qu'un verrou et
+quelques additions, et l'export ne fait que parcourir les séries existantes (pas de
+calcul à la lecture), ce qui permet un relevé toutes les 15 s. Les valeurs déjà
+tenues ailleurs (ex: processus enfants) sont lues au moment de l'export par une
+fonction 'callback' au lieu d'être recopiées.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+METRIC_PREFIX = "sonnerie_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bornes (s) par défaut des histogrammes: de la milliseconde (requêtes, disque local) à la minute (téléchargements)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def _format_labels(names, values, extra=None) -> str:
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, help_text: str, labelnames=(), callback=None):
+        """callback: fonction sans argument renvoyant {tuple des valeurs d'étiquettes: valeur}, lue à l'export."""
+        self.name = METRIC_PREFIX + name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._callback = callback
+        self._lock = threading.Lock()
+        self._values = {} # tuple des valeurs d'étiquettes -> valeur (ou état de l'histogramme)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Métrique '{self.name}': étiquettes attendues {self.labelnames}, reçues {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        if self._callback:
+            return sorted((tuple(str(v) for v in key), value) for key, value in self._callback().items())
+        with self._lock:
+            return sorted(self._values.items())
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in self._samples():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Valeur croissante (nombre d'événements, d'échecs...)."""
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Valeur instantanée (nombre de processus en cours...)."""
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Répartition de durées (s) par tranches cumulées, avec somme et nombre de mesures."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Mesure la durée du bloc (même en cas d'exception)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def snapshot(self, **labels) -> dict:
+        """Copie de l'état d'une série: nombre de mesures par tranche (non cumulé), somme et nombre."""
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            counts = list(state["counts"]) if state else [0] * len(self.buckets)
+            total = state["sum"] if state else 0.0
+        return {"buckets": self.buckets, "counts": counts, "sum": total, "count": sum(counts)}
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            states = sorted((key, list(state["counts"]), state["sum"]) for key, state in self._values.items())
+        for key, counts, total in states:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', _format_value(bound)))} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Ensemble des métriques de l'application (une instance partagée: REGISTRY)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Métrique '{name}' déjà déclarée avec un autre type.")
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames=(), callback=None) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labelnames, callback=callback)
+
+    def gauge(self, name: str, help_text: str, labelnames=(), callback=None) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labelnames, callback=callback)
+
+    def histogram(self, name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Export au format texte Prometheus."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e: # Callback en erreur: les autres métriques restent exportées
+                lines.append(f"# Collecte de {metric.name} impossible: {e}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
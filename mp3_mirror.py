@@ -0,0 +1,233 @@
+# mp3_mirror.py
+"""
+Copie locale (miroir) du dossier MP3 du partage réseau.
+
+Le lecteur lit toujours les fichiers du miroir local : un partage SMB lent ou
+indisponible au moment de sonner ne retarde plus la sonnerie. Un thread de fond
+synchronise le miroir de façon incrémentale (taille + date de modification), et
+un manifeste (manifest.json) garde l'empreinte SHA-1 de chaque fichier copié.
+"""
+import os
+import json
+import shutil
+import hashlib
+import threading
+import logging
+from datetime import datetime
+
+MANIFEST_FILE = "manifest.json"
+
+
+class Mp3Mirror:
+    """Synchronise source_dir (partage) vers mirror_dir (disque local) et résout les chemins de lecture."""
+
+    def __init__(self, source_dir: str, mirror_dir: str, logger: logging.Logger,
+                 sync_interval_seconds: int = 300, on_sync=None):
+        """
+        Args:
+            source_dir: Dossier MP3 de référence (MP3_PATH, souvent sur le partage).
+            mirror_dir: Dossier local du miroir.
+            logger: Instance du logger.
+            sync_interval_seconds: Délai entre deux synchronisations de fond.
+            on_sync: Fonction appelée (sans argument) après chaque synchronisation.
+        """
+        self.source_dir = source_dir
+        self.mirror_dir = mirror_dir
+        self.logger = logger
+        self.sync_interval_seconds = sync_interval_seconds
+        self._on_sync = on_sync
+
+        self._lock = threading.Lock() # Protège _manifest et les infos de synchro
+        self._sync_lock = threading.Lock() # Une seule synchronisation à la fois
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self._manifest = {} # nom -> {"size", "mtime", "sha1"}
+        self._last_sync = None # datetime de la dernière tentative
+        self._last_success = None # datetime de la dernière synchro complète réussie
+        self._last_error = None
+
+        try:
+            os.makedirs(self.mirror_dir, exist_ok=True)
+        except OSError as e:
+            self.logger.error(f"Impossible de créer le dossier miroir MP3 '{self.mirror_dir}': {e}")
+        self._load_manifest()
+
+    # --- Manifeste ---
+
+    def _manifest_path(self):
+        return os.path.join(self.mirror_dir, MANIFEST_FILE)
+
+    def _load_manifest(self):
+        """Charge le manifeste en ne gardant que les fichiers réellement présents dans le miroir."""
+        try:
+            with open(self._manifest_path(), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            self.logger.warning(f"Manifeste miroir MP3 illisible, resynchronisation complète: {e}")
+            return
+        valid = {}
+        for name, entry in data.get("files", {}).items():
+            local_path = os.path.join(self.mirror_dir, name)
+            if isinstance(entry, dict) and os.path.isfile(local_path) and os.path.getsize(local_path) == entry.get("size"):
+                valid[name] = entry
+        with self._lock:
+            self._manifest = valid
+        self.logger.info(f"Miroir MP3: manifeste chargé ({len(valid)} fichiers valides).")
+
+    def _save_manifest(self, manifest: dict):
+        tmp_path = self._manifest_path() + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"files": manifest}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self._manifest_path())
+
+    # --- Synchronisation ---
+
+    def _copy_file(self, name: str) -> str:
+        """Copie un fichier source vers le miroir (via fichier temporaire) et retourne son SHA-1."""
+        src_path = os.path.join(self.source_dir, name)
+        dst_path = os.path.join(self.mirror_dir, name)
+        tmp_path = dst_path + ".part"
+        sha1 = hashlib.sha1()
+        with open(src_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            for chunk in iter(lambda: src.read(1024 * 1024), b""):
+                sha1.update(chunk)
+                dst.write(chunk)
+        shutil.copystat(src_path, tmp_path)
+        os.replace(tmp_path, dst_path)
+        return sha1.hexdigest()
+
+    def sync_once(self) -> bool:
+        """
+        Synchronise le miroir : copie les fichiers nouveaux ou modifiés, retire ceux
+        supprimés du partage. Retourne True si la synchronisation est complète.
+        """
+        with self._sync_lock:
+            started = datetime.now()
+            copied, removed, errors = 0, 0, []
+            with self._lock:
+                manifest = dict(self._manifest)
+
+            try:
+                source_entries = {e.name: e.stat() for e in os.scandir(self.source_dir) if e.is_file()}
+            except OSError as e:
+                # Partage inaccessible : on garde le miroir tel quel
+                self.logger.warning(f"Miroir MP3: dossier source '{self.source_dir}' inaccessible, miroir conservé: {e}")
+                with self._lock:
+                    self._last_sync = started
+                    self._last_error = f"Source inaccessible: {e}"
+                self._notify()
+                return False
+
+            for name, st in source_entries.items():
+                entry = manifest.get(name)
+                if entry and entry.get("size") == st.st_size and entry.get("mtime") == st.st_mtime:
+                    continue # Inchangé
+                try:
+                    sha1 = self._copy_file(name)
+                    manifest[name] = {"size": st.st_size, "mtime": st.st_mtime, "sha1": sha1}
+                    copied += 1
+                    self.logger.info(f"Miroir MP3: '{name}' copié ({st.st_size} octets).")
+                except OSError as e:
+                    errors.append(name)
+                    self.logger.error(f"Miroir MP3: échec copie '{name}': {e}")
+
+            for name in [n for n in manifest if n not in source_entries]:
+                try:
+                    os.remove(os.path.join(self.mirror_dir, name))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    self.logger.warning(f"Miroir MP3: impossible de retirer '{name}': {e}")
+                    continue
+                del manifest[name]
+                removed += 1
+                self.logger.info(f"Miroir MP3: '{name}' retiré (supprimé du partage).")
+
+            if copied or removed:
+                try:
+                    self._save_manifest(manifest)
+                except OSError as e:
+                    self.logger.error(f"Miroir MP3: échec sauvegarde manifeste: {e}")
+
+            with self._lock:
+                self._manifest = manifest
+                self._last_sync = started
+                self._last_error = f"Échec copie: {', '.join(errors)}" if errors else None
+                if not errors:
+                    self._last_success = started
+            self.logger.debug(f"Miroir MP3 synchronisé: {copied} copié(s), {removed} retiré(s), {len(errors)} erreur(s).")
+            self._notify()
+            return not errors
+
+    def _notify(self):
+        if self._on_sync:
+            try:
+                self._on_sync()
+            except Exception as e:
+                self.logger.error(f"Erreur callback synchro miroir MP3: {e}", exc_info=True)
+
+    def _run(self):
+        self.logger.info(f"Thread synchro miroir MP3 démarré (intervalle {self.sync_interval_seconds}s).")
+        while not self._stop_event.is_set():
+            try:
+                self.sync_once()
+            except Exception as e:
+                self.logger.error(f"Erreur inattendue synchro miroir MP3: {e}", exc_info=True)
+            self._wake_event.wait(timeout=self.sync_interval_seconds)
+            self._wake_event.clear()
+        self.logger.info("Thread synchro miroir MP3 terminé.")
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="Mp3MirrorSync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def request_sync(self):
+        """Demande une synchronisation immédiate (ex: après upload ou suppression d'un son)."""
+        self._wake_event.set()
+
+    # --- Lecture ---
+
+    def resolve(self, filename: str) -> str:
+        """
+        Chemin à utiliser pour lire un son : la copie locale si elle existe, sinon
+        le fichier du partage (et une synchronisation est demandée).
+        """
+        local_path = os.path.join(self.mirror_dir, filename)
+        with self._lock:
+            in_manifest = filename in self._manifest
+        if in_manifest and os.path.isfile(local_path):
+            return local_path
+        self.logger.warning(f"Miroir MP3: '{filename}' absent du miroir, lecture directe depuis le partage.")
+        self.request_sync()
+        return os.path.join(self.source_dir, filename)
+
+    def get_file_hash(self, filename: str):
+        with self._lock:
+            entry = self._manifest.get(filename)
+        return entry.get("sha1") if entry else None
+
+    def get_status(self, referenced_files=None) -> dict:
+        """
+        Fraîcheur du miroir et fichiers manquants.
+        referenced_files: noms de fichiers utilisés par la configuration, vérifiés dans le miroir.
+        """
+        with self._lock:
+            missing = sorted(f for f in (referenced_files or ()) if f and f not in self._manifest)
+            return {
+                "last_sync": self._last_sync.isoformat(timespec='seconds') if self._last_sync else None,
+                "last_success": self._last_success.isoformat(timespec='seconds') if self._last_success else None,
+                "file_count": len(self._manifest),
+                "missing": missing,
+                "error": self._last_error
+            }
@@ -0,0 +1,98 @@
+# permissions.py
+"""
+Compilation des permissions effectives des utilisateurs.
+
+Les permissions d'un rôle (roles_config.json) et les surcharges d'un utilisateur
+(custom_permissions dans users.json) sont des dicts imbriqués. Ils sont fusionnés puis
+compilés une seule fois en un frozenset de chaînes "section:action" : une vérification
+de permission devient un simple test d'appartenance.
+"""
+import copy
+import json
+import threading
+import logging
+
+ADMIN_ALL_PERMISSIONS = "admin:has_all_permissions"
+_GRANT_ALL_MARKER = "*" # Présent uniquement si 'admin:has_all_permissions' est accordé au premier niveau
+
+
+def merge_permissions(base_perms, override_perms):
+    """
+    Fusionne override_perms dans base_perms (fusion profonde des dicts imbriqués).
+    override_perms est prioritaire.
+    """
+    if not isinstance(override_perms, dict) or not override_perms:
+        return copy.deepcopy(base_perms)
+
+    merged = copy.deepcopy(base_perms)
+
+    for key, override_value in override_perms.items():
+        if isinstance(override_value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_permissions(merged[key], override_value)
+        else:
+            merged[key] = copy.deepcopy(override_value)
+    return merged
+
+
+def compile_permissions(perms: dict) -> frozenset:
+    """
+    Transforme un dict de permissions en frozenset de "section:action" accordées.
+    - Clés de premier niveau ("page:...", "admin:has_all_permissions", ...) : gardées telles quelles si True.
+    - Sections imbriquées ({"sound": {"upload": True}}) : aplaties en "sound:upload".
+    """
+    if not isinstance(perms, dict):
+        return frozenset()
+
+    granted = set()
+    for key, value in perms.items():
+        if value is True:
+            granted.add(key)
+            if key == ADMIN_ALL_PERMISSIONS:
+                granted.add(_GRANT_ALL_MARKER)
+        elif isinstance(value, dict) and key != "page": # Les permissions "page:..." sont toujours au premier niveau
+            granted.update(f"{key}:{action}" for action, allowed in value.items() if allowed is True)
+    return frozenset(granted)
+
+
+def has_permission(compiled: frozenset, permission_name: str) -> bool:
+    """Vérifie une permission sur un ensemble compilé (O(1), sans log)."""
+    return _GRANT_ALL_MARKER in compiled or permission_name in compiled
+
+
+class PermissionCache:
+    """
+    Cache des permissions compilées, indexé par (rôle, empreinte des surcharges, version des rôles).
+    invalidate() doit être appelé quand la configuration des rôles ou des utilisateurs change.
+    """
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._roles_version = 0
+
+    def invalidate(self, reason: str = ""):
+        with self._lock:
+            self._roles_version += 1
+            self._cache.clear()
+        self.logger.debug(f"Cache des permissions invalidé ({reason or 'sans motif'}), version {self._roles_version}.")
+
+    @staticmethod
+    def _overrides_key(overrides) -> str:
+        if not isinstance(overrides, dict) or not overrides:
+            return ""
+        return json.dumps(overrides, sort_keys=True)
+
+    def get(self, roles_config: dict, role: str, overrides=None) -> frozenset:
+        """Retourne les permissions compilées du rôle, surcharges utilisateur comprises."""
+        key = (role, self._overrides_key(overrides), self._roles_version)
+        compiled = self._cache.get(key)
+        if compiled is not None:
+            return compiled
+
+        role_perms = roles_config.get("roles", {}).get(role, {}).get("permissions", {})
+        compiled = compile_permissions(merge_permissions(role_perms, overrides))
+        with self._lock:
+            if key[2] == self._roles_version: # Ne pas remplir le cache avec une version périmée
+                self._cache[key] = compiled
+        self.logger.debug(f"Permissions compilées pour le rôle '{role}' (surcharges: {bool(key[1])}): {len(compiled)} accordées.")
+        return compiled
@@ -0,0 +1,193 @@
+# process_supervisor.py
+"""
+Supervision des sous-processus audio (sonneries, lecteur d'alertes, analyses).
+
+Tous les processus enfants sont lancés par ProcessSupervisor.spawn : un thread les
+récupère dès leur fin (pas de processus zombie ni de tubes laissés ouverts), tue
+ceux qui dépassent leur échéance et refuse d'en lancer davantage qu'autorisé par
+type. Les compteurs et la consommation de chaque enfant (CPU, mémoire résidente)
+sont exposés pour vérifier que le service reste stable sur des mois.
+
+La mesure CPU/RSS utilise psutil s'il est installé, sinon /proc (Linux) ;
+sans l'un ni l'autre (Windows sans psutil), ces valeurs valent None.
+"""
+import os
+import time
+import threading
+import subprocess
+import logging
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+REAP_INTERVAL_SECONDS = 1
+KILL_WAIT_SECONDS = 2
+
+# Nombre maximal de processus simultanés par type (les types absents ne sont pas plafonnés)
+DEFAULT_LIMITS = {
+    "ring": 2, # Sonnerie du scheduler (une à la fois en principe, +1 si la précédente s'éternise)
+    "alert_player": 1, # Lecteur persistant des alertes
+    "audio_analysis": 2, # Analyses audio (voir audio_analysis.py)
+}
+
+
+class ProcessLimitError(RuntimeError):
+    """Trop de processus de ce type déjà en cours."""
+
+
+def _proc_usage(pid: int):
+    """(CPU en s, RSS en Mo) du processus, ou (None, None) si indisponible."""
+    try:
+        if psutil:
+            proc = psutil.Process(pid)
+            cpu = proc.cpu_times()
+            return round(cpu.user + cpu.system, 2), round(proc.memory_info().rss / (1024 * 1024), 1)
+        if os.path.isdir("/proc"):
+            with open(f"/proc/{pid}/stat", "r") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            ticks = os.sysconf("SC_CLK_TCK")
+            cpu_seconds = (int(fields[11]) + int(fields[12])) / ticks # utime + stime
+            rss_mb = int(fields[21]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+            return round(cpu_seconds, 2), round(rss_mb, 1)
+    except Exception:
+        pass # Processus terminé entre-temps, ou plate-forme sans mesure
+    return None, None
+
+
+class ProcessSupervisor:
+    """Lance, surveille et récupère les processus enfants audio."""
+
+    def __init__(self, logger: logging.Logger, limits: dict = None, reap_interval: float = REAP_INTERVAL_SECONDS):
+        """
+        Args:
+            logger: Instance du logger.
+            limits: Plafond de processus simultanés par type (défaut: DEFAULT_LIMITS).
+            reap_interval: Intervalle (s) du thread de récupération.
+        """
+        self.logger = logger
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self.reap_interval = reap_interval
+        self._lock = threading.Lock()
+        self._children = {} # pid -> {"process", "kind", "started", "deadline"}
+        self._counters = {"spawned": 0, "reaped": 0, "killed": 0, "refused": 0}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def spawn(self, kind: str, cmd: list, deadline_seconds: float = None, **popen_kwargs) -> subprocess.Popen:
+        """
+        Lance un processus (arguments de subprocess.Popen) et le place sous surveillance.
+        deadline_seconds: durée au-delà de laquelle il est tué (None: pas de limite).
+        Lève ProcessLimitError si le plafond de ce type est atteint.
+        """
+        if os.name == 'nt':
+            popen_kwargs.setdefault("creationflags", subprocess.CREATE_NO_WINDOW)
+        expired = []
+        try:
+            with self._lock:
+                expired = self._reap_locked() # Place libérée par un processus terminé depuis le dernier passage
+                limit = self.limits.get(kind)
+                running = sum(1 for child in self._children.values() if child["kind"] == kind)
+                if limit is not None and running >= limit:
+                    self._counters["refused"] += 1
+                    raise ProcessLimitError(f"{running} processus '{kind}' déjà en cours (maximum {limit}).")
+                process = subprocess.Popen(cmd, **popen_kwargs)
+                now = time.monotonic()
+                self._children[process.pid] = {"process": process, "kind": kind, "started": now,
+                                               "deadline": now + deadline_seconds if deadline_seconds else None}
+                self._counters["spawned"] += 1
+        finally:
+            self._kill_expired(expired) # Après le lancement, hors verrou: le nouveau processus n'attend pas
+        self.logger.debug(f"Processus '{kind}' lancé (PID: {process.pid}).")
+        self.start()
+        return process
+
+    # --- Récupération ---
+
+    def _reap_locked(self) -> list:
+        """
+        Retire les processus terminés et ceux qui ont dépassé leur échéance (appelé avec le verrou).
+        Retourne ces derniers: à tuer par _kill_expired une fois le verrou relâché (l'attente
+        de leur fin ne doit pas retarder un spawn).
+        """
+        now = time.monotonic()
+        expired = []
+        for pid, child in list(self._children.items()):
+            process = child["process"]
+            if process.poll() is not None:
+                del self._children[pid]
+                self._counters["reaped"] += 1
+                self.logger.debug(f"Processus '{child['kind']}' (PID: {pid}) récupéré (code: {process.returncode}).")
+            elif child["deadline"] is not None and now > child["deadline"]:
+                del self._children[pid]
+                self._counters["killed"] += 1
+                expired.append((child, now - child["started"]))
+        return expired
+
+    def _kill_expired(self, expired: list):
+        """Tue les processus retirés par _reap_locked pour dépassement d'échéance (sans le verrou)."""
+        for child, age in expired:
+            self.logger.warning(f"Processus '{child['kind']}' (PID: {child['process'].pid}) toujours actif après son échéance "
+                                f"({age:.0f} s): arrêt forcé.")
+            self._kill(child["process"])
+
+    def _kill(self, process: subprocess.Popen):
+        try:
+            process.kill()
+            process.wait(timeout=KILL_WAIT_SECONDS)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            self.logger.error(f"Arrêt forcé du processus (PID: {process.pid}) incomplet: {e}")
+
+    def _run(self):
+        while not self._stop_event.wait(self.reap_interval):
+            with self._lock:
+                expired = self._reap_locked()
+            self._kill_expired(expired)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="ProcessSupervisor", daemon=True)
+            self._thread.start()
+
+    # --- Statistiques / arrêt ---
+
+    def get_counts(self) -> dict:
+        """Nombre d'enfants par type et compteurs, sans mesure CPU/mémoire (peu coûteux, pour /metrics)."""
+        with self._lock:
+            expired = self._reap_locked()
+            by_kind = {}
+            for child in self._children.values():
+                by_kind[child["kind"]] = by_kind.get(child["kind"], 0) + 1
+            counts = {"by_kind": by_kind, "limits": dict(self.limits), "counters": dict(self._counters)}
+        self._kill_expired(expired)
+        return counts
+
+    def get_stats(self) -> dict:
+        """Compteurs, nombre d'enfants par type et consommation de chacun (CPU s, RSS Mo)."""
+        with self._lock:
+            expired = self._reap_locked()
+            children = [(pid, child["kind"], child["started"]) for pid, child in self._children.items()]
+            counters = dict(self._counters)
+        self._kill_expired(expired)
+        now = time.monotonic()
+        details = []
+        for pid, kind, started in children:
+            cpu_s, rss_mb = _proc_usage(pid)
+            details.append({"pid": pid, "kind": kind, "age_s": round(now - started, 1), "cpu_s": cpu_s, "rss_mb": rss_mb})
+        by_kind = {}
+        for child in details:
+            by_kind[child["kind"]] = by_kind.get(child["kind"], 0) + 1
+        return {"running": len(details), "by_kind": by_kind, "limits": dict(self.limits),
+                "counters": counters, "children": details}
+
+    def shutdown(self):
+        """Arrête le thread de récupération et tue les processus encore actifs."""
+        self._stop_event.set()
+        with self._lock:
+            children, self._children = list(self._children.values()), {}
+        for child in children:
+            if child["process"].poll() is None:
+                self.logger.info(f"Arrêt du processus '{child['kind']}' (PID: {child['process'].pid}).")
+                self._kill(child["process"])
@@ -0,0 +1,210 @@
+# request_profiler.py
+"""
+Profilage à la demande des requêtes lentes (middleware WSGI, activé par un administrateur).
+
+Désactivé, le middleware ne fait qu'un test de booléen. Activé :
+- chaque requête est suivie par un échantillonneur de piles (un seul thread qui relève
+  la pile des threads de requête toutes les PROFILE_SAMPLE_INTERVAL_SECONDS, coût
+  négligeable) ; si la requête dépasse le seuil, les piles relevées sont écrites au
+  format « collapsed » (une pile par ligne, lisible par flamegraph.pl / speedscope) ;
+- une fraction des requêtes (sample_rate) est en plus profilée avec cProfile (fichier
+  .prof, à ouvrir avec pstats ou snakeviz), quelle que soit sa durée.
+
+Les fichiers vont dans logs/profiles/, nommés <horodatage>_<durée>ms_<méthode>_<route>,
+ce qui permet de lister les requêtes capturées (les plus lentes d'abord) sans index.
+Seuls les PROFILE_MAX_FILES plus récents sont conservés.
+"""
+import os
+import re
+import sys
+import time
+import random
+import cProfile
+import threading
+import logging
+from collections import Counter
+from datetime import datetime
+
+PROFILE_SAMPLE_INTERVAL_SECONDS = 0.005
+PROFILE_DEFAULT_THRESHOLD_MS = 1000
+PROFILE_MAX_FILES = 50
+PROFILE_MAX_STACK_DEPTH = 60
+PROFILE_EXCLUDED_PATHS = ("/api/status/stream",) # Flux SSE: durée sans rapport avec un traitement lent
+
+_FILE_PATTERN = re.compile(r"^(\d{8}-\d{6}-\d{3})_(\d+)ms_([A-Z]+)_(.+)\.(prof|collapsed\.txt)$")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class _StackSampler:
+    """Relève périodiquement la pile des threads suivis (un seul thread d'échantillonnage)."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._targets = {} # thread id -> Counter(pile collapsed -> nombre de relevés)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def track(self, thread_id: int):
+        with self._lock:
+            self._targets[thread_id] = Counter()
+
+    def untrack(self, thread_id: int) -> Counter:
+        with self._lock:
+            return self._targets.pop(thread_id, Counter())
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            with self._lock:
+                if not self._targets:
+                    continue
+                frames = sys._current_frames()
+                for thread_id, stacks in self._targets.items():
+                    frame = frames.get(thread_id)
+                    labels = []
+                    while frame is not None and len(labels) < PROFILE_MAX_STACK_DEPTH:
+                        labels.append(_frame_label(frame))
+                        frame = frame.f_back
+                    if labels:
+                        stacks[";".join(reversed(labels))] += 1
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="RequestProfilerSampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class RequestProfiler:
+    """Middleware WSGI: capture le profil des requêtes lentes (ou d'un échantillon) quand il est activé."""
+
+    def __init__(self, wsgi_app, profile_dir: str, logger: logging.Logger,
+                 threshold_ms: int = PROFILE_DEFAULT_THRESHOLD_MS, sample_rate: float = 0.0):
+        """
+        Args:
+            wsgi_app: Application WSGI à envelopper (ex: app.wsgi_app).
+            profile_dir: Dossier des profils capturés (ex: logs/profiles).
+            logger: Instance du logger.
+            threshold_ms: Durée au-delà de laquelle le profil échantillonné d'une requête est conservé.
+            sample_rate: Fraction (0 à 1) des requêtes profilées avec cProfile.
+        """
+        self.wsgi_app = wsgi_app
+        self.profile_dir = profile_dir
+        self.logger = logger
+        self.enabled = False
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self._sampler = _StackSampler(PROFILE_SAMPLE_INTERVAL_SECONDS)
+        self._write_lock = threading.Lock()
+
+    # --- Réglages ---
+
+    def configure(self, enabled: bool = None, threshold_ms: int = None, sample_rate: float = None):
+        """Change les réglages (non persistant). Lève ValueError si une valeur est invalide."""
+        if threshold_ms is not None and (not isinstance(threshold_ms, int) or threshold_ms < 0):
+            raise ValueError("threshold_ms doit être un entier positif.")
+        if sample_rate is not None and (not isinstance(sample_rate, (int, float)) or not 0 <= sample_rate <= 1):
+            raise ValueError("sample_rate doit être compris entre 0 et 1.")
+        if threshold_ms is not None:
+            self.threshold_ms = threshold_ms
+        if sample_rate is not None:
+            self.sample_rate = float(sample_rate)
+        if enabled is not None:
+            self.enabled = bool(enabled)
+            if self.enabled:
+                self._sampler.start()
+            else:
+                self._sampler.stop()
+        self.logger.info(f"Profilage des requêtes {'activé' if self.enabled else 'désactivé'} "
+                         f"(seuil {self.threshold_ms} ms, cProfile sur {self.sample_rate:.0%} des requêtes).")
+
+    def get_settings(self) -> dict:
+        return {"enabled": self.enabled, "threshold_ms": self.threshold_ms, "sample_rate": self.sample_rate}
+
+    # --- WSGI ---
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        if not self.enabled or path in PROFILE_EXCLUDED_PATHS:
+            return self.wsgi_app(environ, start_response)
+        thread_id = threading.get_ident()
+        profile = cProfile.Profile() if random.random() < self.sample_rate else None
+        self._sampler.track(thread_id)
+        started = time.perf_counter()
+        try:
+            if profile:
+                try:
+                    profile.enable()
+                except ValueError: # Autre profileur déjà actif (Python 3.12+: un seul à la fois)
+                    profile = None
+            try:
+                return self.wsgi_app(environ, start_response)
+            finally:
+                if profile:
+                    profile.disable()
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            stacks = self._sampler.untrack(thread_id)
+            try:
+                if profile:
+                    self._save(environ, duration_ms, "prof", profile=profile)
+                if duration_ms >= self.threshold_ms and stacks:
+                    self._save(environ, duration_ms, "collapsed.txt", stacks=stacks)
+            except OSError as e:
+                self.logger.error(f"Profil de la requête {path} non enregistré: {e}")
+
+    # --- Fichiers ---
+
+    def _save(self, environ, duration_ms: float, extension: str, profile=None, stacks=None):
+        route = re.sub(r"[^A-Za-z0-9._-]+", "-", environ.get("PATH_INFO", "").strip("/")) or "racine"
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")[:-3]
+        name = f"{stamp}_{round(duration_ms)}ms_{environ.get('REQUEST_METHOD', 'GET')}_{route[:80]}.{extension}"
+        path = os.path.join(self.profile_dir, name)
+        with self._write_lock:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            if profile:
+                profile.dump_stats(path)
+            else:
+                with open(path, 'w', encoding='utf-8') as f:
+                    query = environ.get("QUERY_STRING")
+                    f.write(f"# {environ.get('REQUEST_METHOD')} {environ.get('PATH_INFO')}{'?' + query if query else ''}"
+                            f" {duration_ms:.0f} ms, {sum(stacks.values())} relevés de {PROFILE_SAMPLE_INTERVAL_SECONDS * 1000:.0f} ms\n")
+                    for stack, count in stacks.most_common():
+                        f.write(f"{stack} {count}\n")
+            self._prune()
+        self.logger.info(f"Profil de requête capturé ({duration_ms:.0f} ms): {name}")
+
+    def _prune(self):
+        """Garde les PROFILE_MAX_FILES profils les plus récents (appelé avec le verrou)."""
+        names = sorted(n for n in os.listdir(self.profile_dir) if _FILE_PATTERN.match(n))
+        for name in names[:-PROFILE_MAX_FILES]:
+            os.remove(os.path.join(self.profile_dir, name))
+
+    def list_profiles(self, limit: int = PROFILE_MAX_FILES) -> list:
+        """Profils capturés, des requêtes les plus lentes aux plus rapides."""
+        if not os.path.isdir(self.profile_dir):
+            return []
+        profiles = []
+        for name in os.listdir(self.profile_dir):
+            match = _FILE_PATTERN.match(name)
+            if match:
+                stamp, duration_ms, method, route, kind = match.groups()
+                profiles.append({"file": name, "captured_at": datetime.strptime(stamp, "%Y%m%d-%H%M%S-%f").isoformat(timespec='seconds'),
+                                 "duration_ms": int(duration_ms), "method": method, "route": route,
+                                 "kind": "cprofile" if kind == "prof" else "sampled"})
+        profiles.sort(key=lambda p: p["duration_ms"], reverse=True)
+        return profiles[:limit]
+
+    def profile_path(self, name: str):
+        """Chemin d'un profil capturé, None si le nom ne désigne pas un profil existant."""
+        if not _FILE_PATTERN.match(name):
+            return None
+        path = os.path.join(self.profile_dir, name)
+        return path if os.path.isfile(path) else None
@@ -1,12 +1,18 @@
 # scheduler.py
 
 import threading
+import queue
 import time
 from datetime import datetime, time as dt_time, date, timedelta
 import os
 import sys        # Pour sys.executable
 import subprocess # Pour lancer les sons
 import logging    # Importer pour type hint
+import json
+
+from sound_cli import FANOUT_REPORT_PREFIX
+from audio_analysis import RING_READY_MAX_SECONDS
+from metrics import REGISTRY
 
 # Import nécessaire pour la classe HolidayManager (pour type hinting si besoin)
 try:
@@ -14,6 +20,19 @@ try:
 except ImportError:
     HolidayManagerType = None # Type générique si import échoue
 
+# Délai avant d'arrêter le sous-processus de lecture: durée du son + marge (démarrage pygame, périphérique)
+DEFAULT_PLAYBACK_TIMEOUT_SECONDS = 15 # Durée inconnue
+PLAYBACK_TIMEOUT_MARGIN_SECONDS = 10
+MAX_PLAYBACK_TIMEOUT_SECONDS = RING_READY_MAX_SECONDS + PLAYBACK_TIMEOUT_MARGIN_SECONDS # Filet contre un lecteur bloqué
+RING_KILL_MARGIN_SECONDS = 5 # Échéance donnée au superviseur de processus, au-delà du délai d'attente
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+SCHEDULER_LOOP_LAG = REGISTRY.histogram("scheduler_loop_lag_seconds",
+                                        "Retard du réveil de la boucle du scheduler sur l'attente demandée.", buckets=LAG_BUCKETS)
+RING_TRIGGER_DELAY = REGISTRY.histogram("ring_trigger_delay_seconds",
+                                        "Délai entre l'heure prévue d'une sonnerie et le lancement du lecteur.", buckets=LAG_BUCKETS)
+RINGS_TOTAL = REGISTRY.counter("rings_total", "Sonneries planifiées jouées, par résultat.", ("outcome",))
+
 class SchedulerManager:
     """
     Gère la planification et le déclenchement des sonneries dans un thread séparé.
@@ -21,7 +40,9 @@ class SchedulerManager:
     Recherche la prochaine sonnerie au-delà du jour courant si nécessaire.
     """
     def __init__(self, day_types_config: dict, weekly_planning_config: dict, exceptions_config: dict,
-                 holiday_manager: HolidayManagerType, mp3_path: str, logger: logging.Logger, audio_device_name: str = None):
+                 holiday_manager: HolidayManagerType, mp3_path: str, logger: logging.Logger, audio_device_name: str = None,
+                 status_callback=None, sound_resolver=None, sound_duration_resolver=None, audio_device_resolver=None,
+                 process_spawner=None, history_recorder=None):
         """
         Initialise le SchedulerManager.
         Args:
@@ -32,6 +53,19 @@ class SchedulerManager:
             mp3_path: Chemin vers le dossier des fichiers MP3.
             logger: Instance du logger.
             audio_device_name: Nom du périphérique audio à utiliser pour les sonneries.
+            status_callback: Fonction appelée avec le nouveau statut (voir get_status_snapshot)
+                             quand l'état visible change (activation, prochaine sonnerie, dernière erreur).
+            sound_resolver: Fonction nom de fichier -> chemin à lire (ex: miroir MP3 local).
+                            Si None, le fichier est lu directement dans mp3_path.
+            sound_duration_resolver: Fonction nom de fichier -> durée en secondes (ou None si inconnue),
+                                     pour arrêter la lecture à la fin réelle du son plutôt qu'après 15s.
+            audio_device_resolver: Fonction nom configuré -> nom exact du périphérique à passer au lecteur
+                                   (None: périphérique par défaut), ex: cache des périphériques audio.
+            process_spawner: Fonction (type, cmd, deadline_seconds, **popen_kwargs) -> Popen lançant le
+                             processus de lecture sous supervision (ex: ProcessSupervisor.spawn).
+                             Si None, subprocess.Popen est utilisé directement.
+            history_recorder: Fonction appelée après chaque sonnerie avec les arguments de
+                              HistoryStore.record (type, résultat, heure prévue/réelle, son, sorties).
         """
         self.logger = logger
         self.logger.info("Initialisation de SchedulerManager...")
@@ -43,6 +77,11 @@ class SchedulerManager:
         self.holiday_manager = holiday_manager
         self.mp3_path = mp3_path
         self.audio_device_name = audio_device_name
+        self.sound_resolver = sound_resolver
+        self.sound_duration_resolver = sound_duration_resolver
+        self.audio_device_resolver = audio_device_resolver
+        self.process_spawner = process_spawner
+        self.history_recorder = history_recorder
         self.logger.info(f"Audio device name configured: {self.audio_device_name}")
 
         self._running = False
@@ -54,6 +93,10 @@ class SchedulerManager:
         self._next_ring_info = {"time": None, "label": None, "event_type": None, "sonnerie": None}
         self._last_error = None
         self._lookahead_limit_days = 60
+        self._status_callback = status_callback
+        self._last_published_status = None
+        self._ring_queue = queue.Queue() # Sonneries à jouer, l'une après l'autre (voir _play_ring)
+        self._ring_worker = None
 
         if not isinstance(holiday_manager, HolidayManagerType if HolidayManagerType else object):
              self.logger.error("HolidayManager invalide passé à SchedulerManager ! Les types de jours seront incorrects.")
@@ -66,6 +109,7 @@ class SchedulerManager:
             self._last_error = None
             self._force_recheck.set()
             self.logger.info("Scheduler activé. Vérification planning en cours...")
+            self._publish_status_if_changed()
         else:
             self.logger.warning("Scheduler déjà actif.")
 
@@ -75,6 +119,7 @@ class SchedulerManager:
             self._running = False
             self._next_ring_info = {"time": None, "label": None, "event_type": None, "sonnerie": None}
             self.logger.info("Scheduler désactivé (flag _running=False).")
+            self._publish_status_if_changed()
         else:
             self.logger.warning("Scheduler déjà inactif.")
 
@@ -97,6 +142,7 @@ class SchedulerManager:
             self._next_ring_info = {"time": None, "label": None, "event_type": None, "sonnerie": None}
             self._force_recheck.set()
             self.logger.info("Config scheduler rechargée. Recalcul forcé.")
+        self._publish_status_if_changed()
 
     def is_running(self):
         return self._running
@@ -111,6 +157,34 @@ class SchedulerManager:
     def get_last_error(self):
         return self._last_error
 
+    def get_status_snapshot(self):
+        """
+        Retourne l'état visible du scheduler sous forme de dict.
+        _next_ring_info n'est jamais modifié en place (toujours réaffecté) : une seule
+        lecture de la référence garantit une heure et un libellé cohérents, sans verrou.
+        """
+        next_info = self._next_ring_info
+        next_time = next_info.get("time")
+        return {
+            "scheduler_running": self._running,
+            "next_ring_time": next_time.isoformat() if isinstance(next_time, datetime) else None,
+            "next_ring_label": next_info.get("label"),
+            "last_error": self._last_error
+        }
+
+    def _publish_status_if_changed(self):
+        """Notifie status_callback si l'état visible (actif, prochaine sonnerie, erreur) a changé."""
+        if not self._status_callback:
+            return
+        current = self.get_status_snapshot()
+        if current == self._last_published_status:
+            return
+        self._last_published_status = current
+        try:
+            self._status_callback(current)
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la notification du changement de statut: {e}", exc_info=True)
+
     def run(self):
         self.logger.info("Thread Scheduler démarré. En attente d'activation...")
         while not self._stop_event.is_set():
@@ -164,10 +238,10 @@ class SchedulerManager:
                                     self._next_ring_info = next_today
 
                         if event_to_ring:
-                            self.logger.debug(f"-> Cycle {now.strftime('%H:%M:%S.%f')}: Prêt à déclencher event_to_ring = {event_to_ring.get('label')}")
+                            self.logger.debug("-> Cycle %s: Prêt à déclencher event_to_ring = %s", now, event_to_ring.get('label'))
                             self.logger.info(f"HEURE DE SONNER ! Événement: {event_to_ring.get('label', '?')} prévu à {event_to_ring.get('time').strftime('%Y-%m-%d %H:%M:%S') if event_to_ring.get('time') else 'N/A'}")
                             self._play_ring(event_to_ring)
-                            self.logger.debug(f"-> Cycle {now.strftime('%H:%M:%S.%f')}: Appel à _play_ring terminé pour -> {event_to_ring.get('label', '?')}")
+                            self.logger.debug("-> Cycle %s: Appel à _play_ring terminé pour -> %s", now, event_to_ring.get('label', '?'))
 
                             next_ring_time_iso_after_play = self.get_next_ring_time_iso()
                             next_ring_label_after_play = self.get_next_ring_label()
@@ -176,7 +250,7 @@ class SchedulerManager:
                             else:
                                 self.logger.info(f"Aucune autre sonnerie future trouvée (après sonnerie).")
                         else:
-                            self.logger.debug(f"-> Cycle {now.strftime('%H:%M:%S.%f')}: Pas d'événement à sonner pour cette itération (event_to_ring est None).")
+                            self.logger.debug("-> Cycle %s: Pas d'événement à sonner pour cette itération (event_to_ring est None).", now)
 
                     # else: # Optionnel: log si pas l'heure
                     #     if next_event_time:
@@ -185,14 +259,17 @@ class SchedulerManager:
                     #         self.logger.debug(f"-> Cycle {now.strftime('%H:%M:%S.%f')}: Aucune prochaine sonnerie définie.")
 
                 else: # Pas _running
-                    self.logger.debug(f"Scheduler inactif. Attente _force_recheck (timeout 5s)...")
+                    self.logger.debug("Scheduler inactif. Attente _force_recheck (timeout 5s)...")
                     self._force_recheck.wait(timeout=5)
 
             except Exception as e:
                 self.logger.error(f"Erreur boucle scheduler: {e}", exc_info=True)
                 self._last_error = f"{datetime.now():%H:%M:%S}: {e}"
+                self._publish_status_if_changed()
                 self._stop_event.wait(15)
 
+            self._publish_status_if_changed()
+
             if self._running:
                 sleep_duration = 1.0
                 next_ring_dt = self._next_ring_info.get("time")
@@ -205,7 +282,10 @@ class SchedulerManager:
                         sleep_duration = 0.05
                         self._force_recheck.set()
 
+                wait_started = time.monotonic()
                 woken = self._stop_event.wait(timeout=sleep_duration)
+                if not woken:
+                    SCHEDULER_LOOP_LAG.observe(max(0.0, time.monotonic() - wait_started - sleep_duration))
                 if woken:
                     self.logger.debug("Scheduler réveillé par événement (stop_event ou force_recheck).") # Modifié
             # Si pas _running, la boucle attendra au début du prochain tour via _force_recheck.wait()
@@ -213,7 +293,8 @@ class SchedulerManager:
         self.logger.info("Thread Scheduler run() terminé.")
 
     def _find_absolute_next_event(self, start_search_date: date):
-        self.logger.info(f"----> Entrée _find_absolute_next_event: start_search_date={start_search_date}, limite={self._lookahead_limit_days}j")
+        # Méthode appelée souvent (chaque recalcul) : logs en DEBUG avec formatage différé (%s)
+        self.logger.debug("----> Entrée _find_absolute_next_event: start_search_date=%s, limite=%sj", start_search_date, self._lookahead_limit_days)
         next_event = {"time": None, "label": None, "event_type": None, "sonnerie": None}
         current_check = start_search_date # Utilisons current_check, c'est bien
 
@@ -221,12 +302,12 @@ class SchedulerManager:
             current_weekly_planning = self.weekly_planning.copy()
             current_exceptions = self.planning_exceptions.copy()
             current_day_types = self.day_types.copy()
-            self.logger.debug(f"----> _find_absolute: Copies config OK. (day_types contient {len(current_day_types)} journees)")
+            self.logger.debug("----> _find_absolute: Copies config OK. (day_types contient %d journees)", len(current_day_types))
 
             for i in range(self._lookahead_limit_days):
-                self.logger.debug(f"----> _find_absolute: Boucle jour {i+1}/{self._lookahead_limit_days}, date={current_check}")
+                self.logger.debug("----> _find_absolute: Boucle jour %d/%d, date=%s", i + 1, self._lookahead_limit_days, current_check)
                 day_info = self.holiday_manager.get_day_type_and_desc(current_check, current_weekly_planning, current_exceptions)
-                self.logger.info(f"----> _find_absolute: Pour date {current_check}, holiday_manager dit: {day_info}")
+                self.logger.debug("----> _find_absolute: Pour date %s, holiday_manager dit: %s", current_check, day_info)
 
                 schedule_name_for_day = day_info.get("schedule_name")
                 # Commentaire log optionnel
@@ -234,12 +315,12 @@ class SchedulerManager:
                 #    self.logger.debug(f"----> _find_absolute: Appel _generate_daily_events pour {current_check} avec schedule_name='{schedule_name_for_day}' et day_types = {list(current_day_types.keys())}")
 
                 daily_schedule = self._generate_daily_events(day_info, current_day_types, current_check)
-                self.logger.info(f"----> _find_absolute: Pour date {current_check} (schedule_name='{schedule_name_for_day}'), _generate_daily_events a retourné {len(daily_schedule)} événements.")
+                self.logger.debug("----> _find_absolute: Pour date %s (schedule_name='%s'), _generate_daily_events a retourné %d événements.", current_check, schedule_name_for_day, len(daily_schedule))
 
                 if daily_schedule: # Si des événements sont trouvés pour ce jour
                     first_event = daily_schedule[0]
                     next_event = first_event.copy()
-                    self.logger.info(f"----> _find_absolute: Prochaine absolue TROUVÉE: {next_event.get('label')} le {current_check} à {next_event.get('time').strftime('%H:%M:%S') if next_event.get('time') else 'Heure inconnue'}")
+                    self.logger.info("----> _find_absolute: Prochaine absolue TROUVÉE: %s le %s à %s", next_event.get('label'), current_check, next_event.get('time') or 'Heure inconnue')
                     break # Sortir de la boucle for, nous avons trouvé
 
                 # SI ON ARRIVE ICI, c'est que daily_schedule était vide pour current_check.
@@ -255,7 +336,7 @@ class SchedulerManager:
              self.logger.error(f"!!!! ERREUR dans _find_absolute_next_event pour start={start_search_date}: {e}", exc_info=True)
              next_event = {"time": None, "label": None, "event_type": None, "sonnerie": None} # Assurer un retour par défaut
 
-        self.logger.info(f"----> Sortie _find_absolute_next_event: Retourne: {next_event.get('time')}")
+        self.logger.debug("----> Sortie _find_absolute_next_event: Retourne: %s", next_event.get('time'))
         return next_event
 
     def _generate_daily_events(self, day_type_info: dict, current_day_types: dict, date_for_events: date):
@@ -270,9 +351,10 @@ class SchedulerManager:
         for p in periods:
             nom = p.get("nom", "?"); h_deb_str = p.get("heure_debut"); h_fin_str = p.get("heure_fin")
             s_deb = p.get("sonnerie_debut"); s_fin = p.get("sonnerie_fin")
+            devices = p.get("peripheriques_audio") or None # Groupe de sorties de la période (sinon périphérique configuré)
             try:
-                 if h_deb_str: daily_events.append({"time": datetime.combine(date_for_events, dt_time.fromisoformat(h_deb_str)), "label": f"Début {nom}", "event_type": "debut", "sonnerie": s_deb})
-                 if h_fin_str: daily_events.append({"time": datetime.combine(date_for_events, dt_time.fromisoformat(h_fin_str)), "label": f"Fin {nom}", "event_type": "fin", "sonnerie": s_fin})
+                 if h_deb_str: daily_events.append({"time": datetime.combine(date_for_events, dt_time.fromisoformat(h_deb_str)), "label": f"Début {nom}", "event_type": "debut", "sonnerie": s_deb, "peripheriques": devices})
+                 if h_fin_str: daily_events.append({"time": datetime.combine(date_for_events, dt_time.fromisoformat(h_fin_str)), "label": f"Fin {nom}", "event_type": "fin", "sonnerie": s_fin, "peripheriques": devices})
             except ValueError as e_time: self.logger.warning(f"Format heure invalide '{h_deb_str or h_fin_str}' JT '{schedule_name}': {e_time}")
         daily_events.sort(key=lambda x: x["time"])
         # self.logger.debug(f"{len(daily_events)} événements générés triés pour {date_for_events}.") # Un peu verbeux
@@ -288,7 +370,122 @@ class SchedulerManager:
         # else: self.logger.debug(f"Aucun événement trouvé aujourd'hui après {from_time}.") # Un peu verbeux
         return next_event
 
+    def _get_playback_timeout(self, filename: str) -> float:
+        """Durée du son (catalogue) + marge, plafonnée, ou DEFAULT_PLAYBACK_TIMEOUT_SECONDS si inconnue."""
+        duration = None
+        if self.sound_duration_resolver:
+            try:
+                duration = self.sound_duration_resolver(filename)
+            except Exception as e:
+                self.logger.warning(f"Durée de '{filename}' indisponible: {e}")
+        if not duration:
+            return DEFAULT_PLAYBACK_TIMEOUT_SECONDS
+        return min(duration + PLAYBACK_TIMEOUT_MARGIN_SECONDS, MAX_PLAYBACK_TIMEOUT_SECONDS)
+
+    def _resolve_audio_devices(self, configured_names) -> list:
+        """Noms exacts des sorties à passer au lecteur (liste vide: périphérique par défaut)."""
+        resolved = []
+        for name in configured_names or [self.audio_device_name]:
+            device = self.audio_device_resolver(name) if self.audio_device_resolver else name
+            if device and device not in resolved:
+                resolved.append(device)
+        return resolved
+
+    def _log_fanout_report(self, stdout: str):
+        """Journalise le décalage de démarrage mesuré par sortie (lecture sur plusieurs sorties)."""
+        for line in stdout.splitlines():
+            if not line.startswith(FANOUT_REPORT_PREFIX):
+                continue
+            try:
+                report = json.loads(line[len(FANOUT_REPORT_PREFIX):])
+            except ValueError:
+                continue
+            for device in report.get("devices", []):
+                log = self.logger.warning if device.get("late") else self.logger.info
+                log(f"---> Sortie '{device.get('name')}': décalage de démarrage {device.get('start_skew_ms')} ms")
+            for name, error in report.get("failed", {}).items():
+                self.logger.error(f"---> Sortie '{name}' non utilisée: {error}")
+
     def _play_ring(self, event_details: dict):
+        """
+        Confie la sonnerie au thread des sonneries, sans attendre: la boucle du scheduler
+        n'est jamais bloquée par un son long (ou un lecteur qui ne rend pas la main).
+        Les sonneries sont jouées l'une après l'autre, dans l'ordre: deux sonneries à la
+        même heure (fin d'un cours, début du suivant) ne se superposent pas.
+        """
+        if self._ring_worker is None or not self._ring_worker.is_alive():
+            self._ring_worker = threading.Thread(target=self._ring_worker_loop, name="RingPlayer", daemon=True)
+            self._ring_worker.start()
+        self._ring_queue.put(event_details)
+
+    def _ring_worker_loop(self):
+        while True:
+            event_details = self._ring_queue.get()
+            try:
+                self._ring_now(event_details)
+            except Exception as e: # Le thread doit survivre pour les sonneries suivantes
+                self.logger.error(f"---> ERREUR sonnerie '{event_details.get('label')}': {e}", exc_info=True)
+
+    def _ring_now(self, event_details: dict):
+        """Joue la sonnerie jusqu'au bout puis l'inscrit dans l'historique (heure prévue / réelle, résultat)."""
+        record = {"outcome": "ok", "error": None, "devices": None, "started_at": datetime.now()}
+        launched = None
+        try:
+            launched = self._run_ring(event_details, record)
+        finally:
+            if launched is None:
+                self._record_ring(event_details, record)
+        if launched:
+            process, playback_timeout = launched
+            self._await_ring(process, playback_timeout, event_details, record)
+
+    def _await_ring(self, process, playback_timeout: float, event_details: dict, record: dict):
+        """Attend la fin du processus de lecture, journalise sa sortie et inscrit le résultat."""
+        filename = event_details.get("sonnerie")
+        stderr = ""
+        try:
+            try:
+                stdout, stderr = process.communicate(timeout=playback_timeout) # Read output
+                if stdout:
+                    self.logger.info(f"---> Output from sound process (PID {process.pid}):\n{stdout.strip()}")
+                    self._log_fanout_report(stdout)
+                if stderr:
+                    self.logger.error(f"---> Errors from sound process (PID {process.pid}):\n{stderr.strip()}")
+            except subprocess.TimeoutExpired:
+                self.logger.error(f"---> Timeout ({playback_timeout:.0f}s) waiting for sound process (PID {process.pid}) to complete. Killing.")
+                process.kill()
+                record.update(outcome="timeout", error=f"Lecture interrompue après {playback_timeout:.0f} s")
+                stdout, stderr = process.communicate() # Try to get any remaining output
+                if stdout:
+                    self.logger.info(f"---> Output (post-kill) from sound process (PID {process.pid}):\n{stdout.strip()}")
+                if stderr:
+                    self.logger.error(f"---> Errors (post-kill) from sound process (PID {process.pid}):\n{stderr.strip()}")
+            self.logger.info(f"---> Sound process (PID {process.pid}) finished with code: {process.returncode}")
+            if process.returncode != 0 and record["outcome"] == "ok":
+                record.update(outcome="error", error=((stderr or "").strip().splitlines() or [f"code {process.returncode}"])[-1])
+        except Exception as e_wait:
+            self.logger.error(f"---> ERREUR attente du processus son '{filename}' (PID {process.pid}): {e_wait}", exc_info=True)
+            self._last_error = f"{datetime.now():%H:%M:%S}: Erreur lecture {filename}: {e_wait}"
+            record.update(outcome="error", error=str(e_wait))
+        finally:
+            self._record_ring(event_details, record)
+
+    def _record_ring(self, event_details: dict, record: dict):
+        """Métriques et historique d'une sonnerie terminée (ou non lancée)."""
+        if event_details.get("sonnerie"):
+            RINGS_TOTAL.inc(outcome=record["outcome"])
+            if event_details.get("time") and record["outcome"] in ("ok", "timeout"):
+                RING_TRIGGER_DELAY.observe(max(0.0, (record["started_at"] - event_details["time"]).total_seconds()))
+        if self.history_recorder and event_details.get("sonnerie"):
+            try:
+                self.history_recorder("ring", record["outcome"], sound=event_details.get("sonnerie"),
+                                      scheduled_at=event_details.get("time"), started_at=record["started_at"],
+                                      devices=record["devices"], label=event_details.get("label"), error=record["error"])
+            except Exception as e:
+                self.logger.error(f"---> Historique: sonnerie '{event_details.get('label')}' non enregistrée: {e}", exc_info=True)
+
+    def _run_ring(self, event_details: dict, record: dict):
+        """Lance le processus de lecture. Retourne (processus, délai d'attente), ou None si rien n'a été lancé."""
         filename = event_details.get("sonnerie")
         label = event_details.get("label", "?")
         event_time_str = event_details.get("time").strftime('%Y-%m-%d %H:%M:%S') if event_details.get("time") else "Heure Inconnue"
@@ -300,14 +497,19 @@ class SchedulerManager:
             return
 
         try:
-            if not self.mp3_path or not os.path.isdir(self.mp3_path):
+            if self.sound_resolver:
+                sound_path = self.sound_resolver(filename) # Copie locale: pas d'accès au partage au moment de sonner
+            elif not self.mp3_path or not os.path.isdir(self.mp3_path):
                  self.logger.error(f"---> _play_ring ERREUR: MP3_PATH invalide ou non défini: '{self.mp3_path}'")
                  self._last_error = f"{datetime.now():%H:%M:%S}: MP3_PATH invalide"
+                 record.update(outcome="error", error="MP3_PATH invalide")
                  return
-            sound_path = os.path.join(self.mp3_path, filename)
+            else:
+                sound_path = os.path.join(self.mp3_path, filename)
         except Exception as e_path:
             self.logger.error(f"---> _play_ring ERREUR construction chemin son pour '{filename}': {e_path}", exc_info=True)
             self._last_error = f"{datetime.now():%H:%M:%S}: Erreur chemin {filename}"
+            record.update(outcome="error", error=str(e_path))
             return
 
         self.logger.info(f"---> Play '{label}' ({event_time_str}) via subprocess: '{sound_path}'")
@@ -315,6 +517,7 @@ class SchedulerManager:
         if not os.path.isfile(sound_path):
             self.logger.error(f"---> SONNERIE INTROUVABLE (fichier physique): '{sound_path}' pour event '{label}'")
             self._last_error = f"{datetime.now():%H:%M:%S}: Fichier {filename} introuvable"
+            record.update(outcome="missing", error=f"Fichier introuvable: {sound_path}")
             return
 
         try:
@@ -324,39 +527,36 @@ class SchedulerManager:
             if not os.path.exists(backend_script):
                 self.logger.error(f"---> _play_ring ERREUR: Script backend_server.py non trouvé à '{backend_script}'")
                 self._last_error = f"{datetime.now():%H:%M:%S}: Erreur interne: backend_server.py absent"
+                record.update(outcome="error", error="backend_server.py absent")
                 return
 
             cmd = [sys.executable, backend_script, '--play-sound', sound_path]
-            if self.audio_device_name:
-                cmd.extend(['--device', self.audio_device_name])
-                self.logger.info(f"---> Using audio device: {self.audio_device_name}")
+            audio_devices = self._resolve_audio_devices(event_details.get("peripheriques"))
+            record["devices"] = audio_devices
+            if audio_devices:
+                for audio_device in audio_devices:
+                    cmd.extend(['--device', audio_device])
+                self.logger.info(f"---> Using audio device(s): {', '.join(audio_devices)}")
             else:
                 self.logger.info("---> No specific audio device configured for scheduler, using system default.")
             self.logger.debug(f"---> Commande son: {' '.join(cmd)}")
-            flags = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-
             # Correction: Ajout de errors='replace' pour gérer les erreurs de décodage
-            process = subprocess.Popen(cmd, creationflags=flags, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8', errors='replace')
+            popen_kwargs = dict(stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8', errors='replace')
+            playback_timeout = self._get_playback_timeout(filename)
+            record["started_at"] = datetime.now()
+            if self.process_spawner:
+                # Échéance du superviseur au-delà du délai d'attente: filet si communicate() ne rend pas la main
+                process = self.process_spawner("ring", cmd, playback_timeout + RING_KILL_MARGIN_SECONDS, **popen_kwargs)
+            else:
+                flags = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+                process = subprocess.Popen(cmd, creationflags=flags, **popen_kwargs)
             self.logger.info(f"---> Subprocess lancé pour jouer '{filename}'. PID: {process.pid}")
-            try:
-                stdout, stderr = process.communicate(timeout=15) # Read output, timeout 15s
-                if stdout:
-                    self.logger.info(f"---> Output from sound process (PID {process.pid}):\n{stdout.strip()}")
-                if stderr:
-                    self.logger.error(f"---> Errors from sound process (PID {process.pid}):\n{stderr.strip()}")
-            except subprocess.TimeoutExpired:
-                self.logger.error(f"---> Timeout waiting for sound process (PID {process.pid}) to complete. Killing.")
-                process.kill()
-                stdout, stderr = process.communicate() # Try to get any remaining output
-                if stdout:
-                    self.logger.info(f"---> Output (post-kill) from sound process (PID {process.pid}):\n{stdout.strip()}")
-                if stderr:
-                    self.logger.error(f"---> Errors (post-kill) from sound process (PID {process.pid}):\n{stderr.strip()}")
-            self.logger.info(f"---> Sound process (PID {process.pid}) finished with code: {process.returncode}")
+            return process, playback_timeout # Fin de lecture attendue par _await_ring
 
         except Exception as e_sub:
             self.logger.error(f"---> _play_ring ERREUR lancement subprocess son '{filename}': {e_sub}", exc_info=True)
             self._last_error = f"{datetime.now():%H:%M:%S}: Erreur lecture {filename}: {e_sub}"
+            record.update(outcome="error", error=str(e_sub))
 
         self.logger.debug(f"---> Sortie _play_ring pour event '{label}'")
 
@@ -0,0 +1,192 @@
+# share_io.py
+"""
+Accès fichiers à latence bornée pour le partage réseau (SMB).
+
+Un open() ou os.listdir() sur un partage lent peut bloquer aussi longtemps que le
+délai SMB du système. Ici chaque opération s'exécute dans un pool de threads avec
+une échéance : passé ce délai, on lit (ou écrit) la copie locale correspondante
+si elle existe, sinon ShareTimeoutError est levée. Tant que le partage est signalé
+lent et qu'une opération y est encore bloquée, les appels suivants ne sont pas mis
+en file derrière elle : ils passent directement à la copie locale (ou échouent
+aussitôt), au lieu d'attendre chacun l'échéance puis de s'exécuter en retard. Les durées de chaque opération
+sont conservées pour exposer la santé du partage (p95) dans /api/status.
+"""
+import os
+import json
+import math
+import time
+import threading
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from metrics import REGISTRY
+
+SHARE_IO_SECONDS = REGISTRY.histogram("share_io_duration_seconds", "Durée des opérations sur le partage réseau.",
+                                      ("op", "result"))
+
+
+class ShareTimeoutError(TimeoutError):
+    """Opération sur le partage non terminée dans le délai imparti (et pas de copie locale)."""
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)] # Rang le plus proche
+
+
+def _read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(path, data, indent):
+    # Fichier temporaire puis remplacement: jamais de fichier tronqué ou à moitié écrit
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class ShareIO:
+    """Exécute les opérations fichiers du partage avec une échéance et mesure leur latence."""
+
+    def __init__(self, logger: logging.Logger, timeout: float = 3, max_workers: int = 4,
+                 latency_window: int = 200, on_health_change=None):
+        """
+        Args:
+            logger: Instance du logger.
+            timeout: Échéance par défaut (s) d'une opération.
+            max_workers: Taille du pool (un appel bloqué par le SMB y occupe un thread).
+            latency_window: Nombre de mesures conservées par opération pour le p95.
+            on_health_change: Fonction appelée (sans argument) quand le partage devient
+                              lent/injoignable ou redevient sain.
+        """
+        self.logger = logger
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ShareIO")
+        self._on_health_change = on_health_change
+
+        self._lock = threading.Lock()
+        self._latency_window = latency_window
+        self._latencies = {} # op -> deque des durées (s)
+        self._counters = {} # op -> {"count", "timeouts", "errors"}
+        self._recent_timeouts = deque(maxlen=20) # True/False pour les derniers appels
+        self._healthy = True
+        self._last_timeout = None
+        self._in_flight = 0 # Opérations soumises au pool et pas encore terminées (dont celles bloquées par le SMB)
+
+    # --- Exécution avec échéance ---
+
+    def _record(self, op: str, duration: float, timed_out: bool = False, error: bool = False):
+        SHARE_IO_SECONDS.observe(duration, op=op, result="timeout" if timed_out else "error" if error else "ok")
+        with self._lock:
+            self._latencies.setdefault(op, deque(maxlen=self._latency_window)).append(duration)
+            counters = self._counters.setdefault(op, {"count": 0, "timeouts": 0, "errors": 0})
+            counters["count"] += 1
+            counters["timeouts"] += timed_out
+            counters["errors"] += error
+            self._recent_timeouts.append(timed_out)
+            if timed_out:
+                self._last_timeout = time.time()
+            healthy = not any(self._recent_timeouts)
+            changed = healthy != self._healthy
+            self._healthy = healthy
+        if changed:
+            if healthy:
+                self.logger.info("Partage réseau de nouveau réactif.")
+            else:
+                self.logger.warning(f"Partage réseau lent ou injoignable (opération '{op}' > {self.timeout}s).")
+            if self._on_health_change:
+                try:
+                    self._on_health_change()
+                except Exception as e:
+                    self.logger.error(f"Erreur callback santé du partage: {e}", exc_info=True)
+
+    def run(self, op: str, func, *args, cache_path=None, timeout=None):
+        """
+        Exécute func(*args) (args[0] étant le chemin du partage) avec une échéance.
+        Si le délai est dépassé et que cache_path est fourni, func est rejouée sur la
+        copie locale (cache_path remplace args[0]). Sinon ShareTimeoutError est levée.
+        Les autres exceptions (FileNotFoundError, JSONDecodeError...) sont propagées telles quelles.
+        """
+        deadline = timeout if timeout is not None else self.timeout
+        with self._lock:
+            skip_share = not self._healthy and self._in_flight > 0
+            if not skip_share:
+                self._in_flight += 1
+        if skip_share: # Partage bloqué: pas de nouvelle tâche derrière celles qui attendent déjà
+            if cache_path is None:
+                raise ShareTimeoutError(f"Partage injoignable, '{op}' non tenté sur {args[0] if args else '?'}")
+            self.logger.debug(f"Partage injoignable, '{op}' fait directement sur la copie locale {cache_path}.")
+            return func(cache_path, *args[1:])
+        started = time.monotonic()
+        future = self._executor.submit(func, *args)
+        future.add_done_callback(self._operation_done)
+        try:
+            result = future.result(timeout=deadline)
+        except FutureTimeoutError:
+            future.cancel() # Pas encore commencée: elle ne s'exécutera pas en retard
+            self._record(op, time.monotonic() - started, timed_out=True)
+            if cache_path is None:
+                raise ShareTimeoutError(f"Délai dépassé ({deadline}s) pour '{op}' sur {args[0] if args else '?'}")
+            self.logger.warning(f"Délai dépassé ({deadline}s) pour '{op}' sur {args[0]}, utilisation de la copie locale {cache_path}.")
+            return func(cache_path, *args[1:])
+        except Exception:
+            self._record(op, time.monotonic() - started, error=True)
+            raise
+        self._record(op, time.monotonic() - started)
+        return result
+
+    def _operation_done(self, future):
+        # Opération terminée, en erreur ou annulée avant d'avoir commencé
+        with self._lock:
+            self._in_flight -= 1
+
+    # --- Opérations courantes ---
+
+    def read_json(self, path, cache_path=None):
+        return self.run("read_json", _read_json, path, cache_path=cache_path)
+
+    def write_json(self, path, data, cache_path=None, indent=2):
+        """Écrit un JSON. En cas de délai dépassé, écrit dans la copie locale (renvoyée plus tard sur le partage)."""
+        self.run("write_json", _write_json, path, data, indent, cache_path=cache_path)
+
+    def exists(self, path, cache_path=None):
+        return self.run("exists", os.path.exists, path, cache_path=cache_path)
+
+    def isdir(self, path, cache_path=None):
+        return self.run("isdir", os.path.isdir, path, cache_path=cache_path)
+
+    def listdir(self, path, cache_path=None):
+        """Liste (nom, est_un_fichier) du dossier en un seul passage (os.scandir)."""
+        return self.run("listdir", lambda p: [(e.name, e.is_file()) for e in os.scandir(p)], path, cache_path=cache_path)
+
+    # --- Santé ---
+
+    def get_health(self) -> dict:
+        """Santé du partage: p95 global et par opération (ms), nombre de délais dépassés."""
+        with self._lock:
+            all_latencies = [d for values in self._latencies.values() for d in values]
+            operations = {
+                op: {
+                    "count": counters["count"],
+                    "timeouts": counters["timeouts"],
+                    "errors": counters["errors"],
+                    "p95_ms": round(_percentile(self._latencies[op], 95) * 1000)
+                }
+                for op, counters in self._counters.items()
+            }
+            p95 = _percentile(all_latencies, 95)
+            return {
+                "healthy": self._healthy,
+                "p95_ms": round(p95 * 1000) if p95 is not None else None,
+                "timeouts": sum(c["timeouts"] for c in self._counters.values()),
+                "last_timeout": time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self._last_timeout)) if self._last_timeout else None,
+                "operations": operations
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,416 @@
+# sound_catalog.py
+"""
+Catalogue persistant des fichiers MP3 (dossier MP3_PATH).
+
+Pour chaque fichier : taille, date de modification, empreinte SHA-1, durée,
+fréquence d'échantillonnage, débit et résultat d'une vérification de décodage
+(enchaînement des trames MPEG valide). Le catalogue est enregistré sur le disque
+local ; un nouveau scan (os.scandir) ne réanalyse que les fichiers dont la taille
+ou la date a changé. Les pages et routes des sonneries lisent le catalogue au lieu
+d'interroger le partage. Le catalogue gère aussi le cache des copies WAV « prêtes à
+sonner » (une par contenu SHA-1, voir audio_analysis.py).
+"""
+import io
+import os
+import json
+import hashlib
+import threading
+import logging
+from datetime import datetime
+
+from audio_analysis import audio_warnings
+
+CATALOG_VERSION = 1
+SHARE_READ_TIMEOUT_SECONDS = 30 # Lecture d'un MP3 complet sur le partage (quelques Mo)
+
+# --- Analyse MP3 (en-têtes de trames MPEG audio, sans dépendance externe) ---
+
+# Débits (kbit/s) par (version MPEG 1 ou 2/2.5, couche)
+_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Fréquences par bits de version (00: MPEG 2.5, 10: MPEG 2, 11: MPEG 1)
+_SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+_FIRST_FRAME_SEARCH_BYTES = 64 * 1024 # Octets parcourus pour trouver la première trame
+
+
+def _parse_frame_header(data, pos):
+    """Retourne (longueur trame, échantillons, fréquence, débit kbit/s) ou None si en-tête invalide."""
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+    b1, b2 = data[pos + 1], data[pos + 2]
+    version_bits = (b1 >> 3) & 0x03
+    layer = 4 - ((b1 >> 1) & 0x03) # 01 -> couche 3, 10 -> 2, 11 -> 1
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    if version_bits == 1 or layer == 4 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None # Réservé, ou débit libre (non géré)
+    mpeg1 = version_bits == 3
+    bitrate = _BITRATES[(1 if mpeg1 else 2, layer)][bitrate_index]
+    sample_rate = _SAMPLE_RATES[version_bits][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate * 1000 // sample_rate + padding) * 4
+    else:
+        samples = 1152 if (layer == 2 or mpeg1) else 576
+        length = samples // 8 * bitrate * 1000 // sample_rate + padding
+    return length, samples, sample_rate, bitrate
+
+
+def _audio_bounds(data):
+    """Début et fin de la zone audio (hors balises ID3v2 en tête et ID3v1 en fin)."""
+    start, end = 0, len(data)
+    if data[:3] == b"ID3" and len(data) >= 10:
+        tag_size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9] # Entier « syncsafe »
+        start = 10 + tag_size + (10 if data[5] & 0x10 else 0) # Pied de balise optionnel
+    if end - start >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+    return start, end
+
+
+def analyze_mp3(fileobj) -> dict:
+    """
+    Analyse un MP3 (objet fichier binaire) : SHA-1, durée, fréquence, débit moyen
+    et vérification de décodage (trames MPEG enchaînées sans perte de synchronisation).
+    """
+    data = fileobj.read()
+    result = {"sha1": hashlib.sha1(data).hexdigest(), "duration_s": None, "sample_rate": None,
+              "bitrate_kbps": None, "decode_ok": False, "decode_error": None}
+    start, end = _audio_bounds(data)
+
+    # Première trame: en-tête valide suivi d'un second en-tête valide (évite les faux positifs)
+    pos = None
+    for candidate in range(start, min(end, start + _FIRST_FRAME_SEARCH_BYTES)):
+        header = _parse_frame_header(data, candidate)
+        if header and _parse_frame_header(data, candidate + header[0]):
+            pos = candidate
+            break
+    if pos is None:
+        result["decode_error"] = "Aucune trame MPEG audio trouvée"
+        return result
+
+    frames, total_samples, audio_bytes, resyncs = 0, 0, 0, 0
+    sample_rate = None
+    while pos < end:
+        header = _parse_frame_header(data, pos)
+        if header is None or pos + header[0] > end:
+            # Perte de synchronisation: chercher la trame suivante
+            next_sync = data.find(b"\xFF", pos + 1, end)
+            while next_sync != -1 and not _parse_frame_header(data, next_sync):
+                next_sync = data.find(b"\xFF", next_sync + 1, end)
+            if next_sync == -1:
+                break # Fin des trames (données de fin ou balise APE, etc.)
+            resyncs += 1
+            pos = next_sync
+            continue
+        length, samples, frame_rate, _ = header
+        if sample_rate is None:
+            sample_rate = frame_rate
+        frames += 1
+        total_samples += samples
+        audio_bytes += length
+        pos += length
+
+    audio_region = max(1, end - start)
+    duration = total_samples / sample_rate if sample_rate else None
+    result.update({
+        "duration_s": round(duration, 2) if duration else None,
+        "sample_rate": sample_rate,
+        "bitrate_kbps": round(audio_bytes * 8 / duration / 1000) if duration else None
+    })
+    if resyncs > 1 or audio_bytes < 0.9 * audio_region:
+        result["decode_error"] = f"Flux MPEG corrompu ({resyncs} perte(s) de synchronisation, {audio_bytes * 100 // audio_region}% de trames valides)"
+    else:
+        result["decode_ok"] = True
+    return result
+
+
+def _scan_mp3_stats(directory: str) -> dict:
+    """{nom: (taille, date de modification)} des .mp3 du dossier, en un seul passage."""
+    stats = {}
+    for e in os.scandir(directory):
+        if e.is_file() and e.name.lower().endswith('.mp3'):
+            st = e.stat()
+            stats[e.name] = (st.st_size, st.st_mtime)
+    return stats
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+# --- Catalogue ---
+
+class SoundCatalog:
+    """Catalogue des MP3 de source_dir, enregistré dans catalog_path (disque local)."""
+
+    def __init__(self, source_dir: str, catalog_path: str, logger: logging.Logger, mirror_dir: str = None,
+                 ring_cache_dir: str = None, on_change=None, share_io=None):
+        """
+        Args:
+            source_dir: Dossier MP3 de référence (MP3_PATH).
+            catalog_path: Fichier JSON du catalogue (sur le disque local).
+            logger: Instance du logger.
+            mirror_dir: Miroir local des MP3 (voir mp3_mirror.py). Un fichier y est analysé
+                        à la place du partage si sa taille et sa date correspondent.
+            ring_cache_dir: Dossier local des copies WAV prêtes à sonner ('<sha1>.wav').
+            on_change: Fonction appelée (sans argument) quand le catalogue change.
+            share_io: ShareIO (voir share_io.py) par lequel passent les accès à source_dir
+                      (délai borné) ; None: accès directs (dossier local).
+        """
+        self.source_dir = source_dir
+        self.catalog_path = catalog_path
+        self.logger = logger
+        self.mirror_dir = mirror_dir
+        self.ring_cache_dir = ring_cache_dir
+        self._on_change = on_change
+        self._share_io = share_io
+
+        self._lock = threading.Lock() # Protège _entries
+        self._scan_lock = threading.Lock() # Un seul scan à la fois
+        self._entries = {} # nom -> {"size", "mtime", "sha1", "duration_s", "sample_rate", "bitrate_kbps", "decode_ok", "decode_error", "analyzed_at", "audio"}
+        self._last_scan = None
+        self._load()
+
+    # --- Persistance ---
+
+    def _load(self):
+        try:
+            with open(self.catalog_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            self.logger.warning(f"Catalogue des sons illisible, il sera reconstruit: {e}")
+            return
+        if data.get("version") != CATALOG_VERSION:
+            self.logger.info("Catalogue des sons d'une ancienne version, il sera reconstruit.")
+            return
+        with self._lock:
+            self._entries = {name: entry for name, entry in data.get("files", {}).items() if isinstance(entry, dict)}
+            self._last_scan = data.get("scanned_at")
+        self.logger.info(f"Catalogue des sons chargé ({len(self._entries)} fichiers).")
+
+    def _save(self):
+        with self._lock:
+            data = {"version": CATALOG_VERSION, "scanned_at": self._last_scan, "files": self._entries}
+            os.makedirs(os.path.dirname(self.catalog_path), exist_ok=True)
+            with open(self.catalog_path + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(self.catalog_path + ".tmp", self.catalog_path)
+
+    def _notify(self):
+        if self._on_change:
+            try:
+                self._on_change()
+            except Exception as e:
+                self.logger.error(f"Erreur callback catalogue des sons: {e}", exc_info=True)
+
+    # --- Analyse ---
+
+    def _on_share(self, op: str, func, *args, timeout: float = None):
+        """func(*args) sur le partage, à délai borné si share_io est fourni (ShareTimeoutError, sous-classe d'OSError)."""
+        if self._share_io:
+            return self._share_io.run(op, func, *args, timeout=timeout)
+        return func(*args)
+
+    def _analysis_path(self, name: str, size: int, mtime: float) -> str:
+        """Le fichier du miroir local s'il est identique (taille, date), sinon celui du partage."""
+        if self.mirror_dir:
+            local_path = os.path.join(self.mirror_dir, name)
+            try:
+                st = os.stat(local_path)
+                if st.st_size == size and st.st_mtime == mtime:
+                    return local_path
+            except OSError:
+                pass
+        return os.path.join(self.source_dir, name)
+
+    @staticmethod
+    def _make_entry(size: int, mtime: float, analysis: dict) -> dict:
+        return {"size": size, "mtime": mtime, **analysis, "analyzed_at": datetime.now().isoformat(timespec='seconds')}
+
+    def refresh(self) -> dict:
+        """
+        Rescanne source_dir (os.scandir) et n'analyse que les fichiers nouveaux ou modifiés.
+        Retourne {"added", "updated", "removed", "unchanged"} ou lève OSError si le dossier est
+        inaccessible (ou ne répond pas dans le délai: le catalogue reste alors inchangé).
+        """
+        with self._scan_lock:
+            stats = self._on_share("scan_mp3", _scan_mp3_stats, self.source_dir)
+            with self._lock:
+                known = dict(self._entries)
+
+            added, updated, unchanged = [], [], 0
+            new_entries = {}
+            for name, (size, mtime) in stats.items():
+                entry = known.get(name)
+                if entry and entry.get("size") == size and entry.get("mtime") == mtime:
+                    new_entries[name] = entry
+                    unchanged += 1
+                    continue
+                try:
+                    path = self._analysis_path(name, size, mtime)
+                    if self.mirror_dir and path == os.path.join(self.mirror_dir, name):
+                        data = _read_bytes(path) # Copie identique du miroir local
+                    else:
+                        data = self._on_share("read_mp3", _read_bytes, path, timeout=SHARE_READ_TIMEOUT_SECONDS)
+                    new_entries[name] = self._make_entry(size, mtime, analyze_mp3(io.BytesIO(data)))
+                except OSError as e:
+                    self.logger.error(f"Catalogue des sons: analyse de '{name}' impossible: {e}")
+                    if entry: new_entries[name] = entry # Garder l'ancienne analyse
+                    continue
+                (updated if entry else added).append(name)
+                if not new_entries[name]["decode_ok"]:
+                    self.logger.warning(f"Catalogue des sons: '{name}' illisible: {new_entries[name]['decode_error']}")
+            removed = [name for name in known if name not in stats]
+
+            with self._lock:
+                self._entries = new_entries
+                self._last_scan = datetime.now().isoformat(timespec='seconds')
+            changed = bool(added or updated or removed)
+            if changed:
+                try:
+                    self._save()
+                except OSError as e:
+                    self.logger.error(f"Catalogue des sons: échec sauvegarde: {e}")
+                self._prune_ring_cache()
+            self.logger.info(f"Catalogue des sons: {len(added)} ajouté(s), {len(updated)} réanalysé(s), {len(removed)} retiré(s), {unchanged} inchangé(s).")
+        if changed:
+            self._notify()
+        return {"added": added, "updated": updated, "removed": removed, "unchanged": unchanged}
+
+    def add_file(self, name: str, analysis: dict):
+        """Enregistre un fichier qui vient d'être écrit dans source_dir (analyse faite avant l'écriture)."""
+        st = self._on_share("stat", os.stat, os.path.join(self.source_dir, name))
+        with self._lock:
+            self._entries[name] = self._make_entry(st.st_size, st.st_mtime, analysis)
+        self._save()
+        self._notify()
+
+    def pending_audio_analysis(self) -> list:
+        """Fichiers sans mesure audio (voir audio_analysis.py): [(nom, chemin à analyser, sha1)]."""
+        with self._lock:
+            # Contenu déjà mesuré sous un autre nom (copie): mesure réutilisée
+            known_audio = {entry["sha1"]: entry["audio"] for entry in self._entries.values() if "audio" in entry}
+            pending = []
+            for name, entry in self._entries.items():
+                if not entry.get("decode_ok") or ("audio" in entry and not self._ring_ready_missing(entry)):
+                    continue
+                if entry["sha1"] in known_audio and not self._ring_ready_missing({**entry, "audio": known_audio[entry["sha1"]]}):
+                    entry["audio"] = known_audio[entry["sha1"]]
+                else:
+                    pending.append((name, entry["size"], entry["mtime"], entry["sha1"]))
+        return [(name, self._analysis_path(name, size, mtime), sha1) for name, size, mtime, sha1 in pending]
+
+    # --- Copies prêtes à sonner ---
+
+    def ring_ready_path(self, sha1: str):
+        """Chemin de la copie WAV d'un contenu (None si le cache est désactivé)."""
+        return os.path.join(self.ring_cache_dir, f"{sha1}.wav") if self.ring_cache_dir else None
+
+    def _ring_ready_missing(self, entry: dict) -> bool:
+        """True si la copie WAV attendue pour cette entrée (analyse réussie) n'est pas sur le disque."""
+        audio = entry.get("audio") or {}
+        if not self.ring_cache_dir or not audio.get("decode_ok"):
+            return False
+        return audio.get("ring_ready") is not False and not os.path.isfile(self.ring_ready_path(entry["sha1"]))
+
+    def get_ring_ready_path(self, name: str):
+        """Copie WAV prête à sonner du fichier si elle existe, sinon None (lire le MP3)."""
+        with self._lock:
+            entry = self._entries.get(name)
+            sha1 = entry.get("sha1") if entry and (entry.get("audio") or {}).get("ring_ready") else None
+        path = self.ring_ready_path(sha1) if sha1 else None
+        return path if path and os.path.isfile(path) else None
+
+    def _prune_ring_cache(self):
+        """Supprime les copies WAV dont le contenu n'est plus dans le catalogue."""
+        if not self.ring_cache_dir or not os.path.isdir(self.ring_cache_dir):
+            return
+        with self._lock:
+            wanted = {f"{entry['sha1']}.wav" for entry in self._entries.values() if entry.get("sha1")}
+        for entry in os.scandir(self.ring_cache_dir):
+            if entry.is_file() and entry.name not in wanted:
+                try:
+                    os.remove(entry.path)
+                    self.logger.info(f"Cache prêt à sonner: '{entry.name}' supprimé (contenu retiré ou modifié).")
+                except OSError as e:
+                    self.logger.warning(f"Cache prêt à sonner: impossible de supprimer '{entry.name}': {e}")
+
+    def set_audio_analysis(self, name: str, sha1: str, audio: dict):
+        """Enregistre la mesure audio d'un fichier (ignorée si son contenu a changé entre-temps)."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if not entry or entry.get("sha1") != sha1:
+                return
+            entry["audio"] = audio
+        try:
+            self._save()
+        except OSError as e:
+            self.logger.error(f"Catalogue des sons: échec sauvegarde: {e}")
+        self._notify()
+
+    def remove_file(self, name: str):
+        """Retire un fichier supprimé de source_dir."""
+        with self._lock:
+            removed = self._entries.pop(name, None) is not None
+        if removed:
+            self._save()
+            self._prune_ring_cache()
+            self._notify()
+
+    # --- Lecture ---
+
+    def contains(self, name: str) -> bool:
+        with self._lock:
+            return name in self._entries
+
+    def find_by_sha1(self, sha1: str):
+        """Nom d'un fichier du catalogue ayant ce contenu (doublon), sinon None."""
+        with self._lock:
+            return next((name for name, entry in self._entries.items() if entry.get("sha1") == sha1), None)
+
+    def get(self, name: str):
+        with self._lock:
+            entry = self._entries.get(name)
+            return dict(entry) if entry else None
+
+    def list_files(self) -> list:
+        with self._lock:
+            return sorted(self._entries)
+
+    def get_duration(self, name: str):
+        """Durée (s) d'un fichier, ou None s'il est inconnu du catalogue."""
+        with self._lock:
+            entry = self._entries.get(name)
+            return entry.get("duration_s") if entry else None
+
+    def get_summary(self) -> dict:
+        """Infos par fichier pour l'interface (durée, fréquence, décodage, niveaux et avertissements)."""
+        summary = {}
+        with self._lock:
+            for name, entry in self._entries.items():
+                audio = entry.get("audio")
+                info = {key: entry.get(key) for key in ("size", "duration_s", "sample_rate", "bitrate_kbps", "decode_ok", "decode_error")}
+                info.update({
+                    "peak_dbfs": audio.get("peak_dbfs") if audio else None,
+                    "loudness_lufs": audio.get("loudness_lufs") if audio else None,
+                    "audio_analyzed": audio is not None,
+                    "warnings": audio_warnings(entry.get("duration_s"), audio)
+                })
+                if audio and not audio.get("decode_ok"):
+                    info["decode_ok"] = False
+                    info["decode_error"] = audio.get("error")
+                summary[name] = info
+        return summary
+
+    def get_last_scan(self):
+        return self._last_scan
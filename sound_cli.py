@@ -0,0 +1,377 @@
+# sound_cli.py
+"""
+Lecteur de son en ligne de commande (sous-processus lancé par le scheduler et les alertes).
+
+Appelé via 'backend_server.py --play-sound <fichier> [--loop] [--device NOM]...' :
+backend_server.py bascule ici avant d'importer Flask et le reste du serveur, le
+sous-processus ne charge donc que pygame.
+
+Avec plusieurs --device, le son est décodé une fois puis joué simultanément sur
+chaque sortie (voir play_fanout) ; le décalage de démarrage mesuré pour chaque
+sortie est écrit sur une ligne FANOUT_REPORT_PREFIX + JSON.
+"""
+
+# Format du mixer pygame (les copies « prêtes à sonner » du cache sont produites dans ce format, voir audio_analysis.py)
+MIXER_FREQUENCY = 44100
+MIXER_SIZE = -16
+MIXER_CHANNELS = 2
+MIXER_BUFFER = 2048
+
+# Lecture sur plusieurs sorties
+FANOUT_CHUNK_FRAMES = 1024
+FANOUT_START_TIMEOUT_SECONDS = 2 # Délai maximal pour que chaque sortie commence à lire
+MAX_FANOUT_START_SKEW_MS = 100 # Au-delà, la sortie est signalée en retard (son recalé malgré tout)
+FANOUT_REPORT_PREFIX = "[SoundCLI] FANOUT "
+
+
+def _decode_to_pcm(pygame, sound_path: str) -> bytes:
+    """PCM 16 bits au format du mixer: copie WAV prête à sonner lue telle quelle, sinon décodage par pygame."""
+    if sound_path.lower().endswith(".wav"):
+        import wave
+        with wave.open(sound_path, 'rb') as wav:
+            if (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) == (MIXER_FREQUENCY, MIXER_CHANNELS, 2):
+                return wav.readframes(wav.getnframes())
+    pygame.mixer.init(frequency=MIXER_FREQUENCY, size=MIXER_SIZE, channels=MIXER_CHANNELS, allowedchanges=0)
+    try:
+        return pygame.mixer.Sound(sound_path).get_raw()
+    finally:
+        pygame.mixer.quit()
+
+
+def play_fanout(pygame, sound_path: str, device_names: list, loop: bool) -> bool:
+    """
+    Joue le même tampon décodé sur plusieurs sorties audio. Toutes sont ouvertes en
+    pause puis démarrées ensemble ; à son premier appel, chaque sortie saute les
+    échantillons correspondant à son retard sur l'instant de démarrage commun, de
+    sorte que toutes jouent le même échantillon au même moment (au tampon matériel près).
+    Retourne False si aucune sortie n'a pu être ouverte.
+    """
+    import json
+    import time
+    from pygame._sdl2 import sdl2, audio as sdl_audio
+
+    frame_bytes = 2 * MIXER_CHANNELS
+    raw = _decode_to_pcm(pygame, sound_path)
+    pcm = memoryview(raw[:len(raw) - len(raw) % frame_bytes])
+    if not len(pcm):
+        print("[SoundCLI] ERR fan-out: aucun échantillon décodé.")
+        return False
+
+    sdl2.init_subsystem(sdl2.INIT_AUDIO)
+    available = sdl_audio.get_audio_device_names(False)
+    start_time = None
+    outputs = [] # {"name", "device", "pos", "started"}
+    failed = {}
+
+    def make_callback(output):
+        def callback(device, buffer):
+            if output["pos"] is None:
+                output["started"] = time.perf_counter()
+                output["pos"] = int((output["started"] - start_time) * MIXER_FREQUENCY) * frame_bytes
+            size, filled, pos = len(buffer), 0, output["pos"]
+            while filled < size:
+                if pos >= len(pcm):
+                    if not loop:
+                        break
+                    pos %= len(pcm)
+                piece = pcm[pos:pos + size - filled]
+                buffer[filled:filled + len(piece)] = piece
+                filled += len(piece)
+                pos += len(piece)
+            if filled < size:
+                buffer[filled:] = bytes(size - filled) # Fin du son: silence
+            output["pos"] = pos
+        return callback
+
+    for name in dict.fromkeys(device_names): # Sans doublon, ordre conservé
+        match = next((n for n in available if n == name), None) or next((n for n in available if n.startswith(name)), None)
+        if not match:
+            failed[name] = "sortie introuvable"
+            continue
+        output = {"name": match, "pos": None, "started": None}
+        try:
+            output["device"] = sdl_audio.AudioDevice(devicename=match, iscapture=False, frequency=MIXER_FREQUENCY,
+                                                     audioformat=sdl_audio.AUDIO_S16, numchannels=MIXER_CHANNELS,
+                                                     chunksize=FANOUT_CHUNK_FRAMES, allowed_changes=0,
+                                                     callback=make_callback(output))
+            outputs.append(output)
+        except pygame.error as e:
+            failed[name] = str(e)
+    for name, error in failed.items():
+        print(f"[SoundCLI] ERR fan-out: sortie '{name}' non ouverte: {error}")
+    if not outputs:
+        return False
+
+    print(f"[SoundCLI] Fan-out: lecture sur {len(outputs)} sortie(s): {[o['name'] for o in outputs]}")
+    start_time = time.perf_counter()
+    for output in outputs:
+        output["device"].pause(0)
+    try:
+        deadline = start_time + FANOUT_START_TIMEOUT_SECONDS
+        while any(o["started"] is None for o in outputs) and time.perf_counter() < deadline:
+            time.sleep(0.005)
+        started = [o["started"] for o in outputs if o["started"] is not None]
+        first = min(started) if started else start_time
+        report = {"devices": [], "failed": failed}
+        for output in outputs:
+            skew_ms = round((output["started"] - first) * 1000, 1) if output["started"] is not None else None
+            report["devices"].append({"name": output["name"], "start_skew_ms": skew_ms,
+                                      "late": skew_ms is None or skew_ms > MAX_FANOUT_START_SKEW_MS})
+        report["max_start_skew_ms"] = max((d["start_skew_ms"] for d in report["devices"] if d["start_skew_ms"] is not None), default=None)
+        print(FANOUT_REPORT_PREFIX + json.dumps(report, ensure_ascii=False), flush=True)
+
+        while loop or any(o["pos"] is None or o["pos"] < len(pcm) for o in outputs if o["started"] is not None):
+            time.sleep(0.05)
+        time.sleep(FANOUT_CHUNK_FRAMES / MIXER_FREQUENCY) # Laisser sortir le dernier tampon
+    finally:
+        for output in outputs:
+            output["device"].close()
+    print("[SoundCLI] Fan-out: lecture terminée.")
+    return True
+
+
+def run_sound_cli():
+    import os
+    # SDL_AUDIODRIVER n'est PAS défini ici pour ce test.
+
+    import pygame
+    import time
+    import argparse
+    import traceback
+    import sys # Nécessaire pour sys.argv et sys.exit
+
+    # --- Argument Parsing ---
+    parser = argparse.ArgumentParser(description="CLI for playing sounds with Pygame")
+    parser.add_argument("sound_file", help="Path to the sound file")
+    parser.add_argument("--loop", action='store_true', help="Loop the sound continuously")
+    parser.add_argument("--device", action='append', help="Name of the audio output device for Pygame (repeat to play on several devices)")
+
+    # Log initial pour voir les arguments bruts passés au script
+    raw_args_for_log = sys.argv[2:] # sys.argv[0] is script name, sys.argv[1] is '--play-sound'
+    # print(f"[SoundCLI] Raw CLI arguments: {raw_args_for_log}") # Optionnel, pour débogage avancé
+
+    cli_args = parser.parse_args(raw_args_for_log)
+
+    sound_path = cli_args.sound_file
+    loop_flag = cli_args.loop
+    loops = -1 if loop_flag else 0
+    device_names = cli_args.device or []
+    device_name_arg = device_names[0] if device_names else None
+
+    # Log initial amélioré
+    print(f"[SoundCLI] PID:{os.getpid()} Play:'{os.path.basename(sound_path)}' Loop:{loop_flag} Device Requested:'{', '.join(device_names) if device_names else 'Default'}'")
+
+    if not os.path.isfile(sound_path):
+        print(f"[SoundCLI] ERR: Sound file not found: {sound_path}")
+        sys.exit(1)
+
+    pg_ok = False
+    mix_ok = False # Sera mis à True seulement si pygame.mixer.init() réussit
+    sound = None
+
+    # --- Plusieurs sorties: lecture synchronisée, sinon repli sur le périphérique par défaut ---
+    if len(device_names) > 1:
+        try:
+            if play_fanout(pygame, sound_path, device_names, loop_flag):
+                print("[SoundCLI] Exiting cli_sound process.")
+                sys.exit(0)
+        except pygame.error as fanout_err:
+            print(f"[SoundCLI] ERR Pygame during fan-out: {fanout_err}")
+            traceback.print_exc(file=sys.stderr)
+        print("[SoundCLI] Fan-out impossible. Falling back to the default device.")
+        device_name_arg = None
+
+    # --- pre_init ---
+    try:
+        if device_name_arg:
+            print(f"[SoundCLI] Attempting to pre-initialize mixer with device: '{device_name_arg}'")
+            pygame.mixer.pre_init(devicename=device_name_arg, frequency=MIXER_FREQUENCY, size=MIXER_SIZE, channels=MIXER_CHANNELS, buffer=MIXER_BUFFER)
+            print(f"[SoundCLI] Mixer pre_init called for device: '{device_name_arg}'")
+        else:
+            print("[SoundCLI] No specific audio device for pre_init. Calling pre_init with default audio parameters.")
+            pygame.mixer.pre_init(frequency=MIXER_FREQUENCY, size=MIXER_SIZE, channels=MIXER_CHANNELS, buffer=MIXER_BUFFER)
+            print("[SoundCLI] Mixer pre_init called with default audio parameters.")
+    except pygame.error as pre_init_err:
+        # Si pre_init échoue (par exemple, format audio non supporté par le device même en pre_init)
+        # Ce n'est pas toujours fatal pour init() qui pourrait avoir d'autres mécanismes.
+        print(f"[SoundCLI] WARNING Pygame during pre_init: {pre_init_err}. Will proceed to full init.")
+
+
+    # --- Main Initialization Block ---
+    try:
+        print("[SoundCLI] Init Pygame module..."); pygame.init(); pg_ok = True
+
+        # Tentative d'initialisation du mixer
+        if device_name_arg:
+            print(f"[SoundCLI] Attempting to initialize mixer with device: '{device_name_arg}'")
+            try:
+                pygame.mixer.init(devicename=device_name_arg, frequency=MIXER_FREQUENCY, size=MIXER_SIZE, channels=MIXER_CHANNELS, buffer=MIXER_BUFFER)
+                mix_ok = True
+                print(f"[SoundCLI] Mixer initialized successfully with device: '{device_name_arg}'")
+            except pygame.error as pg_err_device:
+                print(f"[SoundCLI] ERR Pygame: Failed to initialize mixer with device '{device_name_arg}'. Error: {pg_err_device}")
+                print("[SoundCLI] Attempting to initialize mixer with default device as fallback...")
+                try:
+                    pygame.mixer.init(frequency=MIXER_FREQUENCY, size=MIXER_SIZE, channels=MIXER_CHANNELS, buffer=MIXER_BUFFER)
+                    mix_ok = True
+                    print("[SoundCLI] Mixer initialized successfully with default device (fallback).")
+                except pygame.error as pg_err_default_fallback:
+                    print(f"[SoundCLI] ERR Pygame: Failed to initialize mixer with default device (fallback). Error: {pg_err_default_fallback}")
+                    # Laisser l'erreur se propager au bloc except extérieur principal pour ce script.
+                    raise pg_err_default_fallback # Relancer pour être attrapé par le bloc pg_err général
+        else:
+            print("[SoundCLI] No specific audio device requested. Initializing mixer with default device...")
+            try:
+                pygame.mixer.init(frequency=MIXER_FREQUENCY, size=MIXER_SIZE, channels=MIXER_CHANNELS, buffer=MIXER_BUFFER)
+                mix_ok = True
+                print("[SoundCLI] Mixer initialized successfully with default device.")
+            except pygame.error as pg_err_default:
+                print(f"[SoundCLI] ERR Pygame: Failed to initialize mixer with default device. Error: {pg_err_default}")
+                raise pg_err_default # Relancer pour être attrapé
+
+        if not mix_ok: # Si aucune tentative d'initialisation du mixer n'a réussi
+            # Ce cas ne devrait pas être atteint si les exceptions ci-dessus sont bien relancées et attrapées par le bloc pg_err général.
+            # Mais par sécurité :
+            print("[SoundCLI] CRITICAL: Mixer could not be initialized. Sound playback aborted.")
+            raise pygame.error("Mixer initialization failed after all attempts.")
+
+
+        # --- Load and Play Sound ---
+        print(f"[SoundCLI] Loading sound: '{sound_path}'")
+        try:
+            sound = pygame.mixer.Sound(sound_path)
+            print(f"[SoundCLI] Sound loaded successfully: '{os.path.basename(sound_path)}'")
+        except pygame.error as load_err:
+            print(f"[SoundCLI] ERR Pygame during sound load: {load_err}")
+            raise load_err # Relancer pour être attrapé
+
+        print(f"[SoundCLI] Playing sound (loops={loops})...")
+        channel = sound.play(loops=loops)
+        if channel is None:
+            mixer_err_msg = pygame.mixer.get_error() # Obtenir l'erreur spécifique du mixer si disponible
+            print(f"[SoundCLI] ERR: Failed to play sound. play() returned None. Mixer error: '{mixer_err_msg if mixer_err_msg else 'Unknown'}'")
+            # Pas besoin de 'raise' ici, car l'absence de channel est une condition d'erreur que nous gérons.
+            # Le script va quand même se terminer proprement via le bloc finally.
+        else:
+            print(f"[SoundCLI] Sound playing on channel: {channel}. Waiting for playback to finish...")
+            while channel.get_busy(): # pygame.mixer.get_busy() n'est pas suffisant, il faut vérifier le channel spécifique.
+                time.sleep(0.1)
+            print("[SoundCLI] Sound playback finished.")
+
+    except pygame.error as pg_err: # Attrape les erreurs Pygame relancées (init, load) ou nouvelles
+        print(f"[SoundCLI] ERR Pygame (General): {pg_err}")
+        traceback.print_exc(file=sys.stderr) # Imprimer la trace sur stderr
+    except Exception as e: # Attrape toutes les autres exceptions
+        print(f"[SoundCLI] ERR Unexpected: {e}")
+        traceback.print_exc(file=sys.stderr)
+    finally:
+        # --- Cleanup ---
+        # Quitter le mixer seulement s'il a été initialisé (mix_ok est True) ET s'il est toujours initialisé
+        if mix_ok and pygame.mixer.get_init():
+            print("[SoundCLI] Quitting mixer...")
+            pygame.mixer.quit()
+        # Quitter Pygame seulement s'il a été initialisé (pg_ok est True) ET s'il est toujours initialisé
+        if pg_ok and pygame.get_init():
+            print("[SoundCLI] Quitting Pygame module...")
+            pygame.quit()
+        print("[SoundCLI] Exiting cli_sound process.")
+        # Toujours sortir avec 0 pour ne pas causer de panique au scheduler,
+        # les erreurs sont logguées et visibles.
+        sys.exit(0)
+
+
+# --- Lecteur persistant des alertes ('backend_server.py --player-server', voir alert_manager.py) ---
+
+PLAYER_POLL_SECONDS = 0.01 # Réactivité aux commandes (arrêt) et détection de fin de lecture
+
+
+def run_player_server():
+    """
+    Lecteur permanent piloté par des commandes JSON (une par ligne) sur stdin :
+      {"cmd": "play", "id": n, "path": ..., "loop": bool, "device": nom ou null}
+      {"cmd": "stop"}   {"cmd": "quit"}
+    et qui répond par des événements JSON sur stdout : started / finished / stopped / error.
+    pygame reste chargé entre deux alertes ; le périphérique n'est ouvert que pendant une
+    lecture (les sonneries du scheduler peuvent l'utiliser le reste du temps). Un arrêt
+    coupe le son au tour de boucle suivant, sans attendre la fin d'un processus.
+    """
+    import os
+    import sys
+    import json
+    import queue
+    import threading
+    os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    import pygame
+
+    commands = queue.Queue()
+
+    def read_commands():
+        for line in sys.stdin:
+            line = line.strip()
+            if line:
+                commands.put(line)
+        commands.put('{"cmd": "quit"}') # stdin fermé: le serveur s'est arrêté
+
+    def emit(event, **details):
+        sys.stdout.write(json.dumps({"event": event, **details}, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+    current = {"id": None, "channel": None, "sound": None}
+
+    def close_mixer():
+        if pygame.mixer.get_init():
+            pygame.mixer.quit()
+        current.update(id=None, channel=None, sound=None)
+
+    def stop_playback(event="stopped"):
+        if current["channel"] is not None:
+            current["channel"].stop()
+            emit(event, id=current["id"])
+        close_mixer()
+
+    def play(command):
+        stop_playback()
+        device = command.get("device")
+        try:
+            try:
+                pygame.mixer.init(devicename=device, frequency=MIXER_FREQUENCY, size=MIXER_SIZE, channels=MIXER_CHANNELS, buffer=MIXER_BUFFER)
+            except pygame.error:
+                if not device:
+                    raise
+                pygame.mixer.init(frequency=MIXER_FREQUENCY, size=MIXER_SIZE, channels=MIXER_CHANNELS, buffer=MIXER_BUFFER) # Repli: périphérique par défaut
+            sound = pygame.mixer.Sound(command["path"])
+            channel = sound.play(loops=-1 if command.get("loop") else 0)
+            if channel is None:
+                raise pygame.error(pygame.get_error() or "play() a retourné None")
+        except (pygame.error, OSError, KeyError) as e:
+            close_mixer()
+            emit("error", id=command.get("id"), error=str(e))
+            return
+        current.update(id=command.get("id"), channel=channel, sound=sound)
+        emit("started", id=current["id"])
+
+    threading.Thread(target=read_commands, name="PlayerCommands", daemon=True).start()
+    emit("ready", pid=os.getpid())
+    while True:
+        try:
+            command = json.loads(commands.get(timeout=PLAYER_POLL_SECONDS))
+        except queue.Empty:
+            if current["channel"] is not None and not current["channel"].get_busy():
+                stop_playback(event="finished")
+            continue
+        except ValueError as e:
+            emit("error", id=None, error=f"Commande invalide: {e}")
+            continue
+        action = command.get("cmd")
+        if action == "play":
+            play(command)
+        elif action == "stop":
+            stop_playback()
+        elif action == "quit":
+            stop_playback()
+            break
+        else:
+            emit("error", id=command.get("id"), error=f"Commande inconnue: {action}")
+    if pygame.get_init():
+        pygame.quit()
+    sys.exit(0)
@@ -0,0 +1,130 @@
+# startup_profiler.py
+"""
+Profilage du démarrage du backend (option 'backend_server.py --profile-startup').
+
+Mesure la durée de chaque phase (imports, détermination des chemins, chargement de
+chaque fichier de config, fériés/vacances, démarrage du scheduler, première requête)
+et écrit un rapport JSON. Les imports sont détaillés module par module, à la manière
+de 'python -X importtime' (durée propre et cumulée, imbrication).
+"""
+import os
+import sys
+import json
+import time
+import builtins
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class ImportTimer:
+    """Chronomètre les imports de modules pas encore chargés (remplace temporairement builtins.__import__)."""
+
+    def __init__(self):
+        self._original_import = None
+        self._stack = [] # Imports en cours: [{"module", "started", "children_ms", "depth"}]
+        self.records = [] # Dans l'ordre de fin, comme -X importtime
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level != 0 or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        entry = {"module": name, "started": time.perf_counter(), "children_ms": 0.0, "depth": len(self._stack)}
+        self._stack.append(entry)
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._stack.pop()
+            cumulative_ms = (time.perf_counter() - entry["started"]) * 1000
+            if self._stack:
+                self._stack[-1]["children_ms"] += cumulative_ms
+            self.records.append({
+                "module": name,
+                "depth": entry["depth"],
+                "self_ms": round(cumulative_ms - entry["children_ms"], 2),
+                "cumulative_ms": round(cumulative_ms, 2)
+            })
+
+    def start(self):
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._timed_import
+
+    def stop(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+
+class StartupProfiler:
+    """Enregistre les phases (imbriquées) et les jalons du démarrage, puis écrit le rapport JSON."""
+
+    def __init__(self, report_path=None):
+        self.report_path = report_path
+        self._t0 = time.perf_counter()
+        self._started_at = datetime.now()
+        self._lock = threading.Lock()
+        self._phase_stack = []
+        self.phases = [] # {"name", "parent", "start_ms", "duration_ms", ...détails}
+        self.milestones = {} # nom -> ms depuis le début
+        self.import_timer = ImportTimer()
+
+    def _elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self._t0) * 1000, 2)
+
+    @contextmanager
+    def phase(self, name: str, **details):
+        """Mesure un bloc: with profiler.phase("config:users"): ..."""
+        record = {"name": name, "parent": self._phase_stack[-1]["name"] if self._phase_stack else None,
+                  "start_ms": self._elapsed_ms(), "duration_ms": None, **details}
+        self._phase_stack.append(record)
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            self._phase_stack.pop()
+            with self._lock:
+                self.phases.append(record)
+
+    def add_phase(self, name: str, duration_seconds: float, **details):
+        """Ajoute une phase mesurée ailleurs (ex: sondage des chemins dans constants.py)."""
+        with self._lock:
+            self.phases.append({"name": name, "parent": None, "start_ms": None,
+                                "duration_ms": round(duration_seconds * 1000, 2), **details})
+
+    def mark(self, name: str) -> bool:
+        """Enregistre un jalon (une seule fois). Retourne True si c'est la première fois."""
+        with self._lock:
+            if name in self.milestones:
+                return False
+            self.milestones[name] = self._elapsed_ms()
+            return True
+
+    def build_report(self, top_imports: int = 25) -> dict:
+        with self._lock:
+            imports = list(self.import_timer.records)
+            return {
+                "started_at": self._started_at.isoformat(timespec='seconds'),
+                "python": sys.version.split()[0],
+                "pid": os.getpid(),
+                "total_ms": self._elapsed_ms(),
+                "milestones": dict(self.milestones),
+                "phases": sorted(self.phases, key=lambda p: (p["start_ms"] is not None, p["start_ms"] or 0)),
+                "imports": {
+                    "count": len(imports),
+                    "top_cumulative": sorted((r for r in imports if r["depth"] == 0),
+                                             key=lambda r: r["cumulative_ms"], reverse=True)[:top_imports],
+                    "top_self": sorted(imports, key=lambda r: r["self_ms"], reverse=True)[:top_imports],
+                    "all": imports
+                }
+            }
+
+    def write_report(self, path=None) -> str:
+        """Écrit le rapport JSON (fichier temporaire puis remplacement) et retourne son chemin."""
+        path = path or self.report_path
+        report = self.build_report()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+        return path
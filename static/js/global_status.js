@@ -1,6 +1,9 @@
 // static/js/global_status.js
 
 let globalStatusRefreshIntervalMs = 15000; // Valeur par défaut (15 secondes)
+let globalStatusPollingTimer = null; // setInterval du polling (secours si le flux SSE est indisponible)
+let globalStatusEventSource = null; // Flux SSE /api/status/stream
+const GLOBAL_STATUS_SSE_RETRY_MS = 60000; // Délai avant de retenter le flux SSE après un échec
 
 // Fonction pour mettre à jour l'UI du statut global
 function updateGlobalStatusUI(data) {
@@ -83,6 +86,46 @@ function updateGlobalStatusUI(data) {
         }
     }
 
+    // Miroir local des MP3 : fraîcheur de la dernière synchro et fichiers manquants
+    const mp3MirrorSpan = document.getElementById('global-mp3-mirror');
+    if (mp3MirrorSpan) {
+        const mirror = data.mp3_mirror;
+        mp3MirrorSpan.title = '';
+        if (!mirror) {
+            mp3MirrorSpan.textContent = 'N/A';
+            mp3MirrorSpan.className = 'status-unknown';
+        } else if (mirror.missing && mirror.missing.length > 0) {
+            mp3MirrorSpan.textContent = `${mirror.missing.length} manquant(s)`;
+            mp3MirrorSpan.title = 'Fichiers absents du cache local : ' + mirror.missing.join(', ');
+            mp3MirrorSpan.className = 'status-error';
+        } else if (!mirror.last_success) {
+            mp3MirrorSpan.textContent = mirror.error ? 'Erreur' : 'Synchro...';
+            mp3MirrorSpan.title = mirror.error || '';
+            mp3MirrorSpan.className = mirror.error ? 'status-error' : 'status-unknown';
+        } else {
+            const syncDate = new Date(mirror.last_success);
+            mp3MirrorSpan.textContent = `À jour (${syncDate.toLocaleTimeString('fr-FR', { hour: '2-digit', minute: '2-digit' })})`;
+            mp3MirrorSpan.title = mirror.error ? `Dernière synchro incomplète : ${mirror.error}` : '';
+            mp3MirrorSpan.className = mirror.error ? 'status-inactive' : 'status-ok';
+        }
+    }
+
+    // Partage réseau : réactivité des accès fichiers (p95) et délais dépassés
+    const shareHealthSpan = document.getElementById('global-share-health');
+    if (shareHealthSpan) {
+        const share = data.share;
+        if (!share) {
+            shareHealthSpan.textContent = 'N/A';
+            shareHealthSpan.className = 'status-unknown';
+            shareHealthSpan.title = '';
+        } else {
+            const p95 = (share.p95_ms === null || share.p95_ms === undefined) ? '-' : `${share.p95_ms} ms`;
+            shareHealthSpan.textContent = share.healthy ? `OK (p95 ${p95})` : 'Lent/Injoignable';
+            shareHealthSpan.title = `p95: ${p95}, délais dépassés: ${share.timeouts}`;
+            shareHealthSpan.className = share.healthy ? 'status-ok' : 'status-error';
+        }
+    }
+
     const lastErrorSpan = document.getElementById('global-last-error');
     if (lastErrorSpan) {
         const errorText = data.last_error || 'Aucune';
@@ -106,6 +149,7 @@ function fetchGlobalStatus() {
         .then(data => {
             if (data) {
                 updateGlobalStatusUI(data);
+                dispatchStatusEvent(data);
             } else if (data === null) { // Cas du 401
                  // Ne rien faire de spécial, la redirection login devrait gérer.
                  // On pourrait mettre un statut "Non connecté" si souhaité, mais attention aux boucles.
@@ -120,6 +164,65 @@ function fetchGlobalStatus() {
         });
 }
 
+// Prévient les scripts de page (ex: control.html) qu'un nouveau statut est disponible
+function dispatchStatusEvent(data) {
+    document.dispatchEvent(new CustomEvent('sonnerie:status', { detail: data }));
+}
+
+// --- Rafraîchissement du statut: flux SSE en priorité, polling en secours ---
+
+function startStatusPolling() {
+    if (globalStatusPollingTimer !== null) return;
+    globalStatusPollingTimer = setInterval(fetchGlobalStatus, globalStatusRefreshIntervalMs);
+    console.log(`Statut global rafraîchi par polling toutes les ${globalStatusRefreshIntervalMs / 1000} secondes.`);
+}
+
+function stopStatusPolling() {
+    if (globalStatusPollingTimer === null) return;
+    clearInterval(globalStatusPollingTimer);
+    globalStatusPollingTimer = null;
+}
+
+function startStatusStream() {
+    if (typeof EventSource === 'undefined') {
+        console.warn("EventSource non supporté par ce navigateur, utilisation du polling.");
+        startStatusPolling();
+        return;
+    }
+    if (globalStatusEventSource !== null) return;
+
+    const source = new EventSource('/api/status/stream');
+    globalStatusEventSource = source;
+
+    source.addEventListener('open', function() {
+        console.log("Flux SSE statut connecté, polling suspendu.");
+        stopStatusPolling();
+    });
+
+    source.addEventListener('status', function(event) {
+        try {
+            const data = JSON.parse(event.data);
+            updateGlobalStatusUI(data);
+            dispatchStatusEvent(data);
+        } catch (e) {
+            console.error("Erreur lecture événement SSE statut:", e, event.data);
+        }
+    });
+
+    source.addEventListener('error', function() {
+        // EventSource se reconnecte seul tant que l'état n'est pas CLOSED (ex: fin de durée max du flux).
+        if (source.readyState === EventSource.CLOSED) {
+            console.warn(`Flux SSE statut fermé (serveur saturé ou indisponible), polling en secours. Nouvel essai dans ${GLOBAL_STATUS_SSE_RETRY_MS / 1000}s.`);
+            globalStatusEventSource = null;
+            startStatusPolling();
+            setTimeout(startStatusStream, GLOBAL_STATUS_SSE_RETRY_MS);
+        } else {
+            // Reconnexion en cours: le polling assure l'affichage en attendant
+            startStatusPolling();
+        }
+    });
+}
+
 // Initialisation au chargement du DOM
 document.addEventListener('DOMContentLoaded', function() {
     const refreshButton = document.getElementById('refresh-status-btn');
@@ -155,16 +258,15 @@ document.addEventListener('DOMContentLoaded', function() {
                     console.warn(`Intervalle de rafraîchissement invalide ou non fourni par /api/config/settings. Utilisation de la valeur par défaut: ${globalStatusRefreshIntervalMs}ms`);
                 }
 
-                // Lancer le premier fetch et le setInterval avec l'intervalle (mis à jour ou par défaut)
+                // Lancer le premier fetch puis le flux SSE (le polling ne sert qu'en secours)
                 fetchGlobalStatus(); // Charger le statut une première fois
-                setInterval(fetchGlobalStatus, globalStatusRefreshIntervalMs);
-                console.log(`Statut global sera rafraîchi toutes les ${globalStatusRefreshIntervalMs / 1000} secondes.`);
+                startStatusStream();
             })
             .catch(error => {
                 console.error("Erreur critique lors de la récupération de /api/config/settings:", error);
                 // En cas d'erreur critique (ex: réseau), on lance quand même avec l'intervalle par défaut
                 fetchGlobalStatus();
-                setInterval(fetchGlobalStatus, globalStatusRefreshIntervalMs);
+                startStatusStream();
                 console.warn(`Utilisation de l'intervalle de rafraîchissement par défaut (${globalStatusRefreshIntervalMs}ms) suite à une erreur de fetch config.`);
             });
     } else {
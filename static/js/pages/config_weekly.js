@@ -0,0 +1,151 @@
+// static/js/pages/config_weekly.js
+// Script de la page config_weekly.html (servi en fichier versionné, voir static_assets.py)
+// Valeurs injectées par le template (permissions...) : déclarées dans la page avant ce script.
+
+// --------------------------------------------------
+// 1. Variables Globales
+// --------------------------------------------------
+const daysOfWeek = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"];
+
+// --------------------------------------------------
+// 2. Fonctions Utilitaires
+// --------------------------------------------------
+function showWeeklyFeedback(message, type = 'info', duration = 4000) {
+    const feedbackDiv = document.getElementById('weekly-feedback');
+    if (!feedbackDiv) return;
+    feedbackDiv.textContent = message;
+    feedbackDiv.className = 'feedback-message';
+    feedbackDiv.classList.add(type, 'show');
+    feedbackDiv.style.display = 'block';
+    setTimeout(() => {
+        feedbackDiv.classList.remove('show');
+        setTimeout(() => { if (!feedbackDiv.classList.contains('show')) feedbackDiv.style.display = 'none'; }, 500);
+    }, duration);
+}
+
+// --------------------------------------------------
+// 3. Fonctions liées aux Actions Utilisateur
+// --------------------------------------------------
+function saveWeeklySchedule() {
+    const newPlanning = {};
+    let isValid = true;
+
+    daysOfWeek.forEach(day => {
+        const selectElement = document.getElementById(`select-${day.toLowerCase()}`);
+        if (selectElement) {
+            newPlanning[day] = selectElement.value;
+        } else {
+            console.error(`Impossible de trouver le select pour le jour ${day}`);
+            isValid = false;
+        }
+    });
+
+    if (!isValid) {
+        showWeeklyFeedback("Erreur interne: Impossible de lire la configuration de tous les jours.", "error");
+        return;
+    }
+
+    console.log("Sauvegarde planning hebdo:", newPlanning);
+    showWeeklyFeedback("Sauvegarde en cours...", 'info', 1500);
+
+    fetch('/api/config/weekly_schedule', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ weekly_planning: newPlanning })
+    })
+    .then(response => response.json().then(data => ({ ok: response.ok, status: response.status, data })))
+    .then(({ ok, status, data }) => {
+        if (ok) {
+            showWeeklyFeedback(data.message || "Planning hebdomadaire sauvegardé !", 'success');
+            if (confirm("Planning sauvegardé. Voulez-vous demander au serveur de recharger sa configuration maintenant ?")) {
+                fetch('/api/config/reload', { method: 'POST' })
+                    .then(reloadResponse => reloadResponse.json().then(reloadData => ({reloadOk: reloadResponse.ok, reloadData})))
+                    .then(({reloadOk, reloadData}) => {
+                         showWeeklyFeedback(reloadData.message || "Rechargement demandé.", reloadOk ? 'info' : 'error', 5000);
+                    })
+                    .catch(err => showWeeklyFeedback("Erreur demande rechargement: " + err, 'error'));
+            }
+        } else {
+            throw new Error(data.error || data.message || `Erreur serveur ${status}`);
+        }
+    })
+    .catch(error => {
+        console.error("Erreur sauvegarde planning hebdo:", error);
+        showWeeklyFeedback(`Erreur sauvegarde: ${error.message}`, 'error');
+    });
+}
+
+// --------------------------------------------------
+// 4. Fonctions d'Initialisation
+// --------------------------------------------------
+function loadAndPopulateWeeklySchedule() {
+    console.log("Appel API GET /api/config/weekly_schedule");
+    const formDiv = document.getElementById('weekly-schedule-form');
+    if (!formDiv) {
+        console.error("Élément #weekly-schedule-form introuvable !");
+        return;
+    }
+    formDiv.innerHTML = '<p>Chargement du planning...</p>';
+
+    fetch('/api/config/weekly_schedule')
+        .then(response => {
+            if (!response.ok) {
+                return response.json().then(errData => {
+                    throw new Error(`Erreur HTTP ${response.status}: ${errData.error || response.statusText}`);
+                }).catch(() => {
+                    throw new Error(`Erreur HTTP ${response.status}: ${response.statusText}`);
+                });
+            }
+            return response.json();
+        })
+        .then(data => {
+            console.log("Données planning hebdo reçues:", data);
+            formDiv.innerHTML = '';
+
+            const availableDayTypes = data.available_day_types || [];
+            const currentPlanning = data.weekly_planning || {};
+            const aucuneValue = "Aucune";
+
+            const optionsHtml = [`<option value="${aucuneValue}">${aucuneValue}</option>`]
+                .concat(availableDayTypes.map(jtName => `<option value="${jtName}">${jtName}</option>`))
+                .join('');
+
+            daysOfWeek.forEach(day => {
+                const label = document.createElement('label');
+                label.htmlFor = `select-${day.toLowerCase()}`;
+                label.textContent = `${day} :`;
+                formDiv.appendChild(label);
+
+                const select = document.createElement('select');
+                select.id = `select-${day.toLowerCase()}`;
+                select.name = `schedule_${day.toLowerCase()}`;
+                select.innerHTML = optionsHtml;
+
+                select.value = currentPlanning[day] || aucuneValue;
+
+                // Désactiver le select si l'utilisateur n'a pas la permission
+                if (!canEditWeeklyPlanning) {
+                    select.disabled = true;
+                }
+
+                formDiv.appendChild(select);
+            });
+
+            showWeeklyFeedback("Planning actuel chargé.", 'info', 2000);
+        })
+        .catch(error => {
+            console.error("Erreur chargement planning hebdo:", error);
+            formDiv.innerHTML = `<p style="color: red;">Erreur lors du chargement du planning : ${error.message}</p>`;
+            showWeeklyFeedback(`Erreur chargement: ${error.message}`, 'error');
+        });
+}
+
+function initPage() {
+    console.log("Initialisation page config hebdomadaire...");
+    loadAndPopulateWeeklySchedule();
+}
+
+// --------------------------------------------------
+// 5. Écouteur d'événement pour lancer l'initialisation
+// --------------------------------------------------
+document.addEventListener('DOMContentLoaded', initPage);
@@ -0,0 +1,120 @@
+# static_assets.py
+"""
+Fichiers statiques versionnés (empreinte du contenu) et précompressés, sans étape de build.
+
+Dans les templates, asset_url('js/pages/control.js') donne
+/static/js/pages/control.js?v=<empreinte> : l'URL change avec le contenu du fichier,
+le navigateur peut donc le garder un an sans le revalider (Cache-Control immutable).
+Une URL sans empreinte, ou d'une version précédente, reste servie mais revalidée
+à chaque chargement (ETag = empreinte).
+
+Au démarrage, prepare() calcule les empreintes et écrit une copie gzip de chaque
+fichier texte dans le cache local, nommée d'après l'empreinte : elle n'est refaite
+que si le fichier change, et elle est envoyée telle quelle aux navigateurs qui
+acceptent gzip (pas de compression à chaque requête). Un fichier modifié pendant
+que l'application tourne est détecté (date et taille) et reçoit une nouvelle empreinte.
+"""
+import os
+import gzip
+import hashlib
+import mimetypes
+import threading
+import logging
+from werkzeug.security import safe_join
+
+ASSET_HASH_LENGTH = 12
+ASSET_MAX_AGE_SECONDS = 365 * 24 * 3600
+PRECOMPRESS_EXTENSIONS = (".js", ".css", ".svg", ".json", ".txt", ".map")
+PRECOMPRESS_MIN_BYTES = 1024 # En dessous, le gain ne compense pas l'en-tête gzip
+PRECOMPRESS_LEVEL = 9 # Fait une fois par version de fichier: compression maximale
+
+
+class StaticAssets:
+    """Empreintes et copies gzip des fichiers du dossier static/."""
+
+    def __init__(self, static_dir: str, gzip_dir: str, logger: logging.Logger):
+        """
+        Args:
+            static_dir: Dossier des fichiers statiques (static/).
+            gzip_dir: Dossier local des copies gzip (ex: cache/static_gz).
+            logger: Instance du logger.
+        """
+        self.static_dir = static_dir
+        self.gzip_dir = gzip_dir
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._entries = {} # nom relatif -> {"path", "mtime", "size", "hash", "mimetype", "gz"}
+
+    def _gzip_path(self, filename: str, digest: str) -> str:
+        return os.path.join(self.gzip_dir, f"{filename}.{digest}.gz")
+
+    def get(self, filename: str):
+        """Description d'un fichier statique (empreinte à jour), None s'il n'existe pas ou sort de static/."""
+        path = safe_join(self.static_dir, filename)
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not os.path.isfile(path):
+            return None
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                return entry
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()[:ASSET_HASH_LENGTH]
+        gz_path = self._gzip_path(filename, digest)
+        entry = {"path": path, "mtime": stat.st_mtime_ns, "size": stat.st_size, "hash": digest,
+                 "mimetype": mimetypes.guess_type(filename)[0] or "application/octet-stream",
+                 "gz": gz_path if os.path.isfile(gz_path) else None}
+        with self._lock:
+            self._entries[filename] = entry
+        return entry
+
+    def url_version(self, filename: str):
+        """Empreinte à mettre dans l'URL (paramètre v), None si le fichier n'existe pas."""
+        entry = self.get(filename)
+        return entry["hash"] if entry else None
+
+    def prepare(self):
+        """Calcule les empreintes de tous les fichiers et écrit les copies gzip manquantes (retire les anciennes)."""
+        written, kept = 0, set()
+        for root, _, files in os.walk(self.static_dir):
+            for name in files:
+                filename = os.path.relpath(os.path.join(root, name), self.static_dir).replace(os.sep, "/")
+                entry = self.get(filename)
+                if not entry or not filename.endswith(PRECOMPRESS_EXTENSIONS) or entry["size"] < PRECOMPRESS_MIN_BYTES:
+                    continue
+                gz_path = self._gzip_path(filename, entry["hash"])
+                kept.add(os.path.normpath(gz_path))
+                if entry["gz"]:
+                    continue
+                try:
+                    os.makedirs(os.path.dirname(gz_path), exist_ok=True)
+                    with open(entry["path"], 'rb') as f:
+                        data = gzip.compress(f.read(), compresslevel=PRECOMPRESS_LEVEL, mtime=0)
+                    with open(gz_path + ".tmp", 'wb') as f:
+                        f.write(data)
+                    os.replace(gz_path + ".tmp", gz_path)
+                    with self._lock:
+                        entry["gz"] = gz_path
+                    written += 1
+                except OSError as e:
+                    self.logger.warning(f"Copie gzip de '{filename}' impossible (fichier servi non compressé): {e}")
+        removed = 0
+        for root, _, files in os.walk(self.gzip_dir):
+            for name in files:
+                path = os.path.normpath(os.path.join(root, name))
+                if path not in kept:
+                    try:
+                        os.remove(path)
+                        removed += 1
+                    except OSError:
+                        pass
+        self.logger.info(f"Fichiers statiques: {len(self._entries)} versionnés, {len(kept)} copies gzip "
+                         f"({written} écrites, {removed} anciennes supprimées).")
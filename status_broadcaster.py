@@ -0,0 +1,114 @@
+# status_broadcaster.py
+"""
+Diffusion en direct du statut (scheduler, prochaine sonnerie, alertes, erreurs,
+version de configuration) vers les navigateurs via Server-Sent Events (SSE).
+"""
+import json
+import hashlib
+import threading
+import time
+import logging
+from types import MappingProxyType
+
+
+class StatusSnapshot:
+    """
+    Statut figé au moment de sa publication, avec son corps JSON et son ETag déjà calculés.
+    Les lecteurs (/api/status, flux SSE) n'ont qu'à renvoyer ces valeurs : aucun calcul,
+    aucun verrou, aucune modification d'état.
+    """
+    __slots__ = ("version", "status", "body", "etag")
+
+    def __init__(self, version: int, status: dict):
+        self.version = version
+        self.status = MappingProxyType(dict(status))
+        self.body = json.dumps(status, ensure_ascii=False, sort_keys=True)
+        self.etag = hashlib.sha1(self.body.encode("utf-8")).hexdigest() # Sans guillemets (format Werkzeug)
+
+
+class StatusBroadcaster:
+    """
+    Conserve le dernier statut publié et réveille les flux SSE en attente.
+
+    Chaque flux SSE occupe un thread Waitress tant qu'il est ouvert. Le nombre de
+    flux simultanés est donc plafonné (max_streams) : le serveur est lancé avec
+    ce nombre de threads EN PLUS des threads réservés aux requêtes classiques.
+    Au-delà du plafond, le client reçoit un 503 et retombe sur le polling.
+    """
+    def __init__(self, logger: logging.Logger, max_streams: int = 16,
+                 keepalive_seconds: int = 15, stream_max_seconds: int = 600):
+        self.logger = logger
+        self.max_streams = max_streams
+        self.keepalive_seconds = keepalive_seconds
+        self.stream_max_seconds = stream_max_seconds # Le navigateur se reconnecte seul (EventSource)
+
+        self._condition = threading.Condition()
+        self._snapshot = StatusSnapshot(0, {})
+        self._active_streams = 0
+        self._closed = False
+
+    def publish(self, status: dict) -> bool:
+        """Publie un nouveau statut. Ne réveille les flux que si le contenu a changé."""
+        with self._condition:
+            if status == self._snapshot.status:
+                return False
+            self._snapshot = StatusSnapshot(self._snapshot.version + 1, status)
+            self._condition.notify_all()
+        self.logger.debug(f"Statut publié (version {self._snapshot.version}) vers {self._active_streams} flux SSE.")
+        return True
+
+    def get_snapshot(self) -> StatusSnapshot:
+        """Retourne le dernier statut publié (objet immuable, lecture sans verrou)."""
+        return self._snapshot
+
+    def get_stream_count(self):
+        return self._active_streams
+
+    def try_acquire_stream(self) -> bool:
+        """Réserve une place de flux SSE. Retourne False si le plafond est atteint."""
+        with self._condition:
+            if self._closed or self._active_streams >= self.max_streams:
+                return False
+            self._active_streams += 1
+            return True
+
+    def release_stream(self):
+        with self._condition:
+            self._active_streams = max(0, self._active_streams - 1)
+
+    def wait_for_change(self, last_version: int, timeout: float) -> StatusSnapshot:
+        """Attend un statut plus récent que last_version (ou le timeout) et le retourne."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._snapshot.version != last_version or self._closed, timeout=timeout)
+            return self._snapshot
+
+    def close(self):
+        """Termine tous les flux en cours (arrêt du serveur)."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    @staticmethod
+    def format_event(snapshot: StatusSnapshot) -> str:
+        return f"id: {snapshot.version}\nevent: status\ndata: {snapshot.body}\n\n"
+
+    def stream(self):
+        """
+        Générateur SSE. La place doit avoir été réservée via try_acquire_stream();
+        elle est libérée à la fin du flux (déconnexion, durée max ou arrêt serveur).
+        """
+        started_at = time.monotonic()
+        try:
+            snapshot = self.get_snapshot()
+            yield f"retry: {self.keepalive_seconds * 1000}\n\n"
+            yield self.format_event(snapshot)
+            while not self._closed and time.monotonic() - started_at < self.stream_max_seconds:
+                new_snapshot = self.wait_for_change(snapshot.version, timeout=self.keepalive_seconds)
+                if new_snapshot.version != snapshot.version:
+                    snapshot = new_snapshot
+                    yield self.format_event(snapshot)
+                else:
+                    yield ": keepalive\n\n" # Commentaire SSE, permet aussi de détecter les clients partis
+        finally:
+            self.release_stream()
+            self.logger.debug(f"Flux SSE terminé ({self._active_streams} flux restants).")
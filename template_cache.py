@@ -0,0 +1,87 @@
+# template_cache.py
+"""
+Compilation et rendu des pages HTML mis en cache.
+
+- Cache de bytecode Jinja sur disque (cache local) : après un redémarrage, un template
+  déjà compilé est rechargé tel quel au lieu d'être recompilé (control.html: ~2000 lignes).
+  Le fichier est recompilé automatiquement si le template change (somme de contrôle).
+- warm_templates() compile tous les templates au démarrage, avant la première requête.
+- PageCache garde le HTML rendu des pages. Ces pages ne dépendent que des permissions
+  de l'utilisateur (menus, boutons) : la clé est (template, permissions compilées,
+  version), et la version change à chaque rechargement de la configuration.
+  Les pages affichant des messages flash ne passent pas par le cache (elles sont
+  propres à une requête). Les URL des fichiers statiques incluses gardent l'empreinte
+  du moment du rendu : un fichier modifié en cours de route reste servi à jour
+  (revalidé, voir static_assets.py) jusqu'au prochain rechargement.
+"""
+import os
+import threading
+import time
+import logging
+from collections import OrderedDict
+from jinja2 import FileSystemBytecodeCache
+
+PAGE_CACHE_MAX_ENTRIES = 128 # Pages x ensembles de permissions distincts (quelques rôles en pratique)
+
+
+def make_bytecode_cache(cache_dir: str, logger: logging.Logger):
+    """Cache de bytecode Jinja dans cache_dir, None (compilation à chaque démarrage) si le dossier est inutilisable."""
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"Cache de bytecode des templates indisponible ({cache_dir}): {e}")
+        return None
+    return FileSystemBytecodeCache(cache_dir)
+
+
+def warm_templates(jinja_env, logger: logging.Logger) -> int:
+    """Charge (compile ou relit depuis le cache de bytecode) tous les templates HTML. Retourne leur nombre."""
+    started = time.perf_counter()
+    loaded = 0
+    for name in jinja_env.list_templates(extensions=("html",)):
+        try:
+            jinja_env.get_template(name)
+            loaded += 1
+        except Exception as e: # Template invalide: l'erreur réapparaîtra (et sera journalisée) à son rendu
+            logger.error(f"Précompilation du template '{name}' impossible: {e}")
+    logger.info(f"Templates précompilés: {loaded} en {(time.perf_counter() - started) * 1000:.0f} ms.")
+    return loaded
+
+
+class PageCache:
+    """
+    Cache du HTML rendu, indexé par (clé fournie par l'appelant, version).
+    invalidate() doit être appelé quand la configuration change.
+    """
+    def __init__(self, logger: logging.Logger, max_entries: int = PAGE_CACHE_MAX_ENTRIES):
+        self.logger = logger
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._pages = OrderedDict() # (clé, version) -> HTML, du moins au plus récemment servi
+        self._version = 0
+
+    def invalidate(self, reason: str = ""):
+        with self._lock:
+            self._version += 1
+            self._pages.clear()
+        self.logger.debug(f"Cache des pages invalidé ({reason or 'sans motif'}), version {self._version}.")
+
+    def get_or_render(self, key: tuple, render):
+        """
+        HTML en cache pour key, sinon render() (fonction sans argument) mis en cache.
+        Retourne (html, True si trouvé en cache).
+        """
+        with self._lock:
+            full_key = (key, self._version)
+            html = self._pages.get(full_key)
+            if html is not None:
+                self._pages.move_to_end(full_key)
+                return html, True
+        html = render()
+        with self._lock:
+            if full_key[1] == self._version: # Ne pas remplir le cache avec une version périmée
+                self._pages[full_key] = html
+                while len(self._pages) > self.max_entries:
+                    self._pages.popitem(last=False)
+        self.logger.debug(f"Page '{key[0]}' rendue et mise en cache ({len(html)} caractères).")
+        return html, False
@@ -0,0 +1,264 @@
+# upload_sessions.py
+"""
+Uploads de sons par morceaux, avec reprise (init / ajout / validation).
+
+Chaque session écrit dans un fichier temporaire local (cache/uploads/<id>.part)
+pendant que l'empreinte SHA-1 est calculée au fil de l'eau ; son état est décrit
+par <id>.json, ce qui permet de reprendre un upload interrompu (Wi-Fi, redémarrage
+du serveur) à l'octet près. À la validation, le fichier complet est copié sur le
+partage sous un nom temporaire puis renommé sans jamais remplacer un fichier existant
+(le fichier final n'apparaît jamais à moitié écrit). Les sessions abandonnées sont supprimées après UPLOAD_SESSION_TTL_SECONDS.
+"""
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+import logging
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024 # Taille conseillée d'un morceau (1 Mo)
+UPLOAD_SESSION_TTL_SECONDS = 24 * 3600
+COPY_BUFFER_BYTES = 64 * 1024
+SHARE_COPY_TIMEOUT_SECONDS = 120 # Copie d'un fichier complet sur le partage (voir move_to_share)
+
+
+class UploadError(Exception):
+    """Requête d'upload invalide (session inconnue, décalage incorrect, taille dépassée...)."""
+
+    def __init__(self, message: str, status: int = 400, **details):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+class UploadSessionManager:
+    """Sessions d'upload en cours, persistées dans un dossier local."""
+
+    def __init__(self, upload_dir: str, logger: logging.Logger, max_size: int):
+        """
+        Args:
+            upload_dir: Dossier local des fichiers temporaires (<id>.part) et de leur état (<id>.json).
+            logger: Instance du logger.
+            max_size: Taille maximale (octets) d'un fichier uploadé.
+        """
+        self.upload_dir = upload_dir
+        self.logger = logger
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._sessions = {} # id -> {"id", "filename", "size", "user", "received", "created_at", "updated_at"}
+        self._hashers = {} # id -> hashlib.sha1 du contenu déjà reçu
+        self._busy = set() # id des sessions dont un morceau est en cours de réception ou la validation en cours (hors verrou)
+        self._load()
+
+    # --- Persistance ---
+
+    def _paths(self, upload_id: str):
+        base = os.path.join(self.upload_dir, upload_id)
+        return base + ".part", base + ".json"
+
+    def _load(self):
+        """Reprend les sessions laissées par un précédent démarrage (taille reçue = taille du .part)."""
+        if not os.path.isdir(self.upload_dir):
+            return
+        for entry in os.scandir(self.upload_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path, 'r', encoding='utf-8') as f:
+                    session = json.load(f)
+                part_path, _ = self._paths(session["id"])
+                session["received"] = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+                self._sessions[session["id"]] = session
+            except (OSError, ValueError, KeyError) as e:
+                self.logger.warning(f"Upload: session '{entry.name}' illisible, ignorée: {e}")
+        if self._sessions:
+            self.logger.info(f"Upload: {len(self._sessions)} session(s) interrompue(s) reprise(s).")
+
+    def _save(self, session: dict):
+        _, state_path = self._paths(session["id"])
+        with open(state_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(session, f, ensure_ascii=False)
+        os.replace(state_path + ".tmp", state_path)
+
+    def _discard(self, upload_id: str):
+        self._sessions.pop(upload_id, None)
+        self._hashers.pop(upload_id, None)
+        for path in self._paths(upload_id):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _hasher(self, session: dict):
+        """
+        Empreinte du contenu déjà reçu (recalculée depuis le .part après un redémarrage).
+        Appelé avec le verrou, ou hors verrou par append pour sa session marquée occupée.
+        """
+        hasher = self._hashers.get(session["id"])
+        if hasher is None:
+            hasher = hashlib.sha1()
+            part_path, _ = self._paths(session["id"])
+            if session["received"]:
+                with open(part_path, 'rb') as f:
+                    for block in iter(lambda: f.read(COPY_BUFFER_BYTES), b""):
+                        hasher.update(block)
+            self._hashers[session["id"]] = hasher
+        return hasher
+
+    def _check_idle(self, upload_id: str, session: dict):
+        if upload_id in self._busy:
+            raise UploadError("Un morceau ou la validation de cet upload est en cours, réessayer ensuite.", 409,
+                              received=session["received"])
+
+    def _get(self, upload_id: str, user: str) -> dict:
+        session = self._sessions.get(upload_id)
+        if not session or session["user"] != user:
+            raise UploadError("Session d'upload inconnue ou expirée.", 404)
+        return session
+
+    def purge_expired(self):
+        """Supprime les sessions sans activité depuis UPLOAD_SESSION_TTL_SECONDS."""
+        limit = time.time() - UPLOAD_SESSION_TTL_SECONDS
+        with self._lock:
+            for upload_id in [i for i, s in self._sessions.items() if s["updated_at"] < limit and i not in self._busy]:
+                self.logger.info(f"Upload: session '{upload_id}' ({self._sessions[upload_id]['filename']}) expirée, supprimée.")
+                self._discard(upload_id)
+
+    # --- API ---
+
+    def init(self, filename: str, size: int, user: str) -> dict:
+        """Crée une session, ou renvoie la session en cours du même utilisateur pour ce fichier (reprise)."""
+        if size <= 0:
+            raise UploadError("Fichier vide.")
+        if size > self.max_size:
+            raise UploadError(f"Fichier trop volumineux (max {self.max_size // (1024 * 1024)} Mo).", 413)
+        self.purge_expired()
+        with self._lock:
+            for session in self._sessions.values():
+                if (session["user"], session["filename"], session["size"]) == (user, filename, size):
+                    return dict(session)
+            os.makedirs(self.upload_dir, exist_ok=True)
+            now = time.time()
+            session = {"id": uuid.uuid4().hex, "filename": filename, "size": size, "user": user,
+                       "received": 0, "created_at": now, "updated_at": now}
+            open(self._paths(session["id"])[0], 'wb').close()
+            self._save(session)
+            self._sessions[session["id"]] = session
+            self._hashers[session["id"]] = hashlib.sha1()
+            return dict(session)
+
+    def status(self, upload_id: str, user: str) -> dict:
+        with self._lock:
+            return dict(self._get(upload_id, user))
+
+    def append(self, upload_id: str, user: str, offset: int, stream) -> dict:
+        """
+        Ajoute un morceau lu depuis `stream` à la position `offset`, qui doit être la
+        taille déjà reçue (sinon UploadError 409 avec la position attendue, pour reprendre).
+        Le morceau est reçu hors du verrou (il peut mettre des secondes à arriver en Wi-Fi) :
+        la session est seulement marquée occupée, les autres sessions restent utilisables.
+        """
+        with self._lock:
+            session = self._get(upload_id, user)
+            if upload_id in self._busy:
+                raise UploadError("Un morceau ou la validation de cet upload est déjà en cours.", 409,
+                                  received=session["received"])
+            if offset != session["received"]:
+                raise UploadError(f"Position incorrecte ({offset}), {session['received']} octet(s) déjà reçu(s).",
+                                  409, received=session["received"])
+            self._busy.add(upload_id)
+        try:
+            hasher = self._hasher(session)
+            part_path, _ = self._paths(upload_id)
+            received = session["received"]
+            try:
+                with open(part_path, 'r+b') as f:
+                    f.seek(received)
+                    for block in iter(lambda: stream.read(COPY_BUFFER_BYTES), b""):
+                        if received + len(block) > session["size"]:
+                            raise UploadError("Le morceau dépasse la taille annoncée du fichier.", 400)
+                        f.write(block)
+                        hasher.update(block)
+                        received += len(block)
+            except Exception:
+                # Morceau interrompu (connexion coupée) ou invalide: on revient au dernier état sûr
+                with open(part_path, 'r+b') as f:
+                    f.truncate(session["received"])
+                with self._lock:
+                    self._hashers.pop(upload_id, None)
+                raise
+            with self._lock:
+                session["received"] = received
+                session["updated_at"] = time.time()
+                self._save(session)
+                return dict(session)
+        finally:
+            with self._lock:
+                self._busy.discard(upload_id)
+
+    def complete(self, upload_id: str, user: str):
+        """
+        Vérifie que le fichier est complet et marque la session occupée jusqu'à finish()
+        ou release() : une seconde validation (client qui réessaie) reçoit un 409.
+        Retourne (session, chemin du .part, sha1).
+        """
+        with self._lock:
+            session = self._get(upload_id, user)
+            self._check_idle(upload_id, session)
+            if session["received"] != session["size"]:
+                raise UploadError(f"Upload incomplet ({session['received']}/{session['size']} octets).",
+                                  409, received=session["received"])
+            self._busy.add(upload_id)
+            return dict(session), self._paths(upload_id)[0], self._hasher(session).hexdigest()
+
+    def release(self, upload_id: str):
+        """Fin d'une validation échouée mais à retenter: la session redevient utilisable."""
+        with self._lock:
+            self._busy.discard(upload_id)
+
+    def abort(self, upload_id: str, user: str):
+        with self._lock:
+            self._check_idle(upload_id, self._get(upload_id, user))
+            self._discard(upload_id)
+
+    def finish(self, upload_id: str):
+        """Supprime la session (après validation réussie ou refus définitif du contenu)."""
+        with self._lock:
+            self._busy.discard(upload_id)
+            self._discard(upload_id)
+
+
+def _rename_no_replace(src: str, dst: str):
+    """Renomme src en dst, FileExistsError si dst existe déjà (jamais d'écrasement)."""
+    if os.name == 'nt':
+        os.rename(src, dst) # Windows: échoue si la destination existe
+        return
+    try:
+        os.link(src, dst) # Lien atomique: échoue si la destination existe
+    except FileExistsError:
+        raise
+    except OSError: # Système de fichiers sans liens (certains montages SMB): vérification puis renommage
+        if os.path.exists(dst):
+            raise FileExistsError(f"'{dst}' existe déjà.")
+        os.rename(src, dst)
+        return
+    os.remove(src)
+
+
+def move_to_share(part_path: str, destination_path: str):
+    """
+    Copie le fichier sur le partage sous un nom temporaire puis le renomme (atomique côté partage).
+    Lève FileExistsError si un fichier de ce nom est apparu entre-temps (il est conservé).
+    """
+    temp_path = destination_path + ".uploading"
+    try:
+        shutil.copyfile(part_path, temp_path)
+        _rename_no_replace(temp_path, destination_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
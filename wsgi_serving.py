@@ -0,0 +1,122 @@
+# wsgi_serving.py
+"""
+Réglages du serveur Waitress et compression des réponses JSON.
+
+Les réglages viennent de parametres_college.json (clés facultatives, valeur par
+défaut sinon) :
+- server_threads: threads des requêtes classiques (les flux SSE ont les leurs en plus) ;
+- server_listen: adresse(s) d'écoute, ex "0.0.0.0:5000" ou "127.0.0.1:5000 [::1]:5000" ;
+- server_connection_limit: connexions ouvertes simultanées au-delà desquelles Waitress n'accepte plus ;
+- server_channel_timeout_seconds: fermeture d'une connexion keep-alive inactive ;
+- server_backlog: connexions en attente d'acceptation (file du système) ;
+- server_unix_socket: chemin d'un socket Unix (mode derrière un proxy inverse local,
+  ex nginx) à la place de server_listen ; l'adresse du client est alors lue dans
+  X-Forwarded-For, posé par le proxy ; server_unix_socket_perms: droits du socket ;
+- gzip_min_size_bytes: taille à partir de laquelle une réponse JSON est compressée (0: jamais) ;
+- gzip_level: niveau de compression (1 rapide à 9 compact).
+Une valeur invalide est signalée dans le journal et remplacée par sa valeur par défaut.
+"""
+import gzip
+import socket
+import logging
+
+SERVER_DEFAULTS = {
+    "server_threads": 8,
+    "server_listen": "0.0.0.0:5000",
+    "server_connection_limit": 100,
+    "server_channel_timeout_seconds": 120,
+    "server_backlog": 1024,
+    "server_unix_socket": None,
+    "server_unix_socket_perms": "660",
+}
+GZIP_DEFAULT_MIN_SIZE_BYTES = 1400 # Sous un paquet TCP: rien à gagner
+GZIP_DEFAULT_LEVEL = 6
+GZIP_MIMETYPES = ("application/json",)
+
+# Bornes des réglages entiers (minimum, maximum)
+_INT_RANGES = {
+    "server_threads": (1, 64),
+    "server_connection_limit": (10, 10000),
+    "server_channel_timeout_seconds": (5, 3600),
+    "server_backlog": (16, 65535),
+}
+
+
+def _int_setting(params: dict, key: str, logger: logging.Logger) -> int:
+    value = params.get(key, SERVER_DEFAULTS[key])
+    low, high = _INT_RANGES[key]
+    if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+        logger.warning(f"Paramètre '{key}' invalide ({value!r}, attendu un entier de {low} à {high}): "
+                       f"valeur par défaut {SERVER_DEFAULTS[key]}.")
+        return SERVER_DEFAULTS[key]
+    return value
+
+
+def build_waitress_options(params: dict, logger: logging.Logger, extra_threads: int = 0) -> dict:
+    """
+    Arguments de waitress.serve / create_server d'après les paramètres.
+    extra_threads: threads ajoutés à server_threads (flux SSE).
+    """
+    options = {
+        "threads": _int_setting(params, "server_threads", logger) + extra_threads,
+        "connection_limit": _int_setting(params, "server_connection_limit", logger),
+        "channel_timeout": _int_setting(params, "server_channel_timeout_seconds", logger),
+        "backlog": _int_setting(params, "server_backlog", logger),
+    }
+    unix_socket = params.get("server_unix_socket")
+    if unix_socket and not hasattr(socket, "AF_UNIX"):
+        logger.error(f"Socket Unix '{unix_socket}' non supporté sur ce système: écoute sur server_listen.")
+        unix_socket = None
+    if unix_socket:
+        options["unix_socket"] = unix_socket
+        options["unix_socket_perms"] = str(params.get("server_unix_socket_perms") or SERVER_DEFAULTS["server_unix_socket_perms"])
+        # Derrière le proxy local: adresse et protocole du client pris dans ses en-têtes (et seulement les siens)
+        options["trusted_proxy"] = "localhost"
+        options["trusted_proxy_headers"] = {"x-forwarded-for", "x-forwarded-proto"}
+        options["clear_untrusted_proxy_headers"] = True
+    else:
+        listen = params.get("server_listen") or SERVER_DEFAULTS["server_listen"]
+        if not isinstance(listen, str):
+            logger.warning(f"Paramètre 'server_listen' invalide ({listen!r}): valeur par défaut {SERVER_DEFAULTS['server_listen']}.")
+            listen = SERVER_DEFAULTS["server_listen"]
+        options["listen"] = listen
+    return options
+
+
+def describe_waitress_options(options: dict) -> str:
+    """Résumé lisible pour le journal de démarrage."""
+    where = f"socket Unix {options['unix_socket']}" if "unix_socket" in options else options["listen"]
+    return (f"{where} ({options['threads']} threads, {options['connection_limit']} connexions max, "
+            f"keep-alive {options['channel_timeout']}s, backlog {options['backlog']})")
+
+
+def gzip_settings(params: dict) -> tuple:
+    """(taille minimale, niveau) de compression d'après les paramètres ; taille 0: compression désactivée."""
+    min_size = params.get("gzip_min_size_bytes", GZIP_DEFAULT_MIN_SIZE_BYTES)
+    level = params.get("gzip_level", GZIP_DEFAULT_LEVEL)
+    if isinstance(min_size, bool) or not isinstance(min_size, int) or min_size < 0:
+        min_size = GZIP_DEFAULT_MIN_SIZE_BYTES
+    if isinstance(level, bool) or not isinstance(level, int) or not 1 <= level <= 9:
+        level = GZIP_DEFAULT_LEVEL
+    return min_size, level
+
+
+def compress_response(response, accept_encoding: str, min_size: int, level: int):
+    """
+    Compresse une réponse JSON (Flask/Werkzeug) en gzip si le client l'accepte et
+    qu'elle dépasse min_size octets. Les flux (SSE, fichiers) et les réponses portant
+    un ETag (validées par If-None-Match sur leur forme non compressée) sont laissés tels quels.
+    """
+    if not min_size or "gzip" not in (accept_encoding or "").lower():
+        return response
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or response.mimetype not in GZIP_MIMETYPES or "Content-Encoding" in response.headers
+            or "ETag" in response.headers):
+        return response
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+    response.set_data(gzip.compress(body, compresslevel=level))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    return response